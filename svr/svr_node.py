@@ -21,6 +21,9 @@ from pySPH import SPH
 class SvrNode(gfxNode.GfxNode):
     _SVR_NUMSLICES_INIT = 256
     _SVR_NUMSLICES_OMIT = 40
+
+    # VolumeRender changes OpenGL state without the state cache
+    _directGL = True
     
     def __init__(self, **args):
         gfxNode.GfxNode.__init__(self, **args)
@@ -49,7 +52,19 @@ class SvrNode(gfxNode.GfxNode):
         self.updateGeom()
         self.updateData()
 
+        # fewer slices at lower quality or while rendering the proxy
+        nslices = self.m_nslices
+        q = gfxNode.GfxNode.GetRenderQuality()
+        if q:
+            nslices = max(int(nslices * q.sliceRatio()),
+                          min(nslices, SvrNode._SVR_NUMSLICES_OMIT))
+            if q.isProxy():
+                nslices = min(nslices, SvrNode._SVR_NUMSLICES_OMIT)
+        self.p_render.m_num_of_layers = nslices
+
         self.p_render.Draw()
+        prof = gfxNode.GfxNode.GetProfiler()
+        if prof: prof.countDraw(self, nslices * 4, 0)
         return
 
     def renderWire(self):
@@ -62,6 +77,7 @@ class SvrNode(gfxNode.GfxNode):
         self.p_render = VolumeRender()
         return
     
+    @trace.Traced('SvrNode.SetData', 'update')
     def SetData(self, fdata, nx, ny, nz, dmin, dmax, dlen=1, tgt=0):
         dimSz = nx * ny * nz
         if dimSz < 1:
@@ -9,6 +9,7 @@ import numpy as np
 from OpenGL.GL import *
 
 from vfr.utilMath import *
+from vfr import trace
 from program_object import ProgramObject
 from shader_object import VertexShaderObject, FragmentShaderObject
 
@@ -78,6 +79,7 @@ class VolumeRender(object):
             glDeleteTextures(1, [self.m_texture_lut])
         return
 
+    @trace.Traced('VolumeRender.SetVolume', 'update')
     def SetVolume(self, data, n_size_x, n_size_y, n_size_z):
         glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
         if glIsTexture(self.m_texture_data):
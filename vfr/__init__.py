@@ -11,20 +11,29 @@ __all__ = [
     "defaultActions",
     "drawArea",
     "events",
+    "feedback",
     "gfxGroup",
     "gfxNode",
+    "glState",
+    "idBuffer",
     "image",
     "letters",
     "light",
     "lines",
+    "lod",
     "lut",
     "mesh",
     "node",
     "obj",
+    "pick",
     "primitives",
+    "profiler",
+    "quality",
     "scene",
+    "trace",
     "triangles",
     "utilMath",
     "vectors",
+    "vertexBuffer",
     ]
 
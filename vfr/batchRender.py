@@ -0,0 +1,379 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+vfr scene-graph library
+
+Copyright(c) YoH, 2026, All Right Reserved.
+
+バッチレンダリング
+カメラパス(視点のリスト)や時系列データ(タイムステップのリスト)の
+各フレームを，プロセスプールの各ワーカーが持つオフスクリーン描画領域で
+描画し，連番のPNGファイルに出力します．
+各ワーカーは起動時にシーンファクトリを呼び出してカメラとシーンを作成し，
+フレーム毎にフレーム適用関数でフレームの視点やデータをシーンに
+反映してから描画します．
+出力済みのフレームは再実行時にスキップされるため，失敗や中断の後は
+同じ引数で再実行することで残りのフレームを描画できます．
+
+コマンドラインからは以下のように実行します．
+  python -m vfr.batchRender mymod:make_scene -o out -W 1920 -H 1080 \\
+         -j 8 --orbit 360
+  python -m vfr.batchRender mymod:make_scene -o out -j 4 \\
+         --apply mymod:load_step data/p_001.sph ... data/p_010.sph
+オフスクリーンコンテキストのバックエンドは，このモジュールのimport時に
+決まるため(drawAreaOffscreen参照)，環境変数VFR_OFFSCREEN('egl'または
+'osmesa')で選択します．ワーカープロセスは呼び出したプロセスの環境変数を
+引き継ぐため，同じバックエンドを使用します．
+  VFR_OFFSCREEN=osmesa python -m vfr.batchRender mymod:make_scene -j 8
+"""
+import os, sys
+from . import drawAreaOffscreen # must be imported before OpenGL
+from .drawAreaOffscreen import DrawAreaOffscreen
+from .utilMath import *
+from . import png_io
+from . import trace
+import math
+import time
+import argparse
+import importlib
+import traceback
+import multiprocessing
+
+
+#----------------------------------------------------------------------
+class View(object):
+    """
+    視点クラス
+    vsnのViewPointと同じ属性を持つ，ウインドウシステムに依存しない
+    視点の設定です．ApplyViewPoint()でシーンに適用します．
+      name: 視点名
+      vT: 平行移動量
+      vS: スケーリングファクター
+      vC: 回転中心への平行移動量
+      mR: 回転行列
+    """
+    def __init__(self, org =None):
+        self.name = ''
+        self.vT = Vec3()
+        self.vS = Vec3((1.0, 1.0, 1.0))
+        self.vC = Vec3()
+        self.mR = Mat4()
+        if org:
+            self.vT[0:3] = org.vT[0:3]
+            self.vS[0:3] = org.vS[0:3]
+            self.vC[0:3] = org.vC[0:3]
+            self.mR[0:16] = org.mR[0:16]
+        return
+
+def OrbitViews(n, axis =(0.0, 1.0, 0.0), base =None):
+    """
+    指定した軸回りに一周する視点のリストを返す関数です．
+    - n: 視点の数
+    - axis: 回転軸方向ベクトル
+    - base: 回転前の視点(View, vsnのViewPoint)．Noneの場合は初期視点
+    """
+    views = []
+    for i in range(n):
+        v = View(base)
+        R = Mat4()
+        R.Rotation(2.0 * math.pi * i / n, Vec3(axis))
+        v.mR = R * v.mR
+        v.name = 'orbit_{}'.format(i)
+        views.append(v)
+    return views
+
+def ApplyViewPoint(camera, frame):
+    """
+    既定のフレーム適用関数です．
+    frameが視点(vT, vS, vC, mRを持つオブジェクト)の場合，シーンに適用します．
+    シーンにvsnのGfxViewと同じ名前'T', 'C', 'R', 'S'のグループがある場合は
+    それぞれに設定し，無い場合はシーンの幾何変換行列に合成します．
+    視点以外のフレームは無視します．
+    - camera: カメラ
+    - frame: フレーム
+    """
+    if not all([hasattr(frame, x) for x in ('vT', 'vS', 'vC', 'mR')]):
+        return
+    scene = camera._scene
+    if scene is None: return
+    (pT, pC, pR, pS) = [scene.getNodeByName(x) for x in 'TCRS']
+    if pT and pC and pR and pS:
+        pT.identity(); pT.trans(frame.vT)
+        pS.identity(); pS.scale(frame.vS)
+        pC.identity(); pC.trans(frame.vC)
+        pR.setMatrix(frame.mR)
+        return
+    scene.identity()
+    scene.trans(frame.vT)
+    scene.trans(frame.vC)
+    scene.mult(frame.mR)
+    scene.scale(frame.vS)
+    return
+
+def _resolve(spec):
+    """
+    'モジュール名:関数名'形式の文字列を関数に変換して返す
+    - spec: 関数，または'モジュール名:関数名'形式の文字列
+    """
+    if not isinstance(spec, str): return spec
+    (modName, funcName) = spec.split(':', 1)
+    mod = importlib.import_module(modName)
+    return getattr(mod, funcName)
+
+
+#----------------------------------------------------------------------
+# worker process
+
+"""ワーカープロセスの初期化引数"""
+_workerArgs = None
+
+"""ワーカープロセスの描画状態(描画領域, カメラ, フレーム適用関数)"""
+_worker = None
+
+def _setupWorker(factory, apply, width, height):
+    """
+    ワーカープロセスの初期化引数の設定
+    描画状態は最初のフレームの描画時に作成します．初期化に失敗した
+    場合にプロセスプールがワーカーを再起動し続けないよう，プールの
+    初期化関数では失敗し得る処理を行いません．
+    """
+    global _workerArgs, _worker
+    _workerArgs = (factory, apply, width, height)
+    _worker = None
+    return
+
+def _initWorker():
+    """
+    ワーカープロセスの描画状態の作成
+    オフスクリーン描画領域を作成し，シーンファクトリでカメラを作成します．
+    """
+    global _worker
+    (factory, apply, width, height) = _workerArgs
+    da = DrawAreaOffscreen(width, height)
+    camera = _resolve(factory)()
+    da.setCamera(camera)
+    _worker = (da, camera, _resolve(apply))
+    return
+
+def _releaseWorker():
+    """
+    ワーカープロセスの描画状態の破棄
+    """
+    global _worker
+    if _worker:
+        _worker[0].destroy()
+    _worker = None
+    return
+
+def _renderFrame(task):
+    """
+    1フレームの描画とPNGファイルへの出力
+    (フレーム番号, 出力パス, エラーメッセージ)を返します．
+    エラーメッセージは成功した場合はNoneです．
+    - task: (フレーム番号, フレーム, 出力パス, アルファ出力)
+    """
+    (index, frame, path, alpha) = task
+    try:
+        if _worker is None:
+            _initWorker()
+        (da, camera, apply) = _worker
+        with trace.Span('batchRender.frame', 'render', index=index):
+            apply(camera, frame)
+            img = da.render()
+        if not png_io.WritePNG(path, img, alpha):
+            return (index, path, 'can not write {}'.format(path))
+    except Exception:
+        return (index, path, traceback.format_exc())
+    return (index, path, None)
+
+
+#----------------------------------------------------------------------
+class BatchRenderer(object):
+    """
+    バッチレンダラークラス
+    フレームのリストをプロセスプールで描画し，outDirに
+    prefix + 連番(digits桁) + '.png' のファイル名で出力します．
+    連番はフレームリスト内の順番です．
+    シーンファクトリとフレーム適用関数はワーカープロセスに渡すため，
+    モジュールのトップレベルで定義した関数，または
+    'モジュール名:関数名'形式の文字列で指定します．
+      factory: シーンファクトリ．引数無しで呼び出され，シーンを設定した
+               カメラを返します
+      apply: フレーム適用関数．apply(camera, frame)の形式で呼び出され，
+             フレームの視点やタイムステップのデータをシーンに反映します
+      width, height: 画像サイズ(pixels)
+      workers: ワーカープロセス数．1の場合は呼び出したプロセスで描画します
+      outDir: 出力ディレクトリ
+      prefix: 出力ファイル名の接頭辞
+      digits: 連番の桁数
+      alpha: Trueの場合RGBA，Falseの場合RGBで出力します
+      resume: Trueの場合，出力済みのフレームを描画しません
+      retries: 失敗したフレームを再描画する回数
+      progress: 進捗通知関数．progress(完了数, 全フレーム数,
+                フレーム番号, 出力パス, エラーメッセージ)の形式で
+                フレーム毎に呼び出されます
+    """
+    def __init__(self, factory, **args):
+        """
+        - factory: シーンファクトリ
+        args: apply =ApplyViewPoint, width =640, height =480, workers =1,
+              outDir ='.', prefix ='frame_', digits =5, alpha =True,
+              resume =True, retries =1, progress =None
+        """
+        self.factory = factory
+        self.apply = ApplyViewPoint if not 'apply' in args else args['apply']
+        self.width = 640 if not 'width' in args else args['width']
+        self.height = 480 if not 'height' in args else args['height']
+        self.workers = 1 if not 'workers' in args else args['workers']
+        self.outDir = '.' if not 'outDir' in args else args['outDir']
+        self.prefix = 'frame_' if not 'prefix' in args else args['prefix']
+        self.digits = 5 if not 'digits' in args else args['digits']
+        self.alpha = True if not 'alpha' in args else args['alpha']
+        self.resume = True if not 'resume' in args else args['resume']
+        self.retries = 1 if not 'retries' in args else args['retries']
+        self.progress = None if not 'progress' in args else args['progress']
+        return
+
+    def getFramePath(self, index):
+        """
+        フレームの出力パスを返す
+        - index: フレーム番号
+        """
+        return os.path.join(self.outDir, '{}{:0{}d}.png'.format(
+            self.prefix, index, self.digits))
+
+    def getPending(self, frames):
+        """
+        描画が必要なフレーム番号のリストを返す
+        resumeがTrueの場合，出力済みのフレームを除きます．
+        - frames: フレームのリスト
+        """
+        idx = range(len(frames))
+        if not self.resume: return list(idx)
+        return [i for i in idx if not os.path.exists(self.getFramePath(i))]
+
+    def run(self, frames):
+        """
+        バッチレンダリングの実行
+        描画に失敗したフレーム番号のリストを返します．
+        - frames: フレーム(視点，タイムステップ等)のリスト
+        """
+        if not os.path.isdir(self.outDir):
+            os.makedirs(self.outDir)
+        total = len(frames)
+        pending = self.getPending(frames)
+        done = total - len(pending)
+        for n in range(self.retries + 1):
+            if len(pending) < 1: break
+            tasks = [(i, frames[i], self.getFramePath(i), self.alpha)
+                     for i in pending]
+            failed = []
+            for (i, path, err) in self.__execute(tasks):
+                if err is None:
+                    done += 1
+                else:
+                    failed.append(i)
+                if self.progress:
+                    self.progress(done, total, i, path, err)
+            pending = failed
+        return pending
+
+    def __execute(self, tasks):
+        """
+        フレームの描画
+        フレーム番号順に_renderFrame()の結果を返すジェネレータです．
+        - tasks: _renderFrame()の引数のリスト
+        """
+        initArgs = (self.factory, self.apply, self.width, self.height)
+        nw = min(self.workers, len(tasks))
+        if nw <= 1:
+            _setupWorker(*initArgs)
+            try:
+                for t in tasks:
+                    yield _renderFrame(t)
+            finally:
+                _releaseWorker()
+            return
+
+        # spawn: OpenGL contexts must not be inherited by fork
+        ctx = multiprocessing.get_context('spawn')
+        pool = ctx.Pool(nw, _setupWorker, initArgs)
+        try:
+            for r in pool.imap(_renderFrame, tasks):
+                yield r
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+        return
+
+
+#----------------------------------------------------------------------
+def _printProgress(done, total, index, path, err):
+    """
+    コマンドライン用の進捗通知関数
+    """
+    if err:
+        sys.stderr.write('frame {} failed: {}\n'.format(index, err))
+    sys.stderr.write('\r{}/{} {}'.format(done, total, path))
+    if done >= total:
+        sys.stderr.write('\n')
+    sys.stderr.flush()
+    return
+
+def Main(argv =None):
+    """
+    コマンドラインからのバッチレンダリングの実行
+    全てのフレームの描画に成功した場合は0を返します．
+    - argv: コマンドライン引数のリスト．Noneの場合はsys.argv[1:]
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m vfr.batchRender',
+        description='render frames of a vfr scene to numbered PNG files')
+    parser.add_argument('factory',
+                        help='scene factory as module:function')
+    parser.add_argument('frames', nargs='*',
+                        help='frame arguments (e.g. timestep files)')
+    parser.add_argument('--apply', default=None,
+                        help='frame apply function as module:function')
+    parser.add_argument('--orbit', type=int, default=0,
+                        help='render N views orbiting around the Y axis')
+    parser.add_argument('-o', '--outdir', default='.')
+    parser.add_argument('-p', '--prefix', default='frame_')
+    parser.add_argument('-W', '--width', type=int, default=640)
+    parser.add_argument('-H', '--height', type=int, default=480)
+    parser.add_argument('-j', '--workers', type=int, default=1)
+    parser.add_argument('--rgb', action='store_true',
+                        help='write RGB instead of RGBA')
+    parser.add_argument('--no-resume', action='store_true',
+                        help='re-render frames already written')
+    parser.add_argument('--retries', type=int, default=1)
+    opts = parser.parse_args(argv)
+
+    if opts.orbit > 0:
+        frames = OrbitViews(opts.orbit)
+    else:
+        frames = opts.frames
+    if len(frames) < 1:
+        parser.error('no frames to render')
+    if not os.getcwd() in sys.path:
+        sys.path.insert(0, os.getcwd())
+
+    br = BatchRenderer(opts.factory,
+                       apply=opts.apply if opts.apply else ApplyViewPoint,
+                       width=opts.width, height=opts.height,
+                       workers=opts.workers, outDir=opts.outdir,
+                       prefix=opts.prefix,
+                       alpha=not opts.rgb, resume=not opts.no_resume,
+                       retries=opts.retries, progress=_printProgress)
+    t0 = time.perf_counter()
+    failed = br.run(frames)
+    sys.stderr.write('{} frames in {:.1f} s\n'.format(
+        len(frames), time.perf_counter() - t0))
+    if len(failed) > 0:
+        sys.stderr.write('failed frames: {}\n'.format(failed))
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(Main())
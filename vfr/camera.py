@@ -6,11 +6,19 @@ vfr scene-graph library
 Copyright(c) YoH, 2026, All Right Reserved.
 
 """
+import time
 import numpy as np
 from OpenGL.GL import *
 from OpenGL.GLU import *
 from .gfxGroup import *
 from .frustum import *
+from .glState import *
+from .lod import LODSelector
+from .quality import RenderQuality
+from .profiler import RenderProfiler
+from .pick import Picker
+from .feedback import FeedbackEngine
+from .idBuffer import IDBuffer
 from .scene import *
 from .node import *
 from .image import *
@@ -71,11 +79,34 @@ class Camera(Base):
       _fogMode: フォグモード
       _fogStart, _fogEnd: フォグパラメータ
       _clickSpotSize: クリックセレクション/フィードバックテストスポットサイズ
+      _culling: 視垂台カリングモード
+      _culler: 視垂台カリング(frustum.FrustumCuller)
+      _stateCache: OpenGLステートキャッシュモード
+      _glState: OpenGLステートキャッシュ(glState.GLStateCache)
+      _lodMode: LOD(詳細度)選択モード
+      _lodSelector: LODレベル選択(lod.LODSelector)
+      _quality: 描画品質(quality.RenderQuality)
+      _profiling: レンダリングプロファイルモード
+      _profiler: レンダリングプロファイラ(profiler.RenderProfiler)
+      _tile: タイル描画の設定
+             (全体の幅, 全体の高さ, タイルのX, タイルのY, 幅, 高さ)(pixels)
+      _sizeScale: 点サイズと線幅に掛ける倍率
+      _cpuPick: CPUピッキングモード
+      _picker: CPUピッキング(pick.Picker)
+      _cpuFeedback: CPUフィードバックモード
+      _feedbackEngine: CPUフィードバック(feedback.FeedbackEngine)
+      _idCache: IDバッファキャッシュモード
+      _idPrefetch: IDバッファの先読みモード
+      _idViewKey: 直前の描画時のIDバッファのキャッシュのキー(先読み用)
+      _idBuffer: セレクションテスト用IDバッファ(idBuffer.IDBuffer)
     """
     def __init__(self, **args):
         """
         args: antiAlias =True, bgColor =[0.0, 0.0, 0.0, 1.0],
-              fogMode =False, fogStart =9.0, fogEnd =15.0, clickSpotSize =5
+              fogMode =False, fogStart =9.0, fogEnd =15.0, clickSpotSize =5,
+              culling =True, stateCache =True, lod =True,
+              governor =False, targetFrameTime =1.0/30, profile =False,
+              cpuPick =False, cpuFeedback =False, idCache =False
         """
         Base.__init__(self, **args)
         self._scene = None
@@ -93,6 +124,30 @@ class Camera(Base):
         self._fogEnd = 15.0 if not 'fogEnd' in args else args['fogEnd']
         self._clickSpotSize = 5 if not 'clickSpotSize' in args \
             else args['clickSpotSize']
+        self._culling = True if not 'culling' in args else args['culling']
+        self._culler = FrustumCuller()
+        self._stateCache = True if not 'stateCache' in args \
+            else args['stateCache']
+        self._glState = GLStateCache()
+        self._lodMode = True if not 'lod' in args else args['lod']
+        self._lodSelector = LODSelector()
+        self._quality = RenderQuality(
+            governor=False if not 'governor' in args else args['governor'],
+            targetTime=1.0/30 if not 'targetFrameTime' in args \
+            else args['targetFrameTime'])
+        self._profiling = False if not 'profile' in args else args['profile']
+        self._profiler = RenderProfiler()
+        self._tile = None
+        self._sizeScale = 1.0
+        self._cpuPick = False if not 'cpuPick' in args else args['cpuPick']
+        self._picker = Picker()
+        self._cpuFeedback = False if not 'cpuFeedback' in args \
+            else args['cpuFeedback']
+        self._feedbackEngine = FeedbackEngine()
+        self._idCache = False if not 'idCache' in args else args['idCache']
+        self._idPrefetch = False
+        self._idViewKey = None
+        self._idBuffer = IDBuffer()
         return
 
     def __del__(self):
@@ -101,6 +156,9 @@ class Camera(Base):
     def destroy(self):
         self.relaxSelect()
         self.relaxFeedback()
+        if self._da:
+            self._da.makeCurrent()
+            self._idBuffer.release()
         self.setDrawArea(None)
         self.setScene(None)
         self.setFrontNode(None)
@@ -113,6 +171,13 @@ class Camera(Base):
         - asp: 視界のアスペクト比(横/縦)
         """
         if self._scene == None: return
+        q = self._quality
+        t0 = time.perf_counter()
+        if self._tile:
+            asp = float(self._tile[0]) / float(self._tile[1])
+        if self._profiling:
+            self._profiler.begin(self._glState)
+            GfxNode.SetProfiler(self._profiler)
 
         # Background Painting
         self.bgPaint()
@@ -128,7 +193,7 @@ class Camera(Base):
         glLightModeli(GL_LIGHT_MODEL_TWO_SIDE, GL_TRUE)
 
         # AntiAlias Lines
-        if self._antiAlias:
+        if self._antiAlias and q.antiAlias():
             glEnable(GL_LINE_SMOOTH)
             glEnable(GL_POINT_SMOOTH)
         else:
@@ -136,7 +201,7 @@ class Camera(Base):
             glDisable(GL_POINT_SMOOTH)
 
         # Fog
-        if self._fogMode:
+        if self._fogMode and q.fog():
             glEnable(GL_FOG)
             glFogi(GL_FOG_MODE, GL_LINEAR)
             glFogfv(GL_FOG_COLOR, self._bgColor)
@@ -162,7 +227,38 @@ class Camera(Base):
 
         # Scene Rendering
         if not self._scene == None:
+            if self._culling or self._lodMode:
+                PM = Mat4()
+                PM.m_v = glGetFloatv(GL_PROJECTION_MATRIX).reshape(16)
+                MVM = Mat4()
+                MVM.m_v = glGetFloatv(GL_MODELVIEW_MATRIX).reshape(16)
+            if self._culling:
+                self._culler.begin(PM, MVM)
+                GfxNode.SetCuller(self._culler)
+            if self._lodMode:
+                self._lodSelector.qualityBias = q.lodBias()
+                self._lodSelector.begin(PM, MVM, glGetIntegerv(GL_VIEWPORT))
+                GfxNode.SetLODSelector(self._lodSelector)
+            self._glState.setCacheMode(self._stateCache)
+            self._glState.resetStat()
+            self._glState.sizeScale = self._sizeScale
+            GfxNode.SetGLState(self._glState)
+            GfxNode.SetRenderQuality(q)
             self._scene.render()
+            GfxNode.SetCuller(None)
+            GfxNode.SetLODSelector(None)
+            GfxNode.SetGLState(None)
+            GfxNode.SetRenderQuality(None)
+
+            # depth buffer for the CPU feedback depth test
+            if self._cpuFeedback and self._feedbackEngine.depthTest \
+                   and not self._tile:
+                vp = glGetIntegerv(GL_VIEWPORT)
+                depth = glReadPixels(vp[0], vp[1], vp[2], vp[3],
+                                     GL_DEPTH_COMPONENT, GL_FLOAT)
+                self._feedbackEngine.setDepthBuffer(
+                    depth_to_numpy(depth, vp[2], vp[3]).reshape(
+                        (vp[3], vp[2])), vp)
 
         # FrontObj Rendering
         self.fgPaint()
@@ -171,6 +267,25 @@ class Camera(Base):
         if self._antiAlias:
             glDisable(GL_LINE_SMOOTH)
 
+        # Frame time for the quality governor
+        if q.governor:
+            glFinish()
+        q.update(time.perf_counter() - t0)
+
+        # Profiling report
+        if self._profiling:
+            GfxNode.SetProfiler(None)
+            self._profiler.end()
+
+        # ID buffer prefetch for the next selection test,
+        # only once the view is idle (same key as the previous frame)
+        if self._idCache and self._idPrefetch and self._da \
+               and not self._tile:
+            key = self.__idBufferKey(self._da._viewport)
+            if key == self._idViewKey:
+                self.prefetchIDBuffer()
+            self._idViewKey = key
+
     def setScene(self, scene):
         """
         シーンの設定
@@ -235,6 +350,244 @@ class Camera(Base):
         """
         return self._frustum.GetMVM()
 
+    def setCulling(self, mode):
+        """
+        視垂台カリングモードの設定
+        - mode: 視垂台カリングモード
+        """
+        self._culling = mode
+        self.notice()
+
+    def getCulling(self):
+        """
+        視垂台カリングモードを返す
+        """
+        return self._culling
+
+    def getCullStat(self):
+        """
+        直前のフレームの視垂台カリング統計値を返す
+        (判定したノード数, カリングしたノード数)のタプルを返します.
+        """
+        return (self._culler.visited, self._culler.culled)
+
+    def setStateCache(self, mode):
+        """
+        OpenGLステートキャッシュモードの設定
+        - mode: OpenGLステートキャッシュモード
+        """
+        self._stateCache = mode
+        return
+
+    def getStateCache(self):
+        """
+        OpenGLステートキャッシュモードを返す
+        """
+        return self._stateCache
+
+    def setLODMode(self, mode):
+        """
+        LOD(詳細度)選択モードの設定
+        Falseの場合，LODチェーンを持つノードも常に最も詳細なレベルで
+        描画します．
+        - mode: LOD選択モード
+        """
+        self._lodMode = mode
+        self.notice()
+        return
+
+    def getLODMode(self):
+        """
+        LOD選択モードを返す
+        """
+        return self._lodMode
+
+    def setLODBias(self, bias):
+        """
+        LODバイアスの設定
+        正の値ほど粗いレベルを選択します．1.0で目標の三角形数が半分になります．
+        - bias: LODバイアス
+        """
+        self._lodSelector.bias = bias
+        self.notice()
+        return
+
+    def getLODBias(self):
+        """
+        LODバイアスを返す
+        """
+        return self._lodSelector.bias
+
+    def getLODStat(self):
+        """
+        直前のフレームのLODレベル毎の選択ノード数を返す
+        {レベル: ノード数}の辞書を返します．
+        """
+        return dict(self._lodSelector.selected)
+
+    def setProxyMode(self, mode):
+        """
+        代理描画モードの設定
+        Trueの場合，描画負荷の大きいノードを簡略化した代理形状で描画します．
+        インタラクティブな視点操作中の描画に使用します．
+        - mode: 代理描画モード
+        """
+        if self._quality.proxy == mode: return
+        self._quality.proxy = mode
+        self.notice(False)
+        return
+
+    def getProxyMode(self):
+        """
+        代理描画モードを返す
+        """
+        return self._quality.proxy
+
+    def setGovernor(self, mode):
+        """
+        品質ガバナーモードの設定
+        Trueの場合，フレームの描画時間を計測し，目標の描画時間を保つように
+        描画品質レベルを自動で上下させます．
+        - mode: 品質ガバナーモード
+        """
+        self._quality.governor = mode
+        if not mode:
+            self._quality.setLevel(0)
+        self.notice(False)
+        return
+
+    def getGovernor(self):
+        """
+        品質ガバナーモードを返す
+        """
+        return self._quality.governor
+
+    def setTargetFrameTime(self, t):
+        """
+        品質ガバナーの目標のフレーム描画時間の設定
+        - t: 目標の描画時間(秒)
+        """
+        self._quality.targetTime = t
+        return
+
+    def getTargetFrameTime(self):
+        """
+        品質ガバナーの目標のフレーム描画時間(秒)を返す
+        """
+        return self._quality.targetTime
+
+    def setQualityLevel(self, level):
+        """
+        描画品質レベルの設定
+        0が最高品質です．ガバナーモードの場合は次のフレーム以降の
+        描画時間によって変更されます．
+        - level: 描画品質レベル
+        """
+        self._quality.setLevel(level)
+        self.notice(False)
+        return
+
+    def getQualityLevel(self):
+        """
+        描画品質レベルを返す
+        """
+        return self._quality.getLevel()
+
+    def getFrameTimes(self):
+        """
+        フレーム毎の描画時間の履歴を返す
+        古いフレームから順に(描画時間(秒), 品質レベル)のタプルを並べた
+        リストを返します．
+        """
+        return self._quality.getHistory()
+
+    def setProfileMode(self, mode):
+        """
+        レンダリングプロファイルモードの設定
+        Trueの場合，フレーム毎にノード毎の描画時間，描画呼び出し数，
+        頂点数，ディスプレイリストの再作成数，状態変更数を記録します．
+        - mode: レンダリングプロファイルモード
+        """
+        self._profiling = mode
+        return
+
+    def getProfileMode(self):
+        """
+        レンダリングプロファイルモードを返す
+        """
+        return self._profiling
+
+    def getRenderReport(self):
+        """
+        直前のフレームのプロファイル結果を返す
+        profiler.RenderProfiler.getReport()の辞書を返します．
+        記録が無い場合はNoneを返します．
+        """
+        return self._profiler.getReport()
+
+    def getProfiler(self):
+        """
+        レンダリングプロファイラ(profiler.RenderProfiler)を返す
+        """
+        return self._profiler
+
+    def getRenderQuality(self):
+        """
+        描画品質(quality.RenderQuality)を返す
+        """
+        return self._quality
+
+    def getGLStateStat(self):
+        """
+        直前のフレームのOpenGLステートキャッシュ統計値を返す
+        (発行した状態変更数, 冗長として破棄した状態変更数)のタプルを
+        返します.
+        """
+        return self._glState.getStat()
+
+    def setTile(self, tile):
+        """
+        タイル描画の設定
+        描画領域に，全体の画像のうち指定したタイルの部分を描画します.
+        描画時の視界のアスペクト比は全体の画像のものとなり，前面表示
+        オブジェクトと背景画像も全体の画像に対して配置されます.
+        - tile: (全体の幅, 全体の高さ, タイルのX, タイルのY, 幅, 高さ)
+                (pixels, 左下原点)．Noneの場合はタイル描画を行いません
+        """
+        if tile is None:
+            self._tile = None
+            self._frustum.SetTile(None)
+            return True
+        (W, H, x, y, w, h) = [int(v) for v in tile[0:6]]
+        if W < 1 or H < 1 or w < 1 or h < 1: return False
+        self._frustum.SetTile((2.0*x/W - 1.0, 2.0*y/H - 1.0,
+                               2.0*(x+w)/W - 1.0, 2.0*(y+h)/H - 1.0))
+        self._tile = (W, H, x, y, w, h)
+        return True
+
+    def getTile(self):
+        """
+        タイル描画の設定を返す
+        """
+        return self._tile
+
+    def setSizeScale(self, s):
+        """
+        点サイズと線幅の倍率の設定
+        画面表示より高い解像度で描画する場合に，点と線の見かけの太さを
+        画面表示と揃えるために使用します.
+        - s: 倍率
+        """
+        if s <= 0.0: return
+        self._sizeScale = float(s)
+        self.notice()
+
+    def getSizeScale(self):
+        """
+        点サイズと線幅の倍率を返す
+        """
+        return self._sizeScale
+
     def setBgColor(self, bgc):
         """
         背景色の設定
@@ -350,6 +703,100 @@ class Camera(Base):
         セレクションテスト結果バッファをクリアします.
         """
         self._selected = []
+        self._picker.hits = []
+
+    def setCPUPick(self, mode):
+        """
+        CPUピッキングモードを設定します.
+        Trueの場合，セレクションテストをID色による描画ではなく，
+        BVHを用いたCPU上のレイキャストと交差判定で行います.
+        - mode: CPUピッキングモード
+        """
+        self._cpuPick = mode
+
+    def getCPUPick(self):
+        """
+        CPUピッキングモードを返します.
+        """
+        return self._cpuPick
+
+    def getPickHits(self):
+        """
+        CPUピッキングによる最後のセレクションテストのヒット情報
+        (pick.PickHit)のリストを，近い順に返します.
+        セレクション領域の中心を通るレイと交差した三角形の面番号，
+        重心座標，交点が格納されます.
+        """
+        return self._picker.hits
+
+    def setCPUFeedback(self, mode, depthTest =False):
+        """
+        CPUフィードバックモードを設定します.
+        Trueの場合，フィードバックテストをID色による描画ではなく，
+        頂点の投影とCPU上の交差判定で行います.
+        depthTestがTrueの場合，描画毎にデプスバッファを読み出し，
+        直前の描画で隠れていた要素をフィードバックテストの結果から除きます.
+        - mode: CPUフィードバックモード
+        - depthTest: デプステストモード
+        """
+        self._cpuFeedback = mode
+        self._feedbackEngine.depthTest = depthTest
+        if not depthTest:
+            self._feedbackEngine.setDepthBuffer(None, None)
+
+    def getCPUFeedback(self):
+        """
+        CPUフィードバックモードを返します.
+        """
+        return self._cpuFeedback
+
+    def setIDBufferCache(self, mode, prefetch =False):
+        """
+        IDバッファキャッシュモードを設定します.
+        Trueの場合，セレクションテスト用のID色描画をビューポートと同じ
+        大きさのオフスクリーンバッファに一度だけ行い，シーンの変更または
+        カメラの移動まで再利用します.
+        prefetchがTrueの場合，キャッシュが無効な状態で視点が直前の描画から
+        変わっていない(視点の操作中でない)描画の最後に，ID色描画と非同期の
+        読み出しを開始し，次のセレクションテストでの待ち時間を減らします.
+        アイドル時のタイマー等からprefetchIDBuffer()を呼び出すこともできます.
+        - mode: IDバッファキャッシュモード
+        - prefetch: 先読みモード
+        """
+        self._idCache = mode
+        self._idPrefetch = prefetch
+        self._idViewKey = None
+        self._idBuffer.invalidate()
+
+    def prefetchIDBuffer(self):
+        """
+        IDバッファの先読みを行います.
+        IDバッファキャッシュモードでキャッシュが無効な場合に，ID色描画と
+        非同期の読み出しを開始します. 描画領域のコンテキストが
+        カレントである必要があります.
+        """
+        if not self._idCache or not self._da or self._tile: return
+        Viewp = self._da._viewport
+        key = self.__idBufferKey(Viewp)
+        if self._idBuffer.isValid(key): return
+        vp = glGetIntegerv(GL_VIEWPORT)
+        self._idBuffer.refresh(self.renderSelectionPass, Viewp, key, False)
+        glViewport(vp[0], vp[1], vp[2], vp[3])
+
+    def getIDBufferCache(self):
+        """
+        IDバッファキャッシュモードを返します.
+        """
+        return self._idCache
+
+    def __idBufferKey(self, Viewp):
+        """
+        IDバッファのキャッシュのキーを返します.
+        - Viewp: ビューポート
+        """
+        asp = 1.0 if Viewp[3] < 1 else float(Viewp[2]) / float(Viewp[3])
+        return (tuple(self.getProjMatrix(asp).m_v),
+                tuple(self.getModelMatrix().m_v), tuple(Viewp))
 
     def relaxFeedback(self):
         """
@@ -494,6 +941,7 @@ class Camera(Base):
         シーンおよび前面表示オブジェクトから、指定されたIDのノードを検索します.
         - id: 検索するノードID
         """
+        pnode = None
         if self._scene: pnode = self._scene.getNodeById(id)
         if pnode != None: return pnode
         if self._front: pnode = self._front.getNodeById(id)
@@ -509,6 +957,7 @@ class Camera(Base):
         最初に見つかったノードを返します.
         - name: 検索するノードの名前
         """
+        pnode = None
         if self._scene: pnode = self._scene.getNodeByName(name)
         if pnode != None: return pnode
         if self._front: pnode = self._front.getNodeByName(name)
@@ -557,8 +1006,10 @@ class Camera(Base):
         """
         変更通知
         表示内容が変更されたことをDrawAreaに通知します.
+        セレクションテスト用IDバッファのキャッシュを無効化します.
         - invalidateDL: ディスプレイリスト無効化フラグ
         """
+        self._idBuffer.invalidate()
         if self._da:
             self._da.notice(invalidateDL)
 
@@ -575,9 +1026,8 @@ class Camera(Base):
         OpenGLディスプレイリストの破棄
         再起的に全てのノードのOpenGLディスプレイリストを破棄します.
         """
-        self._scene.clearDispList()
-        self._front.clearDispList()
-        self._bgImage.clearDispList()
+        for n in (self._scene, self._front, self._bgImage):
+            if n is not None: n.clearDispList()
 
     def sweepZoom(self, p0, p1):
         """
@@ -610,9 +1060,17 @@ class Camera(Base):
         glPolygonMode(GL_FRONT, GL_FILL)
 
         if self._bgImage and self._bgImage.isDrawable():
-            Viewp = self._da._viewport
-            self._bgImage.fitSize[0] = Viewp[2]
-            self._bgImage.fitSize[1] = Viewp[3]
+            if self._tile:
+                (W, H, x, y) = self._tile[0:4]
+                self._bgImage.fitSize[0] = W
+                self._bgImage.fitSize[1] = H
+                self._bgImage.windowPos = \
+                    (-x, H - y if self._bgImage.invY else -y)
+            else:
+                Viewp = self._da._viewport
+                self._bgImage.fitSize[0] = Viewp[2]
+                self._bgImage.fitSize[1] = Viewp[3]
+                self._bgImage.windowPos = None
             self._bgImage.renderSolid()
         else:
             glColor4fv(self._bgColor)
@@ -641,12 +1099,19 @@ class Camera(Base):
         glPushMatrix()
         glLoadIdentity()
 
-        psz = self._da.getSize()
+        if self._tile:
+            psz = Point2(self._tile[0], self._tile[1])
+            glMultMatrixf(self._frustum.GetTileMatrix().m_v)
+        else:
+            psz = self._da.getSize()
         if psz.y <= 0:
             asp = 1.0
         else:
             asp = float(psz.x) / float(psz.y)
             glOrtho(-asp, asp, -1.0, 1.0, -50.0, 50.0)
+        GfxNode.SetFrontAspect(asp)
+        self._glState.invalidate()
+        GfxNode.SetGLState(self._glState)
 
         glClear(GL_DEPTH_BUFFER_BIT)
         glEnable(GL_LIGHT0)
@@ -666,6 +1131,8 @@ class Camera(Base):
         self._front.render_(True)
         glDepthMask(GL_TRUE)
         glDisable(GL_BLEND)
+        GfxNode.SetFrontAspect(None)
+        GfxNode.SetGLState(None)
 
         glPopMatrix()
         glMatrixMode(GL_PROJECTION)
@@ -679,28 +1146,12 @@ class Camera(Base):
         """
         pass
 
-    def selection(self, cx, cy, w, h):
+    def renderSelectionPass(self, Viewp):
         """
-        セレクションテスト
-        セレクションテストを実行し、ヒットしたノード数を返します.
-        エラーの場合は-1を返します.
-        セレクション領域はスクリーン座標((0,0)は描画領域の左上隅)で指定します.
-        セレクションテストの結果は_selectedに格納されます．
-        - cx: セレクション領域の中心のX座標
-        - cy: セレクション領域の中心のY座標
-        - w: セレクション領域の幅
-        - h: セレクション領域の高さ
+        セレクションテスト用レンダリング
+        現在のフレームバッファをクリアし，シーンをID色で描画します.
+        - Viewp: ビューポート(x, y, 幅, 高さ)
         """
-        # not relaxed
-        if len(self._selected) > 0: return -1
-
-        # Get Viewport of Screen
-        if self._da == None: return -1
-        Viewp = self._da._viewport
-
-        # context
-        self._da._canvas.SetCurrentCtx()
-
         #---- Rendering for selection ----
         glClearColor(0.0, 0.0, 0.0, 0.0)
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
@@ -737,22 +1188,65 @@ class Camera(Base):
         if self._scene:
             self._scene.renderSelection()
         glFlush()
+        return
+
+    def selection(self, cx, cy, w, h):
+        """
+        セレクションテスト
+        セレクションテストを実行し、ヒットしたノード数を返します.
+        エラーの場合は-1を返します.
+        セレクション領域はスクリーン座標((0,0)は描画領域の左上隅)で指定します.
+        セレクションテストの結果は_selectedに格納されます．
+        - cx: セレクション領域の中心のX座標
+        - cy: セレクション領域の中心のY座標
+        - w: セレクション領域の幅
+        - h: セレクション領域の高さ
+        """
+        # not relaxed
+        if len(self._selected) > 0: return -1
+
+        # Get Viewport of Screen
+        if self._da == None: return -1
+        Viewp = self._da._viewport
+
+        # CPU picking
+        if self._cpuPick:
+            asp = 1.0 if Viewp[3] < 1 else float(Viewp[2]) / float(Viewp[3])
+            self._selected = self._picker.select(
+                self._scene, self.getProjMatrix(asp), self.getModelMatrix(),
+                Viewp, cx, cy, w, h)
+            return len(self._selected)
 
-        # read pixel color and depth
+        # context
+        self._da.makeCurrent()
         halfw = int(w/2)
         halfh = int(h/2)
-        pixel = glReadPixels(cx -halfw, cy -halfh, w, h, \
-                             GL_RGB, GL_UNSIGNED_BYTE)
-        depth = glReadPixels(cx -halfw, cy -halfh, w, h, \
-                             GL_DEPTH_COMPONENT, GL_FLOAT)
-        p_arr = pixels_to_numpy(pixel, w, h, 3)
-        d_arr = depth_to_numpy(depth, w, h)
 
-        # generate id list from color list
-        r = p_arr[:, 0].astype(int)
-        g = p_arr[:, 1].astype(int)
-        b = p_arr[:, 2].astype(int)
-        id_arr = r + g * 256 + b * 256 * 256
+        if self._idCache:
+            # cached ID buffer
+            key = self.__idBufferKey(Viewp)
+            if not self._idBuffer.isValid(key):
+                self._idBuffer.refresh(self.renderSelectionPass, Viewp, key)
+            ret = self._idBuffer.lookup(cx -halfw -Viewp[0],
+                                        cy -halfh -Viewp[1], w, h)
+            if ret is None: return -1
+            (id_arr, d_arr) = ret
+        else:
+            self.renderSelectionPass(Viewp)
+
+            # read pixel color and depth
+            pixel = glReadPixels(cx -halfw, cy -halfh, w, h, \
+                                 GL_RGB, GL_UNSIGNED_BYTE)
+            depth = glReadPixels(cx -halfw, cy -halfh, w, h, \
+                                 GL_DEPTH_COMPONENT, GL_FLOAT)
+            p_arr = pixels_to_numpy(pixel, w, h, 3)
+            d_arr = depth_to_numpy(depth, w, h)
+
+            # generate id list from color list
+            r = p_arr[:, 0].astype(int)
+            g = p_arr[:, 1].astype(int)
+            b = p_arr[:, 2].astype(int)
+            id_arr = r + g * 256 + b * 256 * 256
 
         # sort id list(> 0) via depth
         mask = id_arr > 0
@@ -787,7 +1281,7 @@ class Camera(Base):
         Viewp = self._da._viewport
 
         # context
-        self._da._canvas.SetCurrentCtx()
+        self._da.makeCurrent()
 
         # check feedback target
         tobj = self.getNodeById(target)
@@ -796,6 +1290,15 @@ class Camera(Base):
         NumIndices = tobj.getNumIndices()
         if NumVerts < 1 and NumIndices < 1: return 0
 
+        # CPU feedback
+        if self._cpuFeedback:
+            asp = 1.0 if Viewp[3] < 1 else float(Viewp[2]) / float(Viewp[3])
+            M = self._da.getViewportMatrix() * self.getProjMatrix(asp)
+            if not self.accumMatrix(target, M): return -1
+            self._feedbacked = self._feedbackEngine.query(
+                tobj, M, Viewp, cx, cy, w, h)
+            return len(self._feedbacked)
+
         #---- Rendering for feedback ----
         glClearColor(0.0, 0.0, 0.0, 0.0)
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
@@ -185,6 +185,13 @@ class DrawArea(object):
         """
         return Point2()
 
+    def makeCurrent(self):
+        """
+        描画コンテキストをカレントにする
+        派生クラスで実装されます
+        """
+        pass
+
     def drawRB(self, p0, p1):
         """
         描画領域内にラバーボックスを描く
@@ -0,0 +1,432 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+vfr scene-graph library
+
+Copyright(c) YoH, 2026, All Right Reserved.
+
+オフスクリーン描画領域
+ウインドウシステムを使わずに，EGLのpbufferまたはOSMesa(ソフトウェア
+Mesa)のコンテキストへ描画します．
+PyOpenGLはOpenGLの関数をプラットフォーム毎に解決するため，
+このモジュールはOpenGLモジュールより先にimportする必要があります．
+使用するバックエンドは環境変数VFR_OFFSCREEN('egl'または'osmesa'，
+既定は'egl')で選択し，PYOPENGL_PLATFORMが設定されていない場合は
+同じ値を設定します．VFR_OFFSCREENが設定されていない場合は，EGLの
+ディスプレイを初期化できるかを調べ，できなければOSMesaを使用します．
+"""
+import os, sys
+import ctypes as C
+import ctypes.util
+
+
+"""EGLのプラットフォーム(EGL_EXT_platform_device, EGL_MESA_platform_surfaceless)"""
+EGL_PLATFORM_DEVICE_EXT = 0x313F
+EGL_PLATFORM_SURFACELESS_MESA = 0x31DD
+
+def _LoadLibEGL():
+    """
+    libEGLのロード
+    ロードできない場合はNoneを返します．
+    """
+    path = ctypes.util.find_library('EGL')
+    try:
+        lib = C.CDLL(path if path else 'libEGL.so.1')
+    except OSError:
+        return None
+    lib.eglGetProcAddress.restype = C.c_void_p
+    lib.eglGetProcAddress.argtypes = [C.c_char_p]
+    lib.eglGetDisplay.restype = C.c_void_p
+    lib.eglGetDisplay.argtypes = [C.c_void_p]
+    lib.eglInitialize.restype = C.c_uint
+    lib.eglInitialize.argtypes = [C.c_void_p,
+                                  C.POINTER(C.c_int), C.POINTER(C.c_int)]
+    lib.eglTerminate.restype = C.c_uint
+    lib.eglTerminate.argtypes = [C.c_void_p]
+    return lib
+
+def _EGLDisplays(lib):
+    """
+    EGLディスプレイ候補の列挙
+    ディスプレイを持たない計算ノードでも初期化できるように，
+    eglGetPlatformDisplayEXTによるデバイス(GPU)，surfacelessの順に
+    ディスプレイを返し，最後にEGL_DEFAULT_DISPLAYを返します．
+    - lib: _LoadLibEGL()のlibEGL
+    """
+    addr = lib.eglGetProcAddress(b'eglGetPlatformDisplayEXT')
+    if addr:
+        getPlatformDisplay = C.CFUNCTYPE(C.c_void_p, C.c_uint, C.c_void_p,
+                                         C.c_void_p)(addr)
+        addr = lib.eglGetProcAddress(b'eglQueryDevicesEXT')
+        if addr:
+            queryDevices = C.CFUNCTYPE(C.c_uint, C.c_int,
+                                       C.POINTER(C.c_void_p),
+                                       C.POINTER(C.c_int))(addr)
+            n = C.c_int(0)
+            if queryDevices(0, None, C.byref(n)) and n.value > 0:
+                devs = (C.c_void_p * n.value)()
+                if queryDevices(n.value, devs, C.byref(n)):
+                    for i in range(n.value):
+                        dpy = getPlatformDisplay(EGL_PLATFORM_DEVICE_EXT,
+                                                 devs[i], None)
+                        if dpy: yield dpy
+        dpy = getPlatformDisplay(EGL_PLATFORM_SURFACELESS_MESA, None, None)
+        if dpy: yield dpy
+    dpy = lib.eglGetDisplay(None)
+    if dpy: yield dpy
+    return
+
+def _InitEGLDisplay(lib):
+    """
+    EGLディスプレイの初期化
+    _EGLDisplays()の候補のうち，初期化できた最初のディスプレイを
+    返します．いずれも初期化できない場合はNoneを返します．
+    - lib: _LoadLibEGL()のlibEGL
+    """
+    if lib is None: return None
+    major, minor = C.c_int(), C.c_int()
+    for dpy in _EGLDisplays(lib):
+        if lib.eglInitialize(dpy, C.byref(major), C.byref(minor)):
+            return dpy
+    return None
+
+def _ProbeEGL():
+    """
+    EGLが使用可能かを調べる
+    """
+    lib = _LoadLibEGL()
+    dpy = _InitEGLDisplay(lib)
+    if dpy is None: return False
+    lib.eglTerminate(dpy)
+    return True
+
+if not 'OpenGL' in sys.modules and not 'PYOPENGL_PLATFORM' in os.environ:
+    if 'VFR_OFFSCREEN' in os.environ:
+        os.environ['PYOPENGL_PLATFORM'] = os.environ['VFR_OFFSCREEN']
+    else:
+        os.environ['PYOPENGL_PLATFORM'] = 'egl' if _ProbeEGL() else 'osmesa'
+
+import numpy as N
+from OpenGL.GL import *
+from .gfxNode import *
+from .drawArea import DrawArea
+from . import trace
+
+
+#----------------------------------------------------------------------
+class EGLContext(object):
+    """
+    EGLオフスクリーンコンテキストクラス
+    EGLのpbufferサーフェスを描画先とするOpenGLコンテキストです．
+      _dpy: EGLディスプレイ
+      _cfg: EGLフレームバッファ設定
+      _surf: pbufferサーフェス
+      _ctx: EGLコンテキスト
+    """
+    def __init__(self, width, height):
+        self._ctx = None
+        self._surf = None
+        from OpenGL import EGL
+        self._egl = EGL
+        dpy = _InitEGLDisplay(_LoadLibEGL())
+        if dpy is None:
+            raise RuntimeError('EGLContext: eglInitialize failed')
+        self._dpy = C.cast(C.c_void_p(dpy), EGL.EGLDisplay)
+        attrs = [EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+                 EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8,
+                 EGL.EGL_BLUE_SIZE, 8, EGL.EGL_ALPHA_SIZE, 8,
+                 EGL.EGL_DEPTH_SIZE, 24,
+                 EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+                 EGL.EGL_NONE]
+        attrs = (EGL.EGLint * len(attrs))(*attrs)
+        self._cfg = EGL.EGLConfig()
+        n = EGL.EGLint()
+        if not EGL.eglChooseConfig(self._dpy, attrs, C.pointer(self._cfg), 1,
+                                   C.pointer(n)) or n.value < 1:
+            raise RuntimeError('EGLContext: no matching EGLConfig')
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        self._ctx = EGL.eglCreateContext(self._dpy, self._cfg,
+                                         EGL.EGL_NO_CONTEXT, None)
+        if not self._ctx:
+            self._ctx = None
+            EGL.eglTerminate(self._dpy)
+            raise RuntimeError('EGLContext: eglCreateContext failed')
+        self.resize(width, height)
+        return
+
+    def resize(self, width, height):
+        """
+        描画先サイズの変更
+        pbufferサーフェスを作り直し，カレントにします．
+        - width, height: 描画先サイズ(pixels)
+        """
+        EGL = self._egl
+        if self._surf:
+            EGL.eglMakeCurrent(self._dpy, EGL.EGL_NO_SURFACE,
+                               EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+            EGL.eglDestroySurface(self._dpy, self._surf)
+        pb = (EGL.EGLint * 5)(EGL.EGL_WIDTH, width, EGL.EGL_HEIGHT, height,
+                              EGL.EGL_NONE)
+        self._surf = EGL.eglCreatePbufferSurface(self._dpy, self._cfg, pb)
+        if not self._surf:
+            raise RuntimeError('EGLContext: eglCreatePbufferSurface failed')
+        self.makeCurrent()
+        return
+
+    def makeCurrent(self):
+        """
+        コンテキストをカレントにする
+        """
+        return bool(self._egl.eglMakeCurrent(self._dpy, self._surf,
+                                             self._surf, self._ctx))
+
+    def destroy(self):
+        """
+        コンテキストの破棄
+        """
+        EGL = self._egl
+        if self._ctx is None: return
+        EGL.eglMakeCurrent(self._dpy, EGL.EGL_NO_SURFACE,
+                           EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+        if self._surf:
+            EGL.eglDestroySurface(self._dpy, self._surf)
+        EGL.eglDestroyContext(self._dpy, self._ctx)
+        EGL.eglTerminate(self._dpy)
+        self._surf = None
+        self._ctx = None
+        return
+
+
+#----------------------------------------------------------------------
+class OSMesaContext(object):
+    """
+    OSMesaオフスクリーンコンテキストクラス
+    ソフトウェアMesaのメモリ上のバッファを描画先とするOpenGL
+    コンテキストです．
+      _ctx: OSMesaコンテキスト
+      _buf: 描画先バッファ
+      _size: 描画先サイズ(幅, 高さ)
+    """
+    def __init__(self, width, height):
+        self._ctx = None
+        from OpenGL import osmesa
+        self._osmesa = osmesa
+        self._ctx = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA,
+                                                  24, 0, 0, None)
+        if not self._ctx:
+            self._ctx = None
+            raise RuntimeError('OSMesaContext: OSMesaCreateContext failed')
+        self._buf = None
+        self._size = (0, 0)
+        self.resize(width, height)
+        return
+
+    def resize(self, width, height):
+        """
+        描画先サイズの変更
+        描画先バッファを確保し直し，カレントにします．
+        - width, height: 描画先サイズ(pixels)
+        """
+        from OpenGL import arrays
+        self._buf = arrays.GLubyteArray.zeros((height, width, 4))
+        self._size = (width, height)
+        if not self.makeCurrent():
+            raise RuntimeError('OSMesaContext: OSMesaMakeCurrent failed')
+        return
+
+    def makeCurrent(self):
+        """
+        コンテキストをカレントにする
+        """
+        return bool(self._osmesa.OSMesaMakeCurrent(
+            self._ctx, self._buf, GL_UNSIGNED_BYTE,
+            self._size[0], self._size[1]))
+
+    def destroy(self):
+        """
+        コンテキストの破棄
+        """
+        if self._ctx is None: return
+        self._osmesa.OSMesaDestroyContext(self._ctx)
+        self._ctx = None
+        self._buf = None
+        return
+
+
+"""オフスクリーンコンテキストのバックエンド"""
+_contextClass = {'egl': EGLContext, 'osmesa': OSMesaContext}
+
+def CreateContext(width, height, backend =None):
+    """
+    オフスクリーンコンテキストの作成
+    PyOpenGLのプラットフォームはimport時に決まるため，バックエンドは
+    import時のPYOPENGL_PLATFORMのものに限られます．別のバックエンドを
+    使用する場合は，import前にVFR_OFFSCREENを設定します．
+    - width, height: 描画先サイズ(pixels)
+    - backend: 'egl'または'osmesa'．Noneの場合はPYOPENGL_PLATFORMに
+               従います
+    """
+    platform = os.environ.get('PYOPENGL_PLATFORM')
+    if backend is None:
+        backend = platform
+    if not backend in _contextClass:
+        raise RuntimeError('CreateContext: unsupported backend: {}'\
+                           .format(backend))
+    if backend != platform:
+        raise RuntimeError('CreateContext: backend {} does not match '
+                           'PYOPENGL_PLATFORM={}; set VFR_OFFSCREEN before '
+                           'importing OpenGL'.format(backend, platform))
+    return _contextClass[backend](width, height)
+
+
+#----------------------------------------------------------------------
+class DrawAreaOffscreen(DrawArea):
+    """
+    オフスクリーン描画領域クラス
+    ウインドウを持たないDrawAreaクラスの実装です．
+    カメラとシーンをオフスクリーンコンテキストに描画し，
+    結果をNumPy配列として取り出します．
+      _size: 描画領域のサイズ(pixels)
+      _ctx: オフスクリーンコンテキスト(EGLContext, OSMesaContext)
+      _noticeFlag: 描画内容変更フラグ
+    """
+    def __init__(self, width =640, height =480, backend =None):
+        """
+        - width, height: 描画領域のサイズ(pixels)
+        - backend: 'egl'または'osmesa'(CreateContext参照)
+        """
+        DrawArea.__init__(self)
+        self._size = Point2(width, height)
+        self._ctx = None
+        self._ctx = CreateContext(width, height, backend)
+        self._noticeFlag = False
+        self.resized()
+        return
+
+    def __del__(self):
+        self.destroy()
+
+    def destroy(self):
+        """
+        オフスクリーンコンテキストの破棄
+        """
+        if self._ctx:
+            self._ctx.destroy()
+            self._ctx = None
+        return
+
+    def makeCurrent(self):
+        """
+        描画コンテキストをカレントにする
+        """
+        if self._ctx:
+            self._ctx.makeCurrent()
+        return
+
+    @trace.Traced('DrawAreaOffscreen.redraw', 'render')
+    def redraw(self):
+        """
+        再描画を行う
+        OpenGLによるシーングラフ描画を行い，描画の完了を待ちます．
+        """
+        DrawArea.redraw(self)
+        if self._ctx is None: return
+        self.makeCurrent()
+
+        glClearColor(0.0, 0.0, 0.0, 0.0)
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        if self._camera:
+            glEnable(GL_SCISSOR_TEST)
+            glViewport(self._viewport[0], self._viewport[1],
+                       self._viewport[2], self._viewport[3])
+            glScissor(self._viewport[0], self._viewport[1],
+                      self._viewport[2], self._viewport[3])
+            if self._viewport[3] < 1:
+                self._camera.redraw()
+            else:
+                asp = float(self._viewport[2]) / float(self._viewport[3])
+                self._camera.redraw(asp)
+            glDisable(GL_SCISSOR_TEST)
+        glFinish()
+
+        self._noticeFlag = False
+        return
+
+    def notice(self, invalidateDL =True):
+        """
+        描画内容の変更通知を行う
+        """
+        self._noticeFlag = True
+
+    def chkNotice(self):
+        """
+        描画内容の変更検査を行う
+        描画内容変更フラグがTrueの場合は再描画します．
+        """
+        if self._noticeFlag:
+            self.redraw()
+        return
+
+    def rumor(self):
+        """
+        カメラからの破壊通知を受付ける
+        """
+        self._camera = None
+
+    def getSize(self):
+        """
+        描画領域のサイズ(pixels)を返す
+        """
+        return Point2(self._size.x, self._size.y)
+
+    def setSize(self, width, height):
+        """
+        描画領域のサイズの変更
+        - width, height: 描画領域のサイズ(pixels)
+        """
+        if self._size.x == width and self._size.y == height: return
+        self._size = Point2(width, height)
+        if self._ctx:
+            self._ctx.resize(width, height)
+        self.resized()
+        self.notice()
+        return
+
+    #-------- readback interface --------
+    def getImage(self):
+        """
+        描画結果の画像を返す
+        形状(高さ, 幅, 4)のuint8のRGBA配列を，上の行から順に返します．
+        """
+        w, h = self._size.x, self._size.y
+        self.makeCurrent()
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        buf = glReadPixels(0, 0, w, h, GL_RGBA, GL_UNSIGNED_BYTE)
+        if isinstance(buf, bytes):
+            img = N.frombuffer(buf, dtype=N.uint8)
+        else:
+            img = N.asarray(buf, dtype=N.uint8)
+        return img.reshape((h, w, 4))[::-1].copy()
+
+    def getDepth(self):
+        """
+        描画結果のデプスを返す
+        形状(高さ, 幅)のfloat32配列(0.0〜1.0)を，上の行から順に返します．
+        """
+        w, h = self._size.x, self._size.y
+        self.makeCurrent()
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        buf = glReadPixels(0, 0, w, h, GL_DEPTH_COMPONENT, GL_FLOAT)
+        if isinstance(buf, bytes):
+            dep = N.frombuffer(buf, dtype=N.float32)
+        else:
+            dep = N.asarray(buf, dtype=N.float32)
+        return dep.reshape((h, w))[::-1].copy()
+
+    def render(self):
+        """
+        描画と画像の取得
+        再描画を行い，getImage()の画像を返します．
+        """
+        self.redraw()
+        return self.getImage()
@@ -14,6 +14,7 @@ from sys import platform
 from .gfxNode import *
 from .events import *
 from .drawArea import DrawArea
+from . import trace
 
 
 """マウスイベント修飾キータイプ"""
@@ -241,6 +242,7 @@ class DrawAreaWx(DrawArea):
         del self._canvas
 
     
+    @trace.Traced('DrawAreaWx.redraw', 'render')
     def redraw(self):
         """
         再描画を行う
@@ -313,6 +315,15 @@ class DrawAreaWx(DrawArea):
             size.y = wsz.y
         return size
 
+    def makeCurrent(self):
+        """
+        描画コンテキストをカレントにする
+        _canvasのOpenGLコンテキストをカレントにします．
+        """
+        if self._canvas:
+            self._canvas.SetCurrentCtx()
+        return
+
     def drawImmediate(self):
         """
         イミディアットモードでの描画
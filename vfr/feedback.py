@@ -0,0 +1,351 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+vfr scene-graph library
+
+Copyright(c) YoH, 2026, All Right Reserved.
+
+CPUフィードバック
+ID色によるフィードバック描画とglReadPixelsの代わりに，ターゲットノードの
+頂点をNumPyで一括して画面に投影し，頂点・辺・面とフィードバック領域の
+交差判定をCPU上で行います．
+頂点の判定には画面を格子に分割したScreenGridを用い，100万点規模の
+点群でも矩形内の頂点をミリ秒単位で求めます．投影結果と格子は
+ノードの_feedbackCacheにキャッシュし，行列・ビューポートが変わるか
+ノードのnotice()で破棄されます．
+直前に描画したデプスバッファとの比較(デプステスト)を有効にすると，
+隠れた要素を除くことができます．
+"""
+import numpy as N
+
+
+#----------------------------------------------------------------------
+def ProjectVerts(verts, M):
+    """
+    頂点座標の一括投影
+    (ウインドウ座標(頂点数, 3), 有効フラグ)を返します．視点の後ろ(w<=0)の
+    頂点は無効とします．
+    - verts: 頂点座標配列(頂点数, 3)
+    - M: ローカル座標系からウインドウ座標への変換行列(utilMath.Mat4)
+    """
+    R = N.asarray(M.m_v, dtype=N.float64).reshape((4,4))
+    c = N.dot(N.asarray(verts, dtype=N.float64).reshape((-1, 3)), R[0:3])
+    c += R[3]
+    valid = c[:, 3] > 0.0
+    w = N.where(valid, c[:, 3], 1.0)
+    return (c[:, 0:3] / w[:, None], valid)
+
+def ClipSegments(a, b, rect):
+    """
+    線分群と矩形の交差判定(Liang-Barsky法)
+    (交差フラグ, 矩形内の区間の開始パラメータ, 終了パラメータ)の配列の
+    タプルを返します．
+    - a, b: 形状(線分数, 2以上)の線分の端点(XY座標を使用)
+    - rect: 矩形(x0, y0, x1, y1)
+    """
+    d = b[:, 0:2] - a[:, 0:2]
+    t0 = N.zeros((len(a),))
+    t1 = N.ones((len(a),))
+    hit = N.ones((len(a),), dtype=bool)
+    for (k, lo, hi) in ((0, rect[0], rect[2]), (1, rect[1], rect[3])):
+        p = a[:, k]
+        dk = d[:, k]
+        par = dk == 0.0
+        hit &= ~(par & ((p < lo) | (p > hi)))
+        with N.errstate(divide='ignore', invalid='ignore'):
+            ta = (lo - p) / dk
+            tb = (hi - p) / dk
+        tn = N.where(par, 0.0, N.minimum(ta, tb))
+        tf = N.where(par, 1.0, N.maximum(ta, tb))
+        t0 = N.maximum(t0, tn)
+        t1 = N.minimum(t1, tf)
+    hit &= t0 <= t1
+    return (hit, t0, t1)
+
+
+#----------------------------------------------------------------------
+class ScreenGrid(object):
+    """
+    画面格子クラス
+    ウインドウ座標の点群を画面の格子に振り分け，矩形内の点を格子単位で
+    取り出します．点番号を格子番号順に並べた配列と，格子毎の開始位置の
+    配列で表します．
+      rect: 格子で覆う範囲(x0, y0, x1, y1)
+      cellSize: 格子の大きさ(pixels)
+      nx, ny: 格子数
+      index: 格子番号順に並べた点番号の配列
+      start: 格子毎のindexの開始位置の配列(格子数+1)
+    """
+    POINTS_PER_CELL = 16
+    MAX_CELLS = 1 << 20
+
+    def __init__(self, x, y, index, rect):
+        """
+        - x, y: 点のウインドウ座標の配列
+        - index: 振り分ける点番号の配列(rectの範囲内の点)
+        - rect: 格子で覆う範囲(x0, y0, x1, y1)
+        """
+        self.rect = rect
+        (w, h) = (max(1.0, rect[2] - rect[0]), max(1.0, rect[3] - rect[1]))
+        nc = min(ScreenGrid.MAX_CELLS,
+                 max(1, len(index) // ScreenGrid.POINTS_PER_CELL))
+        self.cellSize = max(1.0, (w * h / nc) ** 0.5)
+        self.nx = int(w / self.cellSize) + 1
+        self.ny = int(h / self.cellSize) + 1
+        cid = self.cellIndex(x[index], y[index])
+        order = N.argsort(cid, kind='stable')
+        self.index = index[order]
+        cnt = N.bincount(cid, minlength=self.nx * self.ny)
+        self.start = N.zeros((self.nx * self.ny + 1,), dtype=N.int64)
+        N.cumsum(cnt, out=self.start[1:])
+        return
+
+    def cellIndex(self, x, y):
+        """
+        点の格子番号を返す
+        """
+        ix = N.clip(((x - self.rect[0]) / self.cellSize).astype(N.int64),
+                    0, self.nx - 1)
+        iy = N.clip(((y - self.rect[1]) / self.cellSize).astype(N.int64),
+                    0, self.ny - 1)
+        return iy * self.nx + ix
+
+    def query(self, rect):
+        """
+        矩形と重なる格子に含まれる点番号の配列を返す
+        矩形内かどうかの判定は呼び出し側で行います．
+        - rect: 矩形(x0, y0, x1, y1)
+        """
+        cs = self.cellSize
+        ix0 = max(0, int((rect[0] - self.rect[0]) // cs))
+        ix1 = min(self.nx - 1, int((rect[2] - self.rect[0]) // cs))
+        iy0 = max(0, int((rect[1] - self.rect[1]) // cs))
+        iy1 = min(self.ny - 1, int((rect[3] - self.rect[1]) // cs))
+        if ix0 > ix1 or iy0 > iy1:
+            return N.zeros((0,), dtype=N.int64)
+        rows = [self.index[self.start[j*self.nx + ix0]:
+                           self.start[j*self.nx + ix1 + 1]]
+                for j in range(iy0, iy1 + 1)]
+        return N.concatenate(rows)
+
+
+#----------------------------------------------------------------------
+class FeedbackEngine(object):
+    """
+    CPUフィードバッククラス
+    ノードのgetFeedbackElements()が返す頂点・辺・面とフィードバック領域の
+    交差判定を行います．座標はglReadPixelsと同じウインドウ座標
+    ((0,0)はウインドウの左下隅，デプス値は0.0〜1.0)です．
+      depthTest: デプステストモード
+      depthTolerance: デプステストの許容誤差
+      _depth: 直前に描画したデプスバッファ(形状(高さ, 幅)，下の行から順)
+      _depthViewport: デプスバッファのビューポート
+    """
+    def __init__(self):
+        self.depthTest = False
+        self.depthTolerance = 1.0e-4
+        self._depth = None
+        self._depthViewport = None
+        return
+
+    def setDepthBuffer(self, depth, viewport):
+        """
+        デプステスト用のデプスバッファの設定
+        depthまたはviewportがNoneの場合はデプスバッファを破棄します．
+        - depth: 形状(高さ, 幅)のデプス値の配列(下の行から順)
+        - viewport: デプスバッファのビューポート(x, y, 幅, 高さ)
+        """
+        if depth is None or viewport is None:
+            self._depth = None
+            self._depthViewport = None
+            return
+        self._depth = depth
+        self._depthViewport = tuple(viewport)
+        return
+
+    def projection(self, node, verts, M, viewport):
+        """
+        投影結果と画面格子を返す
+        (ウインドウ座標(頂点数, 3), 有効フラグ, ScreenGrid)を返します．
+        結果はノードの_feedbackCacheにキャッシュされます．
+        - node: ターゲットノード
+        - verts: 頂点座標配列(頂点数, 3)
+        - M: ローカル座標系からウインドウ座標への変換行列(utilMath.Mat4)
+        - viewport: ビューポート(x, y, 幅, 高さ)
+        """
+        key = (len(verts), node._feedbackMode, tuple(viewport),
+               tuple(M.m_v))
+        cache = getattr(node, '_feedbackCache', None)
+        if cache is not None and cache[0] == key:
+            return cache[1]
+        (p, valid) = ProjectVerts(verts, M)
+        # getViewportMatrix is top-down; flip to the glReadPixels convention
+        p[:, 1] = 2 * viewport[1] + viewport[3] - p[:, 1]
+        # getViewportMatrix leaves z in NDC [-1,1]; map to window depth [0,1]
+        p[:, 2] = (p[:, 2] + 1.0) * 0.5
+        valid &= (p[:, 2] >= 0.0) & (p[:, 2] <= 1.0)
+        rect = (viewport[0], viewport[1],
+                viewport[0] + viewport[2], viewport[1] + viewport[3])
+        inside = valid & (p[:, 0] >= rect[0]) & (p[:, 0] < rect[2]) \
+            & (p[:, 1] >= rect[1]) & (p[:, 1] < rect[3])
+        grid = ScreenGrid(p[:, 0], p[:, 1], N.nonzero(inside)[0], rect)
+        node._feedbackCache = (key, (p, valid, grid))
+        return (p, valid, grid)
+
+    def visible(self, x, y, z):
+        """
+        デプステスト
+        サンプル点がデプスバッファより手前(許容誤差内)にある場合に
+        Trueとなるフラグの配列を返します．デプスバッファの範囲外の点は
+        Trueとします．
+        - x, y, z: サンプル点のウインドウ座標の配列
+        """
+        vp = self._depthViewport
+        (h, w) = self._depth.shape
+        ix = N.floor(x - vp[0]).astype(N.int64)
+        iy = N.floor(y - vp[1]).astype(N.int64)
+        ok = (ix >= 0) & (ix < w) & (iy >= 0) & (iy < h)
+        ret = N.ones((len(x),), dtype=bool)
+        ret[ok] = z[ok] <= self._depth[iy[ok], ix[ok]] + self.depthTolerance
+        return ret
+
+    def query(self, node, M, viewport, cx, cy, w, h):
+        """
+        フィードバックテスト
+        フィードバック領域と交差する要素の番号を，デプス値の小さい順に
+        並べた配列を返します．デプステストが有効な場合は，直前の描画で
+        隠れていた要素を除きます．
+        - node: ターゲットノード
+        - M: ローカル座標系からウインドウ座標への変換行列(utilMath.Mat4)
+        - viewport: ビューポート(x, y, 幅, 高さ)
+        - cx, cy: フィードバック領域の中心
+        - w, h: フィードバック領域の幅と高さ
+        """
+        none = N.zeros((0,), dtype=int)
+        elems = node.getFeedbackElements()
+        if elems is None or len(elems[0]) < 1: return none
+        (verts, prims, ids) = elems
+        (p, valid, grid) = self.projection(node, verts, M, viewport)
+        x0 = cx - int(w/2)
+        y0 = cy - int(h/2)
+        rect = (x0, y0, x0 + w, y0 + h)
+        depthTest = self.depthTest and self._depth is not None
+
+        if prims is None:
+            # vertices
+            cand = grid.query(rect)
+            q = p[cand]
+            ok = (q[:, 0] >= rect[0]) & (q[:, 0] < rect[2]) \
+                & (q[:, 1] >= rect[1]) & (q[:, 1] < rect[3])
+            cand = cand[ok]
+            d = q[ok, 2]
+            if depthTest:
+                vis = self.visible(q[ok, 0], q[ok, 1], d)
+                (cand, d) = (cand[vis], d[vis])
+        else:
+            (cand, d) = self.__queryPrims(p, valid, prims, rect, depthTest)
+        if len(cand) < 1: return none
+        order = N.argsort(d, kind='stable')
+        cand = cand[order]
+        if ids is not None:
+            cand = ids[cand]
+        return N.asarray(cand, dtype=int)
+
+    def __queryPrims(self, p, valid, prims, rect, depthTest):
+        """
+        辺または面とフィードバック領域の交差判定
+        (要素番号の配列, デプス値の配列)を返します．要素のデプス値は
+        領域内のサンプル点(頂点，辺の領域内の区間の中点，領域の中心と
+        四隅)の最小値です．
+        - p: 頂点のウインドウ座標(頂点数, 3)
+        - valid: 頂点の有効フラグ
+        - prims: 頂点番号配列(要素数, 2または3)
+        - rect: フィードバック領域(x0, y0, x1, y1)
+        - depthTest: デプステストモード
+        """
+        nk = prims.shape[1]
+        # screen-space bounding box overlap
+        q = p[prims]
+        ok = valid[prims].all(axis=1)
+        ok &= (q[:, :, 0].max(axis=1) >= rect[0]) \
+            & (q[:, :, 0].min(axis=1) < rect[2]) \
+            & (q[:, :, 1].max(axis=1) >= rect[1]) \
+            & (q[:, :, 1].min(axis=1) < rect[3])
+        cand = N.nonzero(ok)[0]
+        q = q[cand]
+        n = len(cand)
+
+        # samples: (element, x, y, z)
+        sx, sy, sz, se = [], [], [], []
+        def sample(e, x, y, z):
+            se.append(e); sx.append(x); sy.append(y); sz.append(z)
+
+        for k in range(nk):
+            v = q[:, k]
+            inr = (v[:, 0] >= rect[0]) & (v[:, 0] < rect[2]) \
+                & (v[:, 1] >= rect[1]) & (v[:, 1] < rect[3])
+            sample(N.nonzero(inr)[0], v[inr, 0], v[inr, 1], v[inr, 2])
+        edges = [(0, 1)] if nk == 2 else [(0, 1), (1, 2), (2, 0)]
+        for (i, j) in edges:
+            (a, b) = (q[:, i], q[:, j])
+            (hit, t0, t1) = ClipSegments(a, b, rect)
+            tm = (t0[hit] + t1[hit]) * 0.5
+            m = a[hit] + (b[hit] - a[hit]) * tm[:, None]
+            sample(N.nonzero(hit)[0], m[:, 0], m[:, 1], m[:, 2])
+        if nk == 3:
+            # rectangle center and corners inside the triangle
+            (a, b, c) = (q[:, 0], q[:, 1], q[:, 2])
+            den = (b[:, 1] - c[:, 1]) * (a[:, 0] - c[:, 0]) \
+                + (c[:, 0] - b[:, 0]) * (a[:, 1] - c[:, 1])
+            nz = den != 0.0
+            den = N.where(nz, den, 1.0)
+            xm = (rect[0] + rect[2]) * 0.5
+            ym = (rect[1] + rect[3]) * 0.5
+            for (x, y) in ((xm, ym), (rect[0], rect[1]), (rect[2], rect[1]),
+                           (rect[0], rect[3]), (rect[2], rect[3])):
+                l0 = ((b[:, 1] - c[:, 1]) * (x - c[:, 0])
+                      + (c[:, 0] - b[:, 0]) * (y - c[:, 1])) / den
+                l1 = ((c[:, 1] - a[:, 1]) * (x - c[:, 0])
+                      + (a[:, 0] - c[:, 0]) * (y - c[:, 1])) / den
+                l2 = 1.0 - l0 - l1
+                inr = nz & (l0 >= 0.0) & (l1 >= 0.0) & (l2 >= 0.0)
+                z = l0 * a[:, 2] + l1 * b[:, 2] + l2 * c[:, 2]
+                # keep the sample on the rectangle's pixels
+                xs = min(x, rect[2] - 0.5)
+                ys = min(y, rect[3] - 0.5)
+                sample(N.nonzero(inr)[0], N.full((inr.sum(),), xs),
+                       N.full((inr.sum(),), ys), z[inr])
+
+        se = N.concatenate(se)
+        sx = N.concatenate(sx)
+        sy = N.concatenate(sy)
+        sz = N.concatenate(sz)
+        if depthTest and len(se) > 0:
+            vis = self.visible(sx, sy, sz)
+            (se, sz) = (se[vis], sz[vis])
+        depth = N.full((n,), N.inf)
+        N.minimum.at(depth, se, sz)
+        hit = N.isfinite(depth)
+        return (cand[hit], depth[hit])
+
+
+#----------------------------------------------------------------------
+if __name__ == '__main__':
+    # regression check: a vertex behind the depth buffer is dropped
+    class _M(object):
+        # NDC -> top-down window coordinates of a 4x4 viewport
+        # (DrawArea.getViewportMatrix; z stays in NDC)
+        m_v = N.array([2,0,0,0, 0,-2,0,0, 0,0,1,0, 2,2,0,1], dtype=N.float32)
+    class _Node(object):
+        _feedbackMode = 0
+        _feedbackCache = None
+        def getFeedbackElements(self):
+            # front (NDC z=-0.5) and back (NDC z=0.5) of a surface at z=0
+            return (N.array([[0.0, 0.0, -0.5], [0.0, 0.0, 0.5]]), None, None)
+    fe = FeedbackEngine()
+    vp = (0, 0, 4, 4)
+    assert list(fe.query(_Node(), _M(), vp, 2, 2, 2, 2)) == [0, 1]
+    fe.depthTest = True
+    fe.setDepthBuffer(N.full((4, 4), 0.5, dtype=N.float32), vp)
+    assert list(fe.query(_Node(), _M(), vp, 2, 2, 2, 2)) == [0]
+    print('feedback depth test: ok')
@@ -6,6 +6,7 @@ Copyright(c) YoH, 2026, All Right Reserved.
 
 """
 from .utilMath import *
+import numpy as N
 
 """視点タイプ"""
 (CYCLOP, LEFT_EYE, RIGHT_EYE) = range(3)
@@ -24,6 +25,8 @@ class Frustum(object):
      near/far: 視点から前後のクリップ面までの距離
      hpr: 視線方向の回転量。初期の視線方向は(0,0,-1)
           hprは初期視線方向に対するY軸,X軸,Z軸回りの回転量(deg)を表わす
+     tile: タイル描画する部分領域。視界全体を(-1,-1)-(1,1)とした
+           (x0, y0, x1, y1)。Noneの場合は視界全体
     """
 
     """ステレオ表示の左右視点の距離"""
@@ -39,6 +42,43 @@ class Frustum(object):
         self._near = 0.5
         self._far = 500.5
         self._hpr = Vec3()
+        self._tile = None
+
+    def SetTile(self, tile):
+        """
+        タイル描画する部分領域の設定
+        プロジェクション行列は，視界全体のうち指定した部分領域を
+        描画領域全体に拡大する行列になります。
+        - tile: 視界全体を(-1,-1)-(1,1)とした部分領域(x0, y0, x1, y1)。
+                Noneの場合は視界全体
+        """
+        if tile is None:
+            self._tile = None
+            return True
+        (x0, y0, x1, y1) = [float(x) for x in tile[0:4]]
+        if x1 - x0 < EPSF or y1 - y0 < EPSF: return False
+        self._tile = (x0, y0, x1, y1)
+        return True
+
+    def GetTile(self):
+        """
+        タイル描画する部分領域を返す
+        """
+        return self._tile
+
+    def GetTileMatrix(self):
+        """
+        部分領域を(-1,-1)-(1,1)に写す行列を返す
+        部分領域が設定されていない場合は単位行列を返します。
+        """
+        TM = Mat4()
+        if self._tile is None: return TM
+        (x0, y0, x1, y1) = self._tile
+        TM.m_v[ 0] = 2.0/(x1-x0)
+        TM.m_v[ 5] = 2.0/(y1-y0)
+        TM.m_v[12] = -(x1+x0)/(x1-x0)
+        TM.m_v[13] = -(y1+y0)/(y1-y0)
+        return TM
 
     def ApplyProjection(self, ortho =False, asp =1.0):
         """
@@ -47,7 +87,7 @@ class Frustum(object):
         - asp: 視界のアスペクト比率(横/縦)
         """
         try:
-            from OpenGL.GL import glFrustum, glOrtho
+            from OpenGL.GL import glFrustum, glOrtho, glMultMatrixf
         except:
             return False
 
@@ -65,6 +105,8 @@ class Frustum(object):
 
         (left, right, top, bottom) = (0,0,0,0)
         try:
+            if self._tile:
+                glMultMatrixf(self.GetTileMatrix().m_v)
             if not ortho:
                 d = self._near / (self._dist + eoff.m_v[2])
                 top    =  (self._halfH - eoff.m_v[1]) * d
@@ -154,6 +196,8 @@ class Frustum(object):
             PM.m_v[12] = -(right+left)/(right-left)
             PM.m_v[13] = -(top+bottom)/(top-bottom)
             PM.m_v[14] = -(self._far+self._near)/(self._far-self._near)
+        if self._tile:
+            PM = self.GetTileMatrix() * PM
         return PM
 
     def GetMVRM(self):
@@ -195,3 +239,157 @@ class Frustum(object):
         eye = MM * Vec3((0, 0, 0))
         vdir = MM * Vec3((0, 0, -1)) - eye
         return vdir
+
+
+#----------------------------------------------------------------------
+"""カリング判定結果"""
+(CULL_OUTSIDE, CULL_INTERSECT, CULL_INSIDE) = range(3)
+
+def _IsInexactBbox(node):
+    """
+    ノードまたはその子孫のバウンディングボックスが概算値かを返す
+    間引いた頂点から算出したバウンディングボックス(MappedTriangles)は
+    実際より小さい場合があるため，カリングの対象外とします．
+    - node: 判定するノード
+    """
+    if hasattr(node, 'isExactBbox') and not node.isExactBbox():
+        return True
+    if hasattr(node, '_children'):
+        for c in node._children:
+            if _IsInexactBbox(c): return True
+    return False
+
+class FrustumCuller(object):
+    """
+    視垂台カリングクラス
+    シーングラフのレンダリング時に，各ノードのバウンディングボックスを
+    クリップ座標系に変換して視垂台との交差判定を行います．
+    判定結果はフレーム毎にノードIDと親までの累積変換行列の組をキーとして
+    キャッシュされるため，不透明パスと半透明パスで判定が重複することは
+    なく，複数の親に共有されたノードも親毎に判定されます．
+    視垂台に完全に含まれるグループの子孫ノードは判定を省略します．
+      _stack: (クリップ座標への変換行列(転置), 完全包含フラグ)のスタック
+      _result: (ノードID, 累積変換行列)毎の判定結果
+      visited: フレーム内で判定したノード数
+      culled: フレーム内でカリングしたノード数
+    """
+    def __init__(self):
+        self._stack = []
+        self._result = {}
+        self.visited = 0
+        self.culled = 0
+        return
+
+    def begin(self, PM, MVM):
+        """
+        フレームの開始
+        判定結果と統計値をクリアし，変換行列スタックを初期化します．
+        - PM: プロジェクション行列(utilMath.Mat4)
+        - MVM: モデルビュー行列(utilMath.Mat4)
+        """
+        T = N.dot(N.asarray(MVM.m_v, dtype=N.float64).reshape((4,4)),
+                  N.asarray(PM.m_v, dtype=N.float64).reshape((4,4)))
+        self._stack = [(T, False)]
+        self._result = {}
+        self.visited = 0
+        self.culled = 0
+        return
+
+    def pushMatrix(self, node):
+        """
+        ノードの幾何変換行列のプッシュ
+        - node: 子供のノードを判定するグループノード
+        """
+        (T, inside) = self._stack[-1]
+        M = N.asarray(node._matrix.m_v, dtype=N.float64).reshape((4,4))
+        if not inside:
+            inside = (self._result.get(self._key(node)) == CULL_INSIDE)
+        self._stack.append((N.dot(M, T), inside))
+        return
+
+    def pushTransform(self, T):
+        """
+        累積幾何変換行列のプッシュ
+        - T: 現在のスタック最上位の座標系からの累積幾何変換行列(転置,4x4)
+        """
+        (T0, inside) = self._stack[-1]
+        self._stack.append((N.dot(T, T0), inside))
+        return
+
+    def isVisibleAt(self, node, T):
+        """
+        累積幾何変換行列を指定したノードの可視判定
+        ノードの親の座標系として，スタック最上位の座標系にTを適用した
+        座標系を用いて判定します．
+        - node: 判定するノード
+        - T: ノードの親までの累積幾何変換行列(転置,4x4)
+        """
+        self.pushTransform(T)
+        key = self._key(node)
+        ret = self._result.get(key)
+        if ret is None:
+            ret = self.test(node)
+            self._result[key] = ret
+            self.visited += 1
+            if ret == CULL_OUTSIDE: self.culled += 1
+        self.popMatrix()
+        return (ret != CULL_OUTSIDE)
+
+    def popMatrix(self):
+        """
+        幾何変換行列のポップ
+        """
+        if len(self._stack) > 1:
+            self._stack.pop()
+        return
+
+    def isVisible(self, node):
+        """
+        ノードの可視判定
+        ノードのバウンディングボックスが視垂台と交差または包含される場合に
+        Trueを返します．
+        - node: 判定するノード(スタック最上位の座標系の子供)
+        """
+        key = self._key(node)
+        ret = self._result.get(key)
+        if ret is None:
+            ret = self.test(node)
+            self._result[key] = ret
+            self.visited += 1
+            if ret == CULL_OUTSIDE: self.culled += 1
+        return (ret != CULL_OUTSIDE)
+
+    def _key(self, node):
+        """
+        判定結果のキャッシュキーを返す
+        - node: スタック最上位の座標系の子供のノード
+        """
+        return (node._id, self._stack[-1][0].tobytes())
+
+    def test(self, node):
+        """
+        ノードのバウンディングボックスと視垂台の交差判定
+        CULL_OUTSIDE, CULL_INTERSECT, CULL_INSIDEのいずれかを返します．
+        視垂台の外側でも，バウンディングボックスが概算値のノードを含む
+        場合はCULL_INTERSECTを返します．
+        - node: 判定するノード
+        """
+        (T, inside) = self._stack[-1]
+        if inside: return CULL_INSIDE
+        bb = node._bbox
+        x = (bb[0][0], bb[1][0])
+        y = (bb[0][1], bb[1][1])
+        z = (bb[0][2], bb[1][2])
+        P = N.array([[x[i], y[j], z[k], 1.0] \
+                     for i in (0,1) for j in (0,1) for k in (0,1)])
+        M = N.asarray(node._matrix.m_v, dtype=N.float64).reshape((4,4))
+        C = N.dot(P, N.dot(M, T))
+        w = C[:,3]
+        lo = C[:,0:3] < -w[:,None]
+        hi = C[:,0:3] > w[:,None]
+        if lo.all(axis=0).any() or hi.all(axis=0).any():
+            if _IsInexactBbox(node): return CULL_INTERSECT
+            return CULL_OUTSIDE
+        if lo.any() or hi.any():
+            return CULL_INTERSECT
+        return CULL_INSIDE
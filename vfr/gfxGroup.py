@@ -15,6 +15,8 @@ class GfxGroup(Group, GfxNode):
     シーングラフ・グルーピングクラス
     GfxGroupクラスは、複数の子供のシーングラフノードを持つ事ができるノードで、
     シーングラフのブランチを構成するものです.
+    視垂台カリング(GfxNode.SetCuller)が設定されている場合，視垂台の外にある
+    子供のノードはその子孫を含めてレンダリングしません.
     """
     def __init__(self, **args):
         Group.__init__(self, **args)
@@ -47,14 +49,24 @@ class GfxGroup(Group, GfxNode):
         - transpMode: 半透明モード
         """
         if self._renderMode == RT_NONE: return
+        prof = GfxNode.GetProfiler()
+        if prof: prof.enter(self)
 
         # transformation matrix / material
         self.applyMatrix()
         self.applyMaterial()
 
         # rendering children
-        for c in self._children:
-            c.render_(transpMode)
+        culler = GfxNode.GetCuller()
+        if culler:
+            culler.pushMatrix(self)
+            for c in self._children:
+                if culler.isVisible(c):
+                    c.render_(transpMode)
+            culler.popMatrix()
+        else:
+            for c in self._children:
+                c.render_(transpMode)
 
         # un-apply material
         self.unApplyMaterial()
@@ -67,6 +79,8 @@ class GfxGroup(Group, GfxNode):
 
         # pop transformation matrix
         self.unApplyMatrix()
+
+        if prof: prof.leave(self)
         return
 
     def renderBbox(self):
@@ -156,6 +170,7 @@ class GfxGroup(Group, GfxNode):
         """
         if not '_GfxNode__useDispList' in dir(node): return False
         if not Group.addChild(self, node): return False
+        node.invalidateWorld()
         self.generateBbox()
         self.notice()
         return True
@@ -167,6 +182,7 @@ class GfxGroup(Group, GfxNode):
         - node: 除外されるノード
         """
         if not Group.remChild(self, node): return False
+        node.invalidateWorld()
         self.generateBbox()
         self.notice()
         return True
@@ -176,7 +192,10 @@ class GfxGroup(Group, GfxNode):
         全ての子ノードの除外
         全ての子供のノードを配下より除外します.
         """
+        chlds = list(self._children)
         Group.remAllChildren(self)
+        for c in chlds:
+            c.invalidateWorld()
         self.generateBbox()
         self.notice()
         return
@@ -195,6 +214,13 @@ class GfxGroup(Group, GfxNode):
             M1 = M * self._matrix
             M.m_v[0:] = M1.m_v[0:]
             return True
+        tnode = self.getNodeById(tid)
+        if tnode is None: return False
+        PM = self.getPathMatrix(tnode)
+        if not PM is None:
+            M1 = M * PM
+            M.m_v[0:] = M1.m_v[0:]
+            return True
         for c in self._children:
             if c.getNodeById(tid):
                 M1 = M * self._matrix
@@ -203,6 +229,19 @@ class GfxGroup(Group, GfxNode):
                 return True
         return False
 
+    def invalidateWorld(self):
+        """
+        ワールド座標系への幾何変換行列のキャッシュ無効化
+        自分自身と配下のノードのキャッシュを無効化します．
+        """
+        if self._worldMatrix is None:
+            GfxNode.invalidateWorld(self)
+            return
+        GfxNode.invalidateWorld(self)
+        for c in self._children:
+            c.invalidateWorld()
+        return
+
     def invalidateDispList(self):
         """
         OpenGLディスプレイリストの無効化
@@ -259,15 +298,16 @@ class GfxGroup(Group, GfxNode):
         ソリッドレンダリング
         ソリッドモードでOpenGLによるレンダリングを行います．
         """
-        glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+        gs = GfxNode.GetGLState()
+        gs.polygonMode(GL_FRONT_AND_BACK, GL_FILL)
         for c in self._children:
             c.applyMatrix()
             c.applyMaterial()
             if c._renderMode & RT_NOLIGHT:
-                glDisable(GL_LIGHTING)
+                gs.disable(GL_LIGHTING)
             c.renderSolid()
             if c._renderMode & RT_NOLIGHT:
-                glEnable(GL_LIGHTING)
+                gs.enable(GL_LIGHTING)
             c.unApplyMaterial()
             c.unApplyMatrix()
         return
@@ -277,15 +317,16 @@ class GfxGroup(Group, GfxNode):
         ワイヤーフレームレンダリング
         ワイヤーフレームモードでOpenGLによるレンダリングを行います．
         """
-        glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
-        glDisable(GL_LIGHTING)
+        gs = GfxNode.GetGLState()
+        gs.polygonMode(GL_FRONT_AND_BACK, GL_LINE)
+        gs.disable(GL_LIGHTING)
         for c in self._children:
             c.applyMatrix()
             c.applyMaterial()
             c.renderWire()
             c.unApplyMaterial()
             c.unApplyMatrix()
-        glEnable(GL_LIGHTING)
+        gs.enable(GL_LIGHTING)
         return
 
     def renderPoint(self):
@@ -293,13 +334,14 @@ class GfxGroup(Group, GfxNode):
         ポイントレンダリング
         ポイントモードでOpenGLによるレンダリングを行います．
         """
-        glPolygonMode(GL_FRONT_AND_BACK, GL_POINT)
-        glDisable(GL_LIGHTING)
+        gs = GfxNode.GetGLState()
+        gs.polygonMode(GL_FRONT_AND_BACK, GL_POINT)
+        gs.disable(GL_LIGHTING)
         for c in self._children:
             c.applyMatrix()
             c.applyMaterial()
             c.renderPoint()
             c.unApplyMaterial()
             c.unApplyMatrix()
-        glEnable(GL_LIGHTING)
+        gs.enable(GL_LIGHTING)
         return
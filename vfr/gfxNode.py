@@ -12,6 +12,8 @@ from OpenGL.GL import *
 from .node import *
 from .obj import *
 from .utilMath import *
+from .vertexBuffer import *
+from .glState import *
 
 
 #----------------------------------------------------------------------
@@ -152,6 +154,15 @@ class GfxNode(Node, Obj):
       _dlPoint, _dlWire, _dlSolid: OpenGLディスプレイリスト
       _dlUpdated: ディスプレイリスト更新フラグ
       _dlNodeType: ディスプレイリスト使用ノードフラグ
+      _vboMode: 頂点バッファオブジェクト使用モード(Noneはクラスの設定に従う)
+      _vbo: 頂点バッファオブジェクト管理インスタンス(vertexBuffer.VertexBuffer)
+      _worldMatrix: ワールド座標系への幾何変換行列のキャッシュ(無効時はNone)
+      _worldBbox: ワールド座標系でのバウンディングボックスのキャッシュ
+      _pickBVH: CPUピッキング用の三角形BVHのキャッシュ(pick.Picker参照)
+      _feedbackCache: CPUフィードバック用の投影結果のキャッシュ
+           (feedback.FeedbackEngine参照)
+      _drawn: 直前のレンダリングで描画した(頂点数, 描画呼び出し数)
+           (Noneは(nVerts, 1)．countDrawn参照)
     以下のメンバー変数は，obj.Objクラスで実装されています．
       _verts: 頂点座標配列．ctypes.POINTER(ctypes.c_float*3)です．
       _normals: 法線ベクトル配列．ctypes.POINTER(ctypes.c_float*3)です．
@@ -172,10 +183,38 @@ class GfxNode(Node, Obj):
 
     """ディスプレイリスト使用モード"""
     __useDispList = True
+
+    """頂点バッファオブジェクト使用モード"""
+    __useVBO = False
+
+    """レンダリング中の視垂台カリング(frustum.FrustumCuller)"""
+    __culler = None
+
+    """データ変更通知(noticeData)の伝播中フラグ"""
+    __dataNotice = False
+
+    """レンダリング中のOpenGLステートキャッシュ(glState.GLStateCache)"""
+    __glStatePass = GLStateCache(False)
+    __glState = __glStatePass
+
+    """レンダリング中のLODレベル選択(lod.LODSelector)"""
+    __lodSelector = None
+
+    """レンダリング中の描画品質(quality.RenderQuality)"""
+    __renderQuality = None
+
+    """レンダリング中のプロファイラ(profiler.RenderProfiler)"""
+    __profiler = None
+
+    """前面表示オブジェクトのレンダリング中の視界のアスペクト比"""
+    __frontAspect = None
+
+    """ステートキャッシュを介さずにOpenGLの状態を変更するノードクラス"""
+    _directGL = False
     
     def __init__(self, **args):
         """
-        args: localMaterial =True
+        args: localMaterial =True, vbo =None
         """
         Node.__init__(self, **args)
         Obj.__init__(self)
@@ -220,6 +259,16 @@ class GfxNode(Node, Obj):
         self._dlSolid = 0
         self._dlUpdated = 0
         self._dlNodeType = True
+
+        self._vboMode = None if not 'vbo' in args else args['vbo']
+        self._vbo = None
+
+        self._worldMatrix = None
+        self._worldBbox = None
+        self._worldBboxKey = None
+        self._pickBVH = None
+        self._feedbackCache = None
+        self._drawn = None
         return
 
     def __del__(self):
@@ -244,6 +293,7 @@ class GfxNode(Node, Obj):
         幾何変換の初期化
         """
         self._matrix.Identity()
+        self.invalidateWorld()
         self.notice(False)
 
     def rotx(self, r):
@@ -252,6 +302,7 @@ class GfxNode(Node, Obj):
         - r: 回転角度(rad)
         """
         self._matrix.RotX(r)
+        self.invalidateWorld()
         self.notice(False)
 
     def roty(self, r):
@@ -260,6 +311,7 @@ class GfxNode(Node, Obj):
         - r: 回転角度(rad)
         """
         self._matrix.RotY(r)
+        self.invalidateWorld()
         self.notice(False)
 
     def rotz(self, r):
@@ -268,6 +320,7 @@ class GfxNode(Node, Obj):
         - r: 回転角度(rad)
         """
         self._matrix.RotZ(r)
+        self.invalidateWorld()
         self.notice(False)
 
     def rotation(self, a, v):
@@ -277,6 +330,7 @@ class GfxNode(Node, Obj):
         - v: 回転軸方向ベクトル
         """
         self._matrix.Rotation(a, v)
+        self.invalidateWorld()
         self.notice(False)
 
     def trans(self, v):
@@ -285,6 +339,7 @@ class GfxNode(Node, Obj):
         - v: 移動量ベクトル
         """
         self._matrix.Translate(v)
+        self.invalidateWorld()
         self.notice(False)
 
     def scale(self, v):
@@ -293,6 +348,7 @@ class GfxNode(Node, Obj):
         - v: スケーリングファクターベクトル(各軸方向)
         """
         self._matrix.Scale(v)
+        self.invalidateWorld()
         self.notice(False)
 
     def mult(self, m):
@@ -302,6 +358,7 @@ class GfxNode(Node, Obj):
         - m: 幾何変換行列
         """
         self._matrix = self._matrix * m
+        self.invalidateWorld()
         self.notice(False)
 
     def setMatrix(self, m):
@@ -311,6 +368,7 @@ class GfxNode(Node, Obj):
         - m: 幾何変換行列
         """
         self._matrix[0:] = m[0:]
+        self.invalidateWorld()
         self.notice(False)
 
     def getMatrix(self):
@@ -335,6 +393,7 @@ class GfxNode(Node, Obj):
         self._matrix.RotZ(r)
         self._matrix.m_v[12:15] = tv[0:3]
         self._matrix.m_v[15] = 1.0
+        self.invalidateWorld()
         self.notice(False)
         return
 
@@ -353,6 +412,77 @@ class GfxNode(Node, Obj):
         M.m_v[0:] = M1.m_v[0:]
         return True
 
+    def getPathMatrix(self, node):
+        """
+        配下のノードまでの幾何変換行列を返す
+        自分自身から親ノードのリンクを辿って到達できる配下のノードについて，
+        自分自身の幾何変換行列を含むノードまでの累積幾何変換行列を返します．
+        到達できない場合はNoneを返します．
+        - node: 配下のノード
+        """
+        chain = []
+        n = node
+        while not n is None and not n is self:
+            chain.append(n)
+            n = n._parent
+        if n is None: return None
+        if self._parent is None:
+            return Mat4(node.getWorldMatrix())
+        M = Mat4(self._matrix)
+        for n in reversed(chain):
+            M = M * n._matrix
+        return M
+
+    #-------- world matrix interface --------
+    def getWorldMatrix(self):
+        """
+        ワールド座標系への幾何変換行列を返す
+        親ノードのリンクを辿ったルートノードまでの累積幾何変換行列を返します．
+        結果はキャッシュされ，自分自身または祖先ノードの幾何変換行列が
+        変更されるまで再計算されません．返される行列は変更しないでください．
+        """
+        if self._worldMatrix is None:
+            p = self._parent
+            if p is None or not hasattr(p, '_worldMatrix'):
+                self._worldMatrix = Mat4(self._matrix)
+            else:
+                self._worldMatrix = p.getWorldMatrix() * self._matrix
+        return self._worldMatrix
+
+    def getWorldBbox(self):
+        """
+        ワールド座標系でのバウンディングボックスを返す
+        (utilMath.Vec3, utilMath.Vec3)を返します．結果はキャッシュされ，
+        ワールド座標系への幾何変換行列またはバウンディングボックスが
+        変更されるまで再計算されません．
+        """
+        key = tuple(self._bbox[0].m_v) + tuple(self._bbox[1].m_v)
+        if self._worldBbox is None or self._worldBboxKey != key:
+            p = self._parent
+            wbb = [Vec3(), Vec3()]
+            if p is None or not hasattr(p, '_worldMatrix'):
+                self.getMatrixBbox(wbb)
+            else:
+                W = self.getWorldMatrix()
+                (lo, hi) = W.transformBboxes(self._bbox[0].m_v,
+                                             self._bbox[1].m_v)
+                wbb[0].m_v[0:3] = lo
+                wbb[1].m_v[0:3] = hi
+            self._worldBbox = wbb
+            self._worldBboxKey = key
+        return self._worldBbox
+
+    def invalidateWorld(self):
+        """
+        ワールド座標系への幾何変換行列のキャッシュ無効化
+        自分自身と配下のノードのキャッシュを無効化します．
+        既に無効化されているノードの配下は無効化済みのため辿りません．
+        """
+        if self._worldMatrix is None and self._worldBbox is None: return
+        self._worldMatrix = None
+        self._worldBbox = None
+        return
+
     def applyMatrix(self):
         """
         幾何変換適用
@@ -389,6 +519,9 @@ class GfxNode(Node, Obj):
         """
         for i in range(self.nColors):
             self._colors[i][3] = alp
+        if self._transparent == tm:
+            self.noticeData()
+            return
         self._transparent = tm
         self.notice()
         return
@@ -423,9 +556,8 @@ class GfxNode(Node, Obj):
             self._verts[idx][:] = value[:]
         except:
             return False
-        if update:
-            self.updateBbox(value)
-            self.notice()
+        if update: self.updateBbox(value)
+        self.noticeRange(VB_VERTS, idx, idx+1, update)
         return True
 
     def setNormal(self, idx, value, update=False):
@@ -435,7 +567,7 @@ class GfxNode(Node, Obj):
             self._normals[idx][:] = value[:]
         except:
             return False
-        if update: self.notice()
+        self.noticeRange(VB_NORMALS, idx, idx+1, update)
         return True
 
     def setIndice(self, idx, value, update=False):
@@ -445,7 +577,7 @@ class GfxNode(Node, Obj):
             self._indices[idx] = value
         except:
             return False
-        if update: self.notice()
+        self.noticeRange(VB_INDICES, idx, idx+1, update)
         return True
 
     def setColor(self, idx, value, update=False):
@@ -458,7 +590,47 @@ class GfxNode(Node, Obj):
                 self._colors[idx][0:3] = value[0:3]
             except:
                 return False
-        if update: self.notice()
+        self.noticeRange(VB_COLORS, idx, idx+1, update)
+        return True
+
+    def setVerts(self, verts, update=True):
+        """
+        頂点座標を一括設定する
+        - verts: 頂点座標配列(形状(n, 3))
+        - update: 変更通知フラグ
+        """
+        if not Obj.setVerts(self, verts): return False
+        self.noticeRange(VB_VERTS, 0, self.nVerts, update)
+        return True
+
+    def setNormals(self, normals, update=True):
+        """
+        法線ベクトルを一括設定する
+        - normals: 法線ベクトル配列(形状(n, 3))
+        - update: 変更通知フラグ
+        """
+        if not Obj.setNormals(self, normals): return False
+        self.noticeRange(VB_NORMALS, 0, self.nNormals, update)
+        return True
+
+    def setIndices(self, indices, update=True):
+        """
+        インデックスデータを一括設定する
+        - indices: インデックス配列
+        - update: 変更通知フラグ
+        """
+        if not Obj.setIndices(self, indices): return False
+        self.noticeRange(VB_INDICES, 0, self.nIndices, update)
+        return True
+
+    def setColors(self, colors, update=True):
+        """
+        色データを一括設定する
+        - colors: 色配列(形状(n, 4)または(n, 3))
+        - update: 変更通知フラグ
+        """
+        if not Obj.setColors(self, colors): return False
+        self.noticeRange(VB_COLORS, 0, self.nColors, update)
         return True
 
     def generateNormals(self):
@@ -468,6 +640,69 @@ class GfxNode(Node, Obj):
         """
         return False;
 
+    def noticeRange(self, kind, i0, i1, update =True):
+        """
+        部分変更通知
+        頂点バッファオブジェクトを使用している場合，指定範囲のデータのみを
+        次回の描画時に転送するよう登録し，バッファ全体を無効化せずに
+        親ノードに変更を通知します．使用していない場合はnoticeData()を
+        呼び出します．
+        - kind: バッファ種別(VB_VERTS, VB_NORMALS, VB_COLORS, VB_INDICES)
+        - i0: 変更範囲の開始データ番号
+        - i1: 変更範囲の終了データ番号(この番号を含まない)
+        - update: 変更通知フラグ
+        """
+        if self.useVBO():
+            if self._vbo: self._vbo.markDirty(kind, i0, i1)
+            self.invalidateDispList()
+            self._pickBVH = None
+            self._feedbackCache = None
+            if update: self.__propagateData(False)
+        elif update:
+            self.noticeData()
+        return
+
+    #-------- vertex buffer interface --------
+    def setVBOMode(self, vm):
+        """
+        ノード毎の頂点バッファオブジェクト使用モードの設定
+        - vm: 使用モード．Noneの場合はクラスの設定(SetVBOMode)に従います．
+        """
+        self._vboMode = vm
+        self.noticeData()
+        return
+
+    def getVBOMode(self):
+        """
+        ノード毎の頂点バッファオブジェクト使用モードを返す
+        """
+        return self._vboMode
+
+    def useVBO(self):
+        """
+        頂点バッファオブジェクトを使用するかどうかを返す
+        """
+        if self._vboMode is None:
+            return GfxNode.__useVBO
+        return self._vboMode
+
+    def getVertexBuffer(self):
+        """
+        頂点バッファオブジェクト管理インスタンスを返す
+        未生成の場合は生成します．
+        """
+        if self._vbo is None:
+            self._vbo = VertexBuffer()
+        return self._vbo
+
+    def invalidateBuffers(self):
+        """
+        頂点バッファオブジェクトの無効化
+        次回の描画時にバッファ全体を再転送します．
+        """
+        if self._vbo: self._vbo.invalidate()
+        return
+
     #-------- display list interface --------
     def beginDispList(self, targ):
         """
@@ -488,6 +723,8 @@ class GfxNode(Node, Obj):
             elif targ == DLF_SOLID: glCallList(self._dlSolid)
             else: return False
             return True
+        if GfxNode.__profiler:
+            GfxNode.__profiler.countDispList(self)
         if targ == DLF_POINT:
             if self._dlPoint < 1:
                 self._dlPoint = glGenLists(1)
@@ -538,6 +775,7 @@ class GfxNode(Node, Obj):
             glDeleteLists(self._dlSolid, 1)
             self._dlSolid = 0
         self._dlUpdated = 0
+        if self._vbo: self._vbo.clear()
         return
 
     #-------- material interface --------
@@ -548,27 +786,28 @@ class GfxNode(Node, Obj):
         """
         if not self._useLocalMaterial: return
         
-        glMaterialfv(self._faceMode, GL_AMBIENT, self._ambient)
-        glMaterialfv(self._faceMode, GL_SPECULAR, self._specular)
-        glMaterialfv(self._faceMode, GL_SHININESS, self._shininess)
-        glMaterialfv(self._faceMode, GL_EMISSION, self._emission)
-        glColorMaterial(self._faceMode, GL_DIFFUSE)
-        glEnable(GL_COLOR_MATERIAL)
-
-        glPointSize(self._pointSize)
-        glLineWidth(self._lineWidth)
+        gs = GfxNode.__glState
+        gs.material(self._faceMode, GL_AMBIENT, self._ambient)
+        gs.material(self._faceMode, GL_SPECULAR, self._specular)
+        gs.material(self._faceMode, GL_SHININESS, self._shininess)
+        gs.material(self._faceMode, GL_EMISSION, self._emission)
+        gs.colorMaterial(self._faceMode, GL_DIFFUSE)
+        gs.enable(GL_COLOR_MATERIAL)
+
+        gs.pointSize(self._pointSize)
+        gs.lineWidth(self._lineWidth)
         if not self._lineStipple == ST_SOLID :
-            glEnable(GL_LINE_STIPPLE);
-            glLineStipple(1, GfxNode.__stipplePattern[self._lineStipple])
+            gs.enable(GL_LINE_STIPPLE);
+            gs.lineStipple(1, GfxNode.__stipplePattern[self._lineStipple])
 
         if not self._faceMode == GL_FRONT_AND_BACK:
-            glCullFace(self._faceMode)
+            gs.cullFace(self._faceMode)
 
         if not self._renderMode == RT_NONE:
             if not self._faceMode == GL_FRONT_AND_BACK:
-                glEnable(GL_CULL_FACE)
+                gs.enable(GL_CULL_FACE)
             else:
-                glDisable(GL_CULL_FACE)
+                gs.disable(GL_CULL_FACE)
         return
 
     def unApplyMaterial(self):
@@ -578,12 +817,13 @@ class GfxNode(Node, Obj):
         """
         if not self._useLocalMaterial: return
 
+        gs = GfxNode.__glState
         if not self._lineStipple == ST_SOLID:
-            glLineStipple(1, GfxNode.__stipplePattern[ST_SOLID])
-            glDisable(GL_LINE_STIPPLE)
+            gs.lineStipple(1, GfxNode.__stipplePattern[ST_SOLID])
+            gs.disable(GL_LINE_STIPPLE)
         if not self._renderMode == RT_NONE:
             if not self._faceMode == GL_FRONT_AND_BACK:
-                glDisable(GL_CULL_FACE)
+                gs.disable(GL_CULL_FACE)
         return
 
     #-------- render interface --------
@@ -606,6 +846,9 @@ class GfxNode(Node, Obj):
         レンダリング
         OpenGLによるレンダリングを行います.
         """
+        prof = GfxNode.__profiler
+        if prof: prof.enter(self)
+
         # transformation matrix
         self.applyMatrix()
 
@@ -617,41 +860,48 @@ class GfxNode(Node, Obj):
             self._texture.enable()
         
         # apply shader
+        gs = GfxNode.__glState
         if self._shader != None:
-            glUseProgram(self._shader.program_id)
+            gs.useProgram(self._shader.program_id)
         
         # rendering
         if self._renderMode & (RT_SMOOTH | RT_NOLIGHT | RT_FLAT) :
-            glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+            gs.polygonMode(GL_FRONT_AND_BACK, GL_FILL)
             if self._renderMode & RT_NOLIGHT :
-                glDisable(GL_LIGHTING)
+                gs.disable(GL_LIGHTING)
             if self._colorMode == AT_WHOLE :
                 glColor4fv(self._colors[0])
+            self._drawn = None
             self.renderSolid()
+            if prof: self.__countDraw(prof)
 
         if self._renderMode & RT_WIRE :
-            glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
-            glDisable(GL_LIGHTING)
+            gs.polygonMode(GL_FRONT_AND_BACK, GL_LINE)
+            gs.disable(GL_LIGHTING)
             if self._useAuxLineColor:
                 glColor4fv(self._auxLineColor)
             elif self._colorMode == AT_WHOLE :
                 glColor4fv(self._colors[0])
+            self._drawn = None
             self.renderWire()
-            glEnable(GL_LIGHTING)
+            if prof: self.__countDraw(prof)
+            gs.enable(GL_LIGHTING)
 
         if self._renderMode & RT_POINT :
-            glPolygonMode(GL_FRONT_AND_BACK, GL_POINT)
-            glDisable(GL_LIGHTING)
+            gs.polygonMode(GL_FRONT_AND_BACK, GL_POINT)
+            gs.disable(GL_LIGHTING)
             if self._useAuxPointColor:
                 glColor4fv(self._auxPointColor)
             elif self._colorMode == AT_WHOLE :
                 glColor4fv(self._colors[0])
+            self._drawn = None
             self.renderPoint()
-            glEnable(GL_LIGHTING)
+            if prof: self.__countDraw(prof)
+            gs.enable(GL_LIGHTING)
 
         # unapply shader
         if self._shader != None:
-            glUseProgram(0)
+            gs.useProgram(0)
 
         # un-apply texture
         if self._texture != None:
@@ -660,12 +910,42 @@ class GfxNode(Node, Obj):
         # un-apply material
         self.unApplyMaterial()
 
+        # OpenGL state changed outside the state cache
+        if self._directGL:
+            gs.invalidate()
+
         # draw bbox
         if self._showBbox:
             self.drawBbox()
 
         # pop transformation matrix
         self.unApplyMatrix()
+
+        if prof: prof.leave(self)
+        return
+
+    def countDrawn(self, verts, calls =1):
+        """
+        描画数の記録
+        LODや代理描画，間引きなどで，レンダリングでnVertsと異なる数の頂点を
+        描画した場合に，renderSolid()等から実際に描画した数を記録します．
+        記録はプロファイラ(GfxNode.SetProfiler)への報告に使用されます．
+        - verts: 描画した頂点数
+        - calls: 描画呼び出し数
+        """
+        self._drawn = (verts, calls)
+        return
+
+    def __countDraw(self, prof):
+        """
+        プロファイラへの描画数の報告
+        countDrawn()で記録された数，記録が無い場合はnVertsを報告します．
+        - prof: profiler.RenderProfiler
+        """
+        if self._drawn is None:
+            prof.countDraw(self, self.nVerts)
+        else:
+            prof.countDraw(self, self._drawn[0], self._drawn[1])
         return
 
     def drawBbox(self):
@@ -673,8 +953,9 @@ class GfxNode(Node, Obj):
         バウンディングボックス描画
         バウンディングボックスをOpenGLでワイヤーフレーム表示します
         """
-        glDisable(GL_LIGHTING)
-        glLineWidth(self._bboxWidth)
+        gs = GfxNode.__glState
+        gs.disable(GL_LIGHTING)
+        gs.lineWidth(self._bboxWidth)
         glColor4fv(self._bboxColor)
 
         glBegin(GL_LINE_LOOP)
@@ -705,8 +986,8 @@ class GfxNode(Node, Obj):
         glVertex3f(self._bbox[1][0], self._bbox[0][1], self._bbox[1][2])
         glEnd()
 
-        glLineWidth(1.0)
-        glEnable(GL_LIGHTING)
+        gs.lineWidth(1.0)
+        gs.enable(GL_LIGHTING)
         return
 
     def renderSolid(self):
@@ -723,12 +1004,55 @@ class GfxNode(Node, Obj):
         """
         return
 
+    def getTriangleArrays(self):
+        """
+        形状の三角形配列を返す
+        ローカル座標系での形状を三角形集合として表す
+        (頂点座標配列(3×三角形数, 3), 法線ベクトル配列(同形状またはNone))
+        のfloat32配列のタプルを返します．
+        形状を三角形集合で表せないノードはNoneを返します．
+        派生クラスで実装されます．
+        """
+        return None
+
+    def getPickTriangles(self):
+        """
+        CPUピッキング用の三角形を返す
+        ローカル座標系での形状を(頂点座標配列(頂点数, 3),
+        頂点番号配列(三角形数, 3), 三角形毎の面番号の配列またはNone)の
+        タプルで返します．面番号がNoneの場合は三角形番号を面番号とします．
+        既定ではgetTriangleArrays()の三角形を返します．形状を三角形集合で
+        表せないノードはNoneを返し，頂点のみで判定されます．
+        """
+        ta = self.getTriangleArrays()
+        if ta is None: return None
+        nf = len(ta[0]) // 3
+        return (ta[0], N.arange(nf*3, dtype=N.int32).reshape((nf, 3)), None)
+
     def renderPoint(self):
         """
         ポイントレンダリング
         ポイントモードでOpenGLによるレンダリングを行います．
         """
         if self.nVerts < 1: return
+
+        # decimated points at lower quality
+        q = GfxNode.__renderQuality
+        stride = 1 if q is None else q.pointDecimation(self.nVerts)
+        if stride > 1:
+            verts = N.ascontiguousarray(self.getVertsArray()[::stride])
+            nc = 0
+            col = None
+            if self._colorMode != AT_WHOLE and not self._useAuxPointColor \
+                   and self.nColors >= self.nVerts:
+                cols = N.ascontiguousarray(self.getColorsArray()[::stride])
+                nc = len(cols)
+                col = cols.ctypes.data_as(C.POINTER(C.c_float*4))
+            ret = vfr_impl.gfxNode_DrawPoints(
+                len(verts), verts.ctypes.data_as(C.POINTER(C.c_float*3)),
+                nc, col, self._pointSymbol, 0)
+            self.countDrawn(len(verts))
+            return
         
         # display-list check
         if self.beginDispList(DLF_POINT): return
@@ -889,6 +1213,20 @@ class GfxNode(Node, Obj):
         
         return
 
+    def getFeedbackElements(self):
+        """
+        CPUフィードバック用の要素を返す
+        ローカル座標系での(頂点座標配列(頂点数, 3), 頂点番号配列または
+        None, 要素毎のフィードバック番号の配列またはNone)のタプルを
+        返します．頂点番号配列がNoneの場合は頂点，形状(要素数, 2)の場合は
+        辺，形状(要素数, 3)の場合は三角形が要素です．フィードバック番号が
+        Noneの場合は要素番号をフィードバック番号とします．
+        番号はrenderFeedBack()と同じです．要素が無い場合はNoneを返します．
+        既定ではフィードバックモードによらず頂点を返します．
+        """
+        if self.nVerts < 1: return None
+        return (self.getVertsArray(), None, None)
+
     #-------- bbox interface --------
     def setBbox(self, min, max):
         """
@@ -909,44 +1247,10 @@ class GfxNode(Node, Obj):
         """
         幾何変換を適用したバウンディングボックス値を返す．
         """
-        local = [Vec3() for x in range(8)]
-        out = Vec3()
-        local[0].m_v[0] = self._bbox[1][0]
-        local[0].m_v[1] = self._bbox[0][1]
-        local[0].m_v[2] = self._bbox[0][2]
-        local[1].m_v[0] = self._bbox[1][0]
-        local[1].m_v[1] = self._bbox[1][1]
-        local[1].m_v[2] = self._bbox[0][2]
-        local[2].m_v[0] = self._bbox[1][0]
-        local[2].m_v[1] = self._bbox[1][1]
-        local[2].m_v[2] = self._bbox[1][2]
-        local[3].m_v[0] = self._bbox[1][0]
-        local[3].m_v[1] = self._bbox[0][1]
-        local[3].m_v[2] = self._bbox[1][2]
-        local[4].m_v[0] = self._bbox[0][0]
-        local[4].m_v[1] = self._bbox[0][1]
-        local[4].m_v[2] = self._bbox[0][2]
-        local[5].m_v[0] = self._bbox[0][0]
-        local[5].m_v[1] = self._bbox[0][1]
-        local[5].m_v[2] = self._bbox[1][2]
-        local[6].m_v[0] = self._bbox[0][0]
-        local[6].m_v[1] = self._bbox[1][1]
-        local[6].m_v[2] = self._bbox[1][2]
-        local[7].m_v[0] = self._bbox[0][0]
-        local[7].m_v[1] = self._bbox[1][1]
-        local[7].m_v[2] = self._bbox[0][2]
-        out = self._matrix * local[0]
-        box = [Vec3(out), Vec3(out)]
-        for i in range(1, 8):
-            out = self._matrix * local[i]
-            if box[0].m_v[0] > out.m_v[0] : box[0].m_v[0] = out.m_v[0]
-            if box[1].m_v[0] < out.m_v[0] : box[1].m_v[0] = out.m_v[0]
-            if box[0].m_v[1] > out.m_v[1] : box[0].m_v[1] = out.m_v[1]
-            if box[1].m_v[1] < out.m_v[1] : box[1].m_v[1] = out.m_v[1]
-            if box[0].m_v[2] > out.m_v[2] : box[0].m_v[2] = out.m_v[2]
-            if box[1].m_v[2] < out.m_v[2] : box[1].m_v[2] = out.m_v[2]
-        bbox[0].m_v[0:] = box[0].m_v[0:]
-        bbox[1].m_v[0:] = box[1].m_v[0:]
+        (lo, hi) = self._matrix.transformBboxes(self._bbox[0].m_v,
+                                                self._bbox[1].m_v)
+        bbox[0].m_v[0:3] = lo
+        bbox[1].m_v[0:3] = hi
         return
 
     def setBboxShowMode(self, bsm):
@@ -1021,8 +1325,12 @@ class GfxNode(Node, Obj):
               RT_NOTEXTURE: テクスチャマッピング無効(未使用)
         """
         if self._renderMode == rm: return
-        self._renderMode = rm
-        self.notice()
+        if self._renderMode == RT_NONE or rm == RT_NONE:
+            self._renderMode = rm
+            self.notice()
+        else:
+            self._renderMode = rm
+            self.noticeData()
 
     def getRenderMode(self):
         """
@@ -1040,7 +1348,7 @@ class GfxNode(Node, Obj):
         """
         if self._faceMode == fm: return
         self._faceMode = fm
-        self.notice()
+        self.noticeData()
 
     def getFaceMode(self):
         """
@@ -1077,7 +1385,7 @@ class GfxNode(Node, Obj):
         if self._normalMode == nm: return
         if nm in (AT_WHOLE, AT_PER_VERTEX, AT_PER_FACE):
             self._normalMode = nm
-            self.notice()
+            self.noticeData()
         return
     
     def getNormalMode(self):
@@ -1097,7 +1405,7 @@ class GfxNode(Node, Obj):
         if self._colorMode == cm: return
         if cm in (AT_WHOLE, AT_PER_VERTEX, AT_PER_FACE):
             self._colorMode = cm
-            self.notice()
+            self.noticeData()
         return
     
     def getColorMode(self):
@@ -1121,7 +1429,7 @@ class GfxNode(Node, Obj):
             self._auxLineColor[0:4] = color[0:4]
             needUpd = True
         if needUpd:
-            self.notice()
+            self.noticeData()
         return
     
     def getAuxLineColorMode(self):
@@ -1151,7 +1459,7 @@ class GfxNode(Node, Obj):
             self._auxPointColor[0:4] = color[0:4]
             needUpd = True
         if needUpd:
-            self.notice()
+            self.noticeData()
         return
     
     def getAuxPointColorMode(self):
@@ -1198,7 +1506,7 @@ class GfxNode(Node, Obj):
         if self._lineStipple == lsType: return
         self._lineStipple = lsType
         if self._renderMode & RT_WIRE :
-            self.notice()
+            self.noticeData()
 
     def getLineStipple(self):
         """
@@ -1214,7 +1522,7 @@ class GfxNode(Node, Obj):
         if float(lw) < 0.0: return
         self._lineWidth = float(lw)
         if self._renderMode & RT_WIRE :
-            self.notice()
+            self.noticeData()
 
     def getLineWidth(self):
         """
@@ -1234,7 +1542,7 @@ class GfxNode(Node, Obj):
         if self._pointSymbol == psType: return
         self._pointSymbol = psType
         if self._renderMode & RT_POINT :
-            self.notice()
+            self.noticeData()
 
     def getPointSymbol(self):
         """
@@ -1250,7 +1558,7 @@ class GfxNode(Node, Obj):
         if float(ps) < 0.0: return
         self._pointSize = float(ps)
         if self._renderMode & RT_POINT :
-            self.notice()
+            self.noticeData()
 
     def getPointSize(self):
         """
@@ -1265,7 +1573,7 @@ class GfxNode(Node, Obj):
         """
         self._specular[0:4] = spc[0:4]
         if self._renderMode & (RT_SMOOTH|RT_FLAT):
-            self.notice()
+            self.noticeData()
 
     def getSpecular(self):
         """
@@ -1280,7 +1588,7 @@ class GfxNode(Node, Obj):
         """
         self._ambient[0:4] = amb[0:4]
         if self._renderMode & (RT_SMOOTH|RT_FLAT):
-            self.notice()
+            self.noticeData()
 
     def getAmbient(self):
         """
@@ -1298,7 +1606,7 @@ class GfxNode(Node, Obj):
         except:
             self._shinines[0] = shn[0]
         if self._renderMode & (RT_SMOOTH|RT_FLAT):
-            self.notice()
+            self.noticeData()
 
     def getShininess(self):
         """
@@ -1313,7 +1621,7 @@ class GfxNode(Node, Obj):
         """
         self._emission[0:4] = ems[0:4]
         if self._renderMode & (RT_SMOOTH|RT_FLAT):
-            self.notice()
+            self.noticeData()
 
     def getEmission(self):
         """
@@ -1326,7 +1634,7 @@ class GfxNode(Node, Obj):
             return True
         self._texture = tex
         self._texture.setBbox(self._bbox[0], self._bbox[1])
-        self.notice()
+        self.noticeData()
         return
 
     #-------- propagate interface --------
@@ -1338,9 +1646,40 @@ class GfxNode(Node, Obj):
         """
         if invalidateDL:
             self.invalidateDispList()
+            self.invalidateBuffers()
+            self._pickBVH = None
+            self._feedbackCache = None
         Node.notice(self)
         return
 
+    def noticeData(self):
+        """
+        データ変更通知
+        頂点データや描画属性など，ノード内部のデータのみの変更を通知します．
+        notice()と同様にディスプレイリスト等を無効化して親ノードに通知
+        しますが，シーングラフの構造や幾何変換は変わらないため，シーンの
+        レンダリングリストは無効化されません(IsDataNotice参照)．
+        """
+        self.__propagateData(True)
+        return
+
+    def __propagateData(self, invalidateDL):
+        """
+        データ変更通知としての通知の伝播
+        - invalidateDL: Trueの場合はnotice()を，Falseの場合は無効化を
+                        行わずに親ノードへの通知のみを行います
+        """
+        prev = GfxNode._GfxNode__dataNotice
+        GfxNode._GfxNode__dataNotice = True
+        try:
+            if invalidateDL:
+                self.notice()
+            else:
+                Node.notice(self)
+        finally:
+            GfxNode._GfxNode__dataNotice = prev
+        return
+
     def rumor(self, ref):
         """
         破壊通知の受付け
@@ -1369,3 +1708,145 @@ class GfxNode(Node, Obj):
         return not GfxNode._GfxNode__useDispList
     IsImmediateMode = classmethod(IsImmediateMode)
 
+    def SetVBOMode(cls, vm):
+        """
+        頂点バッファオブジェクト使用モードの設定
+        (クラスメソッド)
+        ノード毎の設定(setVBOMode)がNoneのノードに適用されます．
+        - vm: 使用モード
+        """
+        GfxNode._GfxNode__useVBO = vm
+        return
+    SetVBOMode = classmethod(SetVBOMode)
+
+    def IsVBOMode(cls):
+        """
+        頂点バッファオブジェクト使用モードを返す
+        (クラスメソッド)
+        """
+        return GfxNode._GfxNode__useVBO
+    IsVBOMode = classmethod(IsVBOMode)
+
+    def SetCuller(cls, culler):
+        """
+        レンダリング時の視垂台カリングの設定
+        (クラスメソッド)
+        - culler: frustum.FrustumCuller．Noneの場合はカリングを行いません．
+        """
+        GfxNode._GfxNode__culler = culler
+        return
+    SetCuller = classmethod(SetCuller)
+
+    def GetCuller(cls):
+        """
+        レンダリング時の視垂台カリングを返す
+        (クラスメソッド)
+        """
+        return GfxNode._GfxNode__culler
+    GetCuller = classmethod(GetCuller)
+
+    def IsDataNotice(cls):
+        """
+        伝播中の変更通知がデータ変更通知(noticeData)かどうかを返す
+        (クラスメソッド)
+        """
+        return GfxNode._GfxNode__dataNotice
+    IsDataNotice = classmethod(IsDataNotice)
+
+    def SetLODSelector(cls, sel):
+        """
+        レンダリング時のLODレベル選択の設定
+        (クラスメソッド)
+        - sel: lod.LODSelector．Noneの場合は常に最も詳細なレベルを
+               描画します．
+        """
+        GfxNode._GfxNode__lodSelector = sel
+        return
+    SetLODSelector = classmethod(SetLODSelector)
+
+    def GetLODSelector(cls):
+        """
+        レンダリング時のLODレベル選択を返す
+        (クラスメソッド)
+        """
+        return GfxNode._GfxNode__lodSelector
+    GetLODSelector = classmethod(GetLODSelector)
+
+    def SetRenderQuality(cls, q):
+        """
+        レンダリング時の描画品質の設定
+        (クラスメソッド)
+        - q: quality.RenderQuality．Noneの場合は常に通常の品質で描画します．
+        """
+        GfxNode._GfxNode__renderQuality = q
+        return
+    SetRenderQuality = classmethod(SetRenderQuality)
+
+    def GetRenderQuality(cls):
+        """
+        レンダリング時の描画品質を返す
+        (クラスメソッド)
+        """
+        return GfxNode._GfxNode__renderQuality
+    GetRenderQuality = classmethod(GetRenderQuality)
+
+    def SetProfiler(cls, prof):
+        """
+        レンダリング時のプロファイラの設定
+        (クラスメソッド)
+        - prof: profiler.RenderProfiler．Noneの場合は記録を行いません．
+        """
+        GfxNode._GfxNode__profiler = prof
+        return
+    SetProfiler = classmethod(SetProfiler)
+
+    def GetProfiler(cls):
+        """
+        レンダリング時のプロファイラを返す
+        (クラスメソッド)
+        """
+        return GfxNode._GfxNode__profiler
+    GetProfiler = classmethod(GetProfiler)
+
+    def SetFrontAspect(cls, asp):
+        """
+        前面表示オブジェクトのレンダリング時の視界のアスペクト比の設定
+        (クラスメソッド)
+        タイル描画では描画領域(タイル)と視界全体のアスペクト比が
+        異なるため，カメラが視界全体のアスペクト比を設定します．
+        - asp: アスペクト比(横/縦)．Noneの場合は未設定
+        """
+        GfxNode._GfxNode__frontAspect = asp
+        return
+    SetFrontAspect = classmethod(SetFrontAspect)
+
+    def GetFrontAspect(cls):
+        """
+        前面表示オブジェクトのレンダリング時の視界のアスペクト比を返す
+        (クラスメソッド)
+        未設定の場合はNoneを返します．
+        """
+        return GfxNode._GfxNode__frontAspect
+    GetFrontAspect = classmethod(GetFrontAspect)
+
+    def SetGLState(cls, gs):
+        """
+        レンダリング時のOpenGLステートキャッシュの設定
+        (クラスメソッド)
+        - gs: glState.GLStateCache．Noneの場合は全ての状態変更を
+              OpenGLに発行します．
+        """
+        if gs is None:
+            gs = GfxNode._GfxNode__glStatePass
+        GfxNode._GfxNode__glState = gs
+        return
+    SetGLState = classmethod(SetGLState)
+
+    def GetGLState(cls):
+        """
+        レンダリング時のOpenGLステートキャッシュを返す
+        (クラスメソッド)
+        """
+        return GfxNode._GfxNode__glState
+    GetGLState = classmethod(GetGLState)
+
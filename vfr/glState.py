@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+vfr scene-graph library
+
+Copyright(c) YoH, 2026, All Right Reserved.
+
+"""
+from OpenGL.GL import *
+
+
+#----------------------------------------------------------------------
+class GLStateCache(object):
+    """
+    OpenGLステートキャッシュクラス
+    GLStateCacheクラスは，レンダリング中にOpenGLへ設定した状態の複製
+    (シャドウ)を保持し，現在の状態と同じ値の設定要求をOpenGLに発行せずに
+    破棄します．対象はenable/disable，マテリアル，カラーマテリアル，
+    ポリゴンモード，点サイズ，線幅，線種，カリング面，テクスチャの
+    バインド，シェーダプログラムです．
+    キャッシュの外でOpenGLの状態が変更された可能性がある場合は，
+    invalidate()でシャドウを破棄する必要があります．
+      _cache: キャッシュモード．Falseの場合は全ての要求をOpenGLに発行します
+      _caps: enable/disableの状態
+      _vals: enable/disable以外の状態
+      issued: OpenGLに発行した状態変更の数
+      skipped: 冗長として破棄した状態変更の数
+      sizeScale: 点サイズと線幅に掛ける倍率
+    """
+    def __init__(self, cache =True):
+        self._cache = cache
+        self._caps = {}
+        self._vals = {}
+        self.issued = 0
+        self.skipped = 0
+        self.sizeScale = 1.0
+        return
+
+    def invalidate(self):
+        """
+        シャドウの破棄
+        全ての状態を未知とし，次回の設定要求を必ずOpenGLに発行します．
+        """
+        self._caps = {}
+        self._vals = {}
+        return
+
+    def setCacheMode(self, mode):
+        """
+        キャッシュモードの設定
+        - mode: キャッシュモード
+        """
+        self._cache = mode
+        self.invalidate()
+        return
+
+    def getCacheMode(self):
+        """
+        キャッシュモードを返す
+        """
+        return self._cache
+
+    def resetStat(self):
+        """
+        統計値のリセット
+        """
+        self.issued = 0
+        self.skipped = 0
+        return
+
+    def getStat(self):
+        """
+        統計値を返す
+        (発行した状態変更数, 破棄した状態変更数)のタプルを返します.
+        """
+        return (self.issued, self.skipped)
+
+    def __test(self, tbl, key, val):
+        """
+        状態の比較と更新
+        OpenGLへの発行が必要な場合にTrueを返します．
+        - tbl: 状態テーブル
+        - key: 状態のキー
+        - val: 設定値
+        """
+        if self._cache:
+            if key in tbl and tbl[key] == val:
+                self.skipped += 1
+                return False
+            tbl[key] = val
+        self.issued += 1
+        return True
+
+    #-------- enable/disable interface --------
+    def enable(self, cap):
+        """
+        glEnable
+        - cap: OpenGLの機能
+        """
+        if self.__test(self._caps, cap, True):
+            glEnable(cap)
+        return
+
+    def disable(self, cap):
+        """
+        glDisable
+        - cap: OpenGLの機能
+        """
+        if self.__test(self._caps, cap, False):
+            glDisable(cap)
+        return
+
+    def setEnable(self, cap, flag):
+        """
+        glEnable/glDisable
+        - cap: OpenGLの機能
+        - flag: Trueの場合glEnable，Falseの場合glDisable
+        """
+        if flag: self.enable(cap)
+        else: self.disable(cap)
+        return
+
+    def assumeEnable(self, cap, flag):
+        """
+        キャッシュ外で変更されたenable/disable状態の登録
+        OpenGLへの発行は行わず，シャドウのみを更新します．
+        - cap: OpenGLの機能
+        - flag: 現在の状態
+        """
+        if self._cache:
+            self._caps[cap] = flag
+        return
+
+    #-------- material interface --------
+    def material(self, face, pname, params):
+        """
+        glMaterialfv
+        - face: GL_FRONT, GL_BACK, GL_FRONT_AND_BACK
+        - pname: マテリアルパラメータ種別
+        - params: パラメータ値
+        """
+        val = tuple([float(x) for x in params])
+        if face == GL_FRONT_AND_BACK:
+            kf = ('mat', GL_FRONT, pname)
+            kb = ('mat', GL_BACK, pname)
+            if self._cache and self._vals.get(kf) == val \
+                   and self._vals.get(kb) == val:
+                self.skipped += 1
+                return
+            if self._cache:
+                self._vals[kf] = self._vals[kb] = val
+            self.issued += 1
+            glMaterialfv(face, pname, params)
+            return
+        if self.__test(self._vals, ('mat', face, pname), val):
+            glMaterialfv(face, pname, params)
+        return
+
+    def colorMaterial(self, face, mode):
+        """
+        glColorMaterial
+        - face: GL_FRONT, GL_BACK, GL_FRONT_AND_BACK
+        - mode: カラーマテリアルで追従するパラメータ種別
+        """
+        if self.__test(self._vals, 'colorMaterial', (face, mode)):
+            glColorMaterial(face, mode)
+        return
+
+    #-------- rasterize interface --------
+    def polygonMode(self, face, mode):
+        """
+        glPolygonMode
+        - face: GL_FRONT, GL_BACK, GL_FRONT_AND_BACK
+        - mode: GL_FILL, GL_LINE, GL_POINT
+        """
+        if face == GL_FRONT_AND_BACK:
+            kf = ('polygonMode', GL_FRONT)
+            kb = ('polygonMode', GL_BACK)
+            if self._cache and self._vals.get(kf) == mode \
+                   and self._vals.get(kb) == mode:
+                self.skipped += 1
+                return
+            if self._cache:
+                self._vals[kf] = self._vals[kb] = mode
+            self.issued += 1
+            glPolygonMode(face, mode)
+            return
+        if self.__test(self._vals, ('polygonMode', face), mode):
+            glPolygonMode(face, mode)
+        return
+
+    def pointSize(self, size):
+        """
+        glPointSize
+        点サイズにはsizeScaleを掛けて設定します．
+        - size: 点サイズ
+        """
+        size = float(size) * self.sizeScale
+        if self.__test(self._vals, 'pointSize', size):
+            glPointSize(size)
+        return
+
+    def lineWidth(self, width):
+        """
+        glLineWidth
+        線幅にはsizeScaleを掛けて設定します．
+        - width: 線幅
+        """
+        width = float(width) * self.sizeScale
+        if self.__test(self._vals, 'lineWidth', width):
+            glLineWidth(width)
+        return
+
+    def lineStipple(self, factor, pattern):
+        """
+        glLineStipple
+        - factor: 線種パターンの繰り返し数
+        - pattern: 線種パターン
+        """
+        if self.__test(self._vals, 'lineStipple', (factor, pattern)):
+            glLineStipple(factor, pattern)
+        return
+
+    def cullFace(self, mode):
+        """
+        glCullFace
+        - mode: GL_FRONT, GL_BACK, GL_FRONT_AND_BACK
+        """
+        if self.__test(self._vals, 'cullFace', mode):
+            glCullFace(mode)
+        return
+
+    #-------- texture/shader interface --------
+    def bindTexture(self, target, texId):
+        """
+        glBindTexture
+        - target: テクスチャターゲット
+        - texId: テクスチャID
+        """
+        if self.__test(self._vals, ('texture', target), texId):
+            glBindTexture(target, texId)
+        return
+
+    def useProgram(self, program):
+        """
+        glUseProgram
+        - program: シェーダプログラムID
+        """
+        if self.__test(self._vals, 'program', program):
+            glUseProgram(program)
+        return
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+vfr scene-graph library
+
+Copyright(c) YoH, 2026, All Right Reserved.
+
+IDバッファ
+セレクションテスト用のID色描画を，ビューポートと同じ大きさの
+フレームバッファオブジェクト(色+デプス)に一度だけ行い，読み出した
+ID・デプスをシーンの変更またはカメラの移動までキャッシュします．
+読み出しはピクセルバッファオブジェクト(PBO)に非同期に行い，
+最初の参照時にフェンスで完了を待って取り出します．
+フレームバッファオブジェクトを使用できない環境では，現在の
+フレームバッファに描画して同期的に読み出します．
+"""
+import ctypes as C
+import numpy as N
+from OpenGL.GL import *
+
+
+#----------------------------------------------------------------------
+class IDBuffer(object):
+    """
+    IDバッファクラス
+      _size: バッファのサイズ(幅, 高さ)
+      _fbo: フレームバッファオブジェクト(0の場合は現在のフレームバッファ)
+      _rb: カラー，デプスのレンダーバッファ
+      _pbo: カラー，デプスのピクセルバッファオブジェクト
+      _fence: 読み出し完了待ちのフェンス
+      _key: キャッシュした時点の(プロジェクション行列, モデルビュー行列,
+            ビューポート)
+      _ids: ID配列(形状(高さ, 幅)，下の行から順)
+      _depth: デプス配列(形状(高さ, 幅)，下の行から順)
+      available: フレームバッファオブジェクトとPBOの使用可否
+                 (Noneは未確認)
+    """
+    def __init__(self):
+        self._size = (0, 0)
+        self._fbo = 0
+        self._rb = None
+        self._pbo = None
+        self._fence = None
+        self._key = None
+        self._ids = None
+        self._depth = None
+        self.available = None
+        return
+
+    def invalidate(self):
+        """
+        キャッシュの無効化
+        """
+        self._key = None
+        return
+
+    def isValid(self, key):
+        """
+        キャッシュが有効かを返す
+        - key: 現在の(プロジェクション行列, モデルビュー行列, ビューポート)
+        """
+        return self._key is not None and self._key == key
+
+    def release(self):
+        """
+        OpenGLオブジェクトの破棄
+        バッファを作成したコンテキストがカレントの状態で呼び出します．
+        """
+        if self._fence is not None:
+            glDeleteSync(self._fence)
+            self._fence = None
+        if self._pbo is not None:
+            glDeleteBuffers(2, self._pbo)
+            self._pbo = None
+        if self._rb is not None:
+            glDeleteRenderbuffers(2, self._rb)
+            self._rb = None
+        if self._fbo:
+            glDeleteFramebuffers(1, [self._fbo])
+            self._fbo = 0
+        self._size = (0, 0)
+        self._key = None
+        self._ids = None
+        self._depth = None
+        return
+
+    def __allocate(self, w, h):
+        """
+        フレームバッファオブジェクトとPBOの確保
+        使用できない場合はFalseを返します．
+        - w, h: バッファのサイズ(pixels)
+        """
+        if self.available == False: return False
+        if self._size == (w, h) and self._fbo: return True
+        self.release()
+        try:
+            self._fbo = glGenFramebuffers(1)
+            self._rb = glGenRenderbuffers(2)
+            glBindRenderbuffer(GL_RENDERBUFFER, self._rb[0])
+            glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, w, h)
+            glBindRenderbuffer(GL_RENDERBUFFER, self._rb[1])
+            glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH_COMPONENT24, w, h)
+            glBindRenderbuffer(GL_RENDERBUFFER, 0)
+            prev = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
+            glBindFramebuffer(GL_FRAMEBUFFER, self._fbo)
+            glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0,
+                                      GL_RENDERBUFFER, self._rb[0])
+            glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT,
+                                      GL_RENDERBUFFER, self._rb[1])
+            ok = glCheckFramebufferStatus(GL_FRAMEBUFFER) \
+                == GL_FRAMEBUFFER_COMPLETE
+            glBindFramebuffer(GL_FRAMEBUFFER, int(prev))
+            if not ok: raise RuntimeError('IDBuffer: incomplete framebuffer')
+            self._pbo = glGenBuffers(2)
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, self._pbo[0])
+            glBufferData(GL_PIXEL_PACK_BUFFER, w * h * 4, None, GL_STREAM_READ)
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, self._pbo[1])
+            glBufferData(GL_PIXEL_PACK_BUFFER, w * h * 4, None, GL_STREAM_READ)
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        except Exception:
+            self.release()
+            self.available = False
+            return False
+        self.available = True
+        self._size = (w, h)
+        return True
+
+    def refresh(self, render, viewport, key, direct =True):
+        """
+        ID色描画と読み出しの開始
+        フレームバッファオブジェクトを使用できる場合は，描画後にPBOへの
+        読み出しを開始して完了を待たずに戻ります．成功した場合は
+        Trueを返します．
+        - render: ID色描画関数．render(ビューポート)の形式で呼び出されます
+        - viewport: 描画領域のビューポート(x, y, 幅, 高さ)
+        - key: キャッシュのキー(isValid参照)
+        - direct: Falseの場合，フレームバッファオブジェクトを使用できない
+                  ときに現在のフレームバッファへ描画せずにFalseを返します
+        """
+        (w, h) = (int(viewport[2]), int(viewport[3]))
+        if w < 1 or h < 1: return False
+        if self._fence is not None:
+            glDeleteSync(self._fence)
+            self._fence = None
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+
+        if not self.__allocate(w, h):
+            if not direct: return False
+            # no FBO: the current framebuffer, read back synchronously
+            render(viewport)
+            pixel = glReadPixels(viewport[0], viewport[1], w, h,
+                                 GL_RGBA, GL_UNSIGNED_BYTE)
+            depth = glReadPixels(viewport[0], viewport[1], w, h,
+                                 GL_DEPTH_COMPONENT, GL_FLOAT)
+            self.__store(N.frombuffer(bytes(pixel), dtype=N.uint8),
+                         N.frombuffer(bytes(depth), dtype=N.float32), w, h)
+            self._key = key
+            return True
+
+        prev = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
+        glBindFramebuffer(GL_FRAMEBUFFER, self._fbo)
+        render((0, 0, w, h))
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, self._pbo[0])
+        glReadPixels(0, 0, w, h, GL_RGBA, GL_UNSIGNED_BYTE, C.c_void_p(0))
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, self._pbo[1])
+        glReadPixels(0, 0, w, h, GL_DEPTH_COMPONENT, GL_FLOAT, C.c_void_p(0))
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        self._fence = glFenceSync(GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+        glFlush()
+        glBindFramebuffer(GL_FRAMEBUFFER, int(prev))
+        self._ids = None
+        self._depth = None
+        self._key = key
+        return True
+
+    def __store(self, pixel, depth, w, h):
+        """
+        読み出したカラーとデプスの格納
+        """
+        p = pixel.reshape((h, w, 4)).astype(N.int32)
+        self._ids = p[:, :, 0] + p[:, :, 1] * 256 + p[:, :, 2] * 65536
+        self._depth = N.array(depth.reshape((h, w)), dtype=N.float32)
+        return
+
+    def __mapBuffer(self, pbo, n):
+        """
+        PBOの内容をバイト列として取り出す
+        """
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, pbo)
+        ptr = glMapBuffer(GL_PIXEL_PACK_BUFFER, GL_READ_ONLY)
+        addr = ptr if isinstance(ptr, int) else C.cast(ptr, C.c_void_p).value
+        data = C.string_at(addr, n) if addr else None
+        glUnmapBuffer(GL_PIXEL_PACK_BUFFER)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        return data
+
+    def __resolve(self):
+        """
+        非同期読み出しの完了待ちと取り出し
+        """
+        if self._fence is None: return self._ids is not None
+        glClientWaitSync(self._fence, GL_SYNC_FLUSH_COMMANDS_BIT,
+                         GL_TIMEOUT_IGNORED)
+        glDeleteSync(self._fence)
+        self._fence = None
+        (w, h) = self._size
+        pixel = self.__mapBuffer(self._pbo[0], w * h * 4)
+        depth = self.__mapBuffer(self._pbo[1], w * h * 4)
+        if pixel is None or depth is None:
+            self._key = None
+            return False
+        self.__store(N.frombuffer(pixel, dtype=N.uint8),
+                     N.frombuffer(depth, dtype=N.float32), w, h)
+        return True
+
+    def lookup(self, x, y, w, h):
+        """
+        矩形領域のIDとデプスを返す
+        (ID配列, デプス配列)を返します．矩形はビューポートの左下隅を
+        原点とする座標で指定し，バッファの外側は除きます．
+        キャッシュが無効な場合はNoneを返します．
+        - x, y: 矩形の左下隅
+        - w, h: 矩形の幅と高さ
+        """
+        if self._key is None or not self.__resolve(): return None
+        (bh, bw) = self._ids.shape
+        x0 = max(0, int(x)); x1 = min(bw, int(x) + int(w))
+        y0 = max(0, int(y)); y1 = min(bh, int(y) + int(h))
+        if x0 >= x1 or y0 >= y1:
+            return (N.zeros((0,), dtype=N.int32), N.zeros((0,), N.float32))
+        return (self._ids[y0:y1, x0:x1].reshape((-1,)),
+                self._depth[y0:y1, x0:x1].reshape((-1,)))
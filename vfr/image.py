@@ -24,6 +24,8 @@ class PixelImage(GfxNode):
       imgDepth: 画像の深さ(1 or 3)
       invY: 上下反転表示フラグ
       fitSize: 表示の際のスケーリングサイズ([0,0]の場合はスケーリングしない)
+      windowPos: 表示位置のウインドウ座標(pixels)．Noneの場合は描画領域の
+                 左下(invYがTrueの場合は左上)
     """
 
     def __init__(self, **args):
@@ -37,6 +39,7 @@ class PixelImage(GfxNode):
         self.invY = True if not 'invY' in args else args['invY']
         self.fitSize = [0, 0]
         if 'fitSize' in args: self.fitSize[:] = args['fitSize'][:2]
+        self.windowPos = None
         self._colors[0] = (1.0, 1.0, 1.0, 1.0)
         return
 
@@ -72,10 +75,13 @@ class PixelImage(GfxNode):
             else:
                 glRasterPos3f(-1.0, -1.0, -1.0)
                 glPixelZoom(1.0, 1.0)
+        if self.windowPos:
+            # raster position outside of the viewport (tiled rendering)
+            glWindowPos2f(self.windowPos[0], self.windowPos[1])
 
         # set color and face mode (failsafe)
         glColor4fv(self._colors[0])
-        glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+        GfxNode.GetGLState().polygonMode(GL_FRONT_AND_BACK, GL_FILL)
 
         # display-list check
         if self.beginDispList(DLF_SOLID): return
@@ -149,5 +155,5 @@ class PixelImage(GfxNode):
         if height >= 0:
             self.fitSize[1] = height
         if width >= 0 or height >= 0:
-            self.notice()
+            self.noticeData()
         return
@@ -58,14 +58,19 @@ class Letters(GfxNode):
         self.spaceRate = 0.05 if not 'spaceRate' in args else args['spaceRate']
         return
 
-    def setLetters(self, str):
+    def setLetters(self, str, update =True):
         """
         表示文字列を設定する
         - str: 表示文字列
+        - update: 変更通知フラグ．Falseの場合はディスプレイリストのみを
+                  無効化し，親ノードに通知しません
         """
         self.textBuf = str
         self.generateBbox()
-        self.notice()
+        if update:
+            self.noticeData()
+        else:
+            self.invalidateDispList()
 
     def getTextWidth(self):
         """
@@ -122,11 +127,15 @@ class Letters(GfxNode):
         """
         ソリッドレンダリング
         """
+        gs = GfxNode.GetGLState()
+        gs.disable(GL_LIGHTING)
+
         # display-list check
-        if self.beginDispList(DLF_SOLID): return
+        if self.beginDispList(DLF_SOLID):
+            gs.enable(GL_LIGHTING)
+            return
 
         # draw
-        glDisable(GL_LIGHTING)
         glNormal3f(0.0, 0.0, 1.0)
         glPushMatrix()
         glScalef(self.fontScale, self.fontScale, self.fontScale)
@@ -149,10 +158,10 @@ class Letters(GfxNode):
                 transltd = transltd + ret
 
         glPopMatrix()
-        glEnable(GL_LIGHTING)
 
         # end display-list definition
         self.endDispList(DLF_SOLID)
+        gs.enable(GL_LIGHTING)
         return
 
     def renderWire(self):
@@ -64,6 +64,78 @@ VFR_API int gfxTriangles_DrawTrias(int nv, float* vtx,
 } // end of gfxTriangles_DrawTrias()
 
 
+//---------------------- gfxTriangles_DrawElements ----------------------
+VFR_API int gfxTriangles_DrawElements(int nv, float* vtx,
+				      int ni, int* idx,
+				      int nn, float* normal,
+				      int nc, float* color,
+				      int ntype, int ctype, int fbk)
+{
+  if ( nv < 1 || ! vtx ) return 0;
+  if ( ni < 3 || ! idx ) return 0;
+  if ( nn > 0 && ! normal ) return 0;
+  if ( nc > 0 && ! color ) return 0;
+
+  int i, f, nFace = ni / 3;
+  for ( i = 0; i < nFace*3; i++ )
+    if ( idx[i] < 0 || idx[i] >= nv ) return 0;
+
+  if ( fbk ) {
+    float vcolor[4];
+    glBegin(GL_TRIANGLES);
+    for ( f = 0; f < nFace; f++ ) {
+      id_to_rgba(f+1, vcolor); // offset id
+      glColor4fv(vcolor);
+      for ( i = 0; i < 3; i++ )
+	glVertex3fv(&vtx[idx[f*3+i]*3]);
+    } // end of for(f)
+    glEnd();
+    return 1;
+  }
+
+  if ( ntype == AT_WHOLE && nn > 0 )
+    glNormal3fv(&normal[0]);
+
+  if ( ntype == AT_PER_FACE || ctype == AT_PER_FACE ) {
+    // per-face attributes can not be expressed by vertex arrays
+    int v;
+    glBegin(GL_TRIANGLES);
+    for ( f = 0; f < nFace; f++ ) {
+      if ( ctype == AT_PER_FACE && f < nc )
+	glColor4fv(&color[f*4]);
+      if ( ntype == AT_PER_FACE && f < nn )
+	glNormal3fv(&normal[f*3]);
+      for ( i = 0; i < 3; i++ ) {
+	v = idx[f*3+i];
+	if ( ctype == AT_PER_VERTEX && v < nc )
+	  glColor4fv(&color[v*4]);
+	if ( ntype == AT_PER_VERTEX && v < nn )
+	  glNormal3fv(&normal[v*3]);
+	glVertex3fv(&vtx[v*3]);
+      } // end of for(i)
+    } // end of for(f)
+    glEnd();
+    return 1;
+  }
+
+  glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT);
+  glEnableClientState(GL_VERTEX_ARRAY);
+  glVertexPointer(3, GL_FLOAT, 0, vtx);
+  if ( ntype == AT_PER_VERTEX && nn >= nv ) {
+    glEnableClientState(GL_NORMAL_ARRAY);
+    glNormalPointer(GL_FLOAT, 0, normal);
+  }
+  if ( ctype == AT_PER_VERTEX && nc >= nv ) {
+    glEnableClientState(GL_COLOR_ARRAY);
+    glColorPointer(4, GL_FLOAT, 0, color);
+  }
+  glDrawElements(GL_TRIANGLES, nFace*3, GL_UNSIGNED_INT, idx);
+  glPopClientAttrib();
+
+  return 1;
+} // end of gfxTriangles_DrawElements()
+
+
 //---------------------- Normal smoother ----------------------
 #define TS_HASH_TABLE_SIZE 9967
 //  both 283 and 9967 are prime number
@@ -230,3 +302,61 @@ VFR_API VFR_BOOL gfxTriangles_CalcNormals(int nv, float* vtx,
   }
   return VFR_TRUE;
 }
+
+
+//---------------------- gfxTriangles_CalcNormalsIndexed ----------------------
+VFR_API VFR_BOOL gfxTriangles_CalcNormalsIndexed(int nv, float* vtx,
+						 int ni, int* idx,
+						 int nn, float* normal, int ntype)
+{
+  if ( ! vtx || ! idx || ! normal ) return VFR_FALSE;
+  int faceNum = ni / 3;
+  int nmlNum = faceNum;
+  if ( ntype == AT_PER_VERTEX ) nmlNum = nv;
+  if ( nv < 3 || faceNum < 1 ) return VFR_FALSE;
+  if ( nn < nmlNum ) return VFR_FALSE;
+
+  int n, i, i0, i1, i2;
+  for ( i = 0; i < faceNum*3; i++ )
+    if ( idx[i] < 0 || idx[i] >= nv ) return VFR_FALSE;
+
+  if ( ntype == AT_PER_VERTEX )
+    memset(normal, 0, sizeof(float)*3*nv);
+
+  CES::Vec3<float> v1, v2, nvec;
+  for ( n = 0; n < faceNum; n++ ) {
+    i0 = idx[n*3]; i1 = idx[n*3+1]; i2 = idx[n*3+2];
+    v1[0] = vtx[i1*3  ] - vtx[i0*3  ];
+    v1[1] = vtx[i1*3+1] - vtx[i0*3+1];
+    v1[2] = vtx[i1*3+2] - vtx[i0*3+2];
+    v2[0] = vtx[i2*3  ] - vtx[i1*3  ];
+    v2[1] = vtx[i2*3+1] - vtx[i1*3+1];
+    v2[2] = vtx[i2*3+2] - vtx[i1*3+2];
+    nvec = v1 ^ v2;
+    if ( ntype == AT_PER_VERTEX ) {
+      // area weighted accumulation
+      for ( i = 0; i < 3; i++ ) {
+	normal[i0*3+i] += nvec[i];
+	normal[i1*3+i] += nvec[i];
+	normal[i2*3+i] += nvec[i];
+      }
+    } else {
+      normal[n*3  ] = nvec[0];
+      normal[n*3+1] = nvec[1];
+      normal[n*3+2] = nvec[2];
+    }
+  } // end of for(n)
+
+  if ( ntype == AT_PER_VERTEX ) {
+    for ( n = 0; n < nv; n++ ) {
+      float* pn = &normal[n*3];
+      float len = (float)sqrt(pn[0]*pn[0] + pn[1]*pn[1] + pn[2]*pn[2]);
+      if ( len <= 1e-8f ) {
+	pn[0] = 0.f; pn[1] = 0.f; pn[2] = 1.f;
+      } else {
+	pn[0] /= len; pn[1] /= len; pn[2] /= len;
+      }
+    } // end of for(n)
+  }
+  return VFR_TRUE;
+}
@@ -0,0 +1,286 @@
+/*
+vfr scene-graph library
+
+Copyright(c) YoH, 2026, All Right Reserved.
+*/
+#include "vfr_impl.h"
+#include <vector>
+#include <queue>
+#include <algorithm>
+
+/*
+  Quadric error metric (Garland-Heckbert) triangle mesh simplification.
+  Edges are collapsed in order of increasing quadric error until the number
+  of remaining faces reaches the target. Boundary edges are protected by
+  perpendicular penalty planes, and collapses that flip a face are rejected.
+*/
+
+// symmetric 4x4 quadric (a2 ab ac ad b2 bc bd c2 cd d2)
+struct Quadric {
+  double q[10];
+  Quadric() {memset(q, 0, sizeof(double)*10);}
+  void addPlane(double a, double b, double c, double d, double w) {
+    q[0] += w*a*a; q[1] += w*a*b; q[2] += w*a*c; q[3] += w*a*d;
+    q[4] += w*b*b; q[5] += w*b*c; q[6] += w*b*d;
+    q[7] += w*c*c; q[8] += w*c*d;
+    q[9] += w*d*d;
+  }
+  void operator+=(const Quadric& o) {
+    for ( int i = 0; i < 10; i++ ) q[i] += o.q[i];
+  }
+  double eval(const double* p) const {
+    const double x = p[0], y = p[1], z = p[2];
+    return q[0]*x*x + 2*q[1]*x*y + 2*q[2]*x*z + 2*q[3]*x
+      + q[4]*y*y + 2*q[5]*y*z + 2*q[6]*y
+      + q[7]*z*z + 2*q[8]*z + q[9];
+  }
+  bool optimum(double* p) const {
+    // solve [a2 ab ac; ab b2 bc; ac bc c2] p = -[ad bd cd]
+    double m00 = q[0], m01 = q[1], m02 = q[2];
+    double m11 = q[4], m12 = q[5], m22 = q[7];
+    double det = m00*(m11*m22 - m12*m12) - m01*(m01*m22 - m12*m02)
+      + m02*(m01*m12 - m11*m02);
+    double scl = fabs(m00) + fabs(m11) + fabs(m22);
+    if ( fabs(det) <= 1e-12 * scl*scl*scl || scl <= 0.0 ) return false;
+    double b0 = -q[3], b1 = -q[6], b2 = -q[8];
+    p[0] = (b0*(m11*m22 - m12*m12) - m01*(b1*m22 - m12*b2)
+            + m02*(b1*m12 - m11*b2)) / det;
+    p[1] = (m00*(b1*m22 - m12*b2) - b0*(m01*m22 - m12*m02)
+            + m02*(m01*b2 - b1*m02)) / det;
+    p[2] = (m00*(m11*b2 - b1*m12) - m01*(m01*b2 - b1*m02)
+            + b0*(m01*m12 - m11*m02)) / det;
+    return true;
+  }
+};
+
+struct Collapse {
+  double cost;
+  int v0, v1;
+  int s0, s1; // vertex stamps at push
+  double p[3];
+  bool operator<(const Collapse& o) const {return cost > o.cost;}
+};
+
+struct QEMesh {
+  std::vector<double> pos;       // 3*nv
+  std::vector<Quadric> quad;
+  std::vector<int> stamp;        // -1: removed
+  std::vector<std::vector<int> > vfaces;
+  std::vector<int> face;         // 3*nf
+  std::vector<char> alive;
+  std::priority_queue<Collapse> heap;
+  int nLive;
+
+  void faceNormal(int f, int vmov, const double* p, double* n) const {
+    const double* q[3];
+    for ( int i = 0; i < 3; i++ ) {
+      int v = face[f*3+i];
+      q[i] = (v == vmov) ? p : &pos[v*3];
+    }
+    double e1[3], e2[3];
+    for ( int i = 0; i < 3; i++ ) {
+      e1[i] = q[1][i] - q[0][i]; e2[i] = q[2][i] - q[0][i];
+    }
+    n[0] = e1[1]*e2[2] - e1[2]*e2[1];
+    n[1] = e1[2]*e2[0] - e1[0]*e2[2];
+    n[2] = e1[0]*e2[1] - e1[1]*e2[0];
+  }
+
+  void push(int v0, int v1) {
+    Quadric Q = quad[v0]; Q += quad[v1];
+    Collapse c;
+    c.v0 = v0; c.v1 = v1; c.s0 = stamp[v0]; c.s1 = stamp[v1];
+    if ( ! Q.optimum(c.p) ) {
+      const double* a = &pos[v0*3];
+      const double* b = &pos[v1*3];
+      double m[3] = {(a[0]+b[0])*0.5, (a[1]+b[1])*0.5, (a[2]+b[2])*0.5};
+      double ea = Q.eval(a), eb = Q.eval(b), em = Q.eval(m);
+      const double* best = a; double e = ea;
+      if ( eb < e ) {best = b; e = eb;}
+      if ( em < e ) {best = m; e = em;}
+      memcpy(c.p, best, sizeof(double)*3);
+    }
+    c.cost = Q.eval(c.p);
+    if ( c.cost < 0.0 ) c.cost = 0.0;
+    heap.push(c);
+  }
+
+  bool flips(int v, int other, const double* p) const {
+    const std::vector<int>& fl = vfaces[v];
+    for ( size_t k = 0; k < fl.size(); k++ ) {
+      int f = fl[k];
+      if ( ! alive[f] ) continue;
+      const int* fv = &face[f*3];
+      if ( fv[0] == other || fv[1] == other || fv[2] == other ) continue;
+      double n0[3], n1[3];
+      faceNormal(f, -1, p, n0);
+      faceNormal(f, v, p, n1);
+      double d = n0[0]*n1[0] + n0[1]*n1[1] + n0[2]*n1[2];
+      double l1 = n1[0]*n1[0] + n1[1]*n1[1] + n1[2]*n1[2];
+      if ( d <= 0.0 || l1 <= 0.0 ) return true;
+    }
+    return false;
+  }
+
+  void collapse(const Collapse& c) {
+    int v0 = c.v0, v1 = c.v1;
+    memcpy(&pos[v0*3], c.p, sizeof(double)*3);
+    quad[v0] += quad[v1];
+    stamp[v1] = -1;
+    stamp[v0]++;
+
+    // move faces of v1 to v0, kill degenerated faces
+    std::vector<int>& f0 = vfaces[v0];
+    const std::vector<int>& f1 = vfaces[v1];
+    for ( size_t k = 0; k < f1.size(); k++ ) {
+      int f = f1[k];
+      if ( ! alive[f] ) continue;
+      int* fv = &face[f*3];
+      bool has0 = (fv[0] == v0 || fv[1] == v0 || fv[2] == v0);
+      if ( has0 ) {alive[f] = 0; nLive--; continue;}
+      for ( int i = 0; i < 3; i++ ) if ( fv[i] == v1 ) fv[i] = v0;
+      f0.push_back(f);
+    }
+    vfaces[v1].clear();
+
+    // compact face list and re-push edges around v0
+    size_t j = 0;
+    std::vector<int> nbr;
+    for ( size_t k = 0; k < f0.size(); k++ ) {
+      int f = f0[k];
+      if ( ! alive[f] ) continue;
+      f0[j++] = f;
+      for ( int i = 0; i < 3; i++ ) {
+        int v = face[f*3+i];
+        if ( v != v0 ) nbr.push_back(v);
+      }
+    }
+    f0.resize(j);
+    std::sort(nbr.begin(), nbr.end());
+    nbr.erase(std::unique(nbr.begin(), nbr.end()), nbr.end());
+    for ( size_t k = 0; k < nbr.size(); k++ )
+      push(v0, nbr[k]);
+  }
+};
+
+static inline unsigned long long edgeKey(int a, int b) {
+  if ( a > b ) {int t = a; a = b; b = t;}
+  return ((unsigned long long)(unsigned int)a << 32) | (unsigned int)b;
+}
+
+//---------------------- triaLod_Simplify ----------------------
+/*
+  nv, vtx: vertices (3*nv floats)
+  nf, idx: triangles (3*nf ints)
+  target: target number of faces
+  ovtx: output vertices (3*nv floats, allocated by caller)
+  onv: output number of vertices
+  oidx: output triangles (3*nf ints, allocated by caller)
+  returns output number of faces, or -1 on error
+*/
+VFR_API int triaLod_Simplify(int nv, float* vtx, int nf, int* idx,
+                             int target,
+                             float* ovtx, int* onv, int* oidx)
+{
+  if ( nv < 3 || ! vtx || nf < 1 || ! idx ) return -1;
+  if ( ! ovtx || ! onv || ! oidx ) return -1;
+  for ( int i = 0; i < nf*3; i++ )
+    if ( idx[i] < 0 || idx[i] >= nv ) return -1;
+
+  QEMesh m;
+  m.pos.resize(nv*3);
+  for ( int i = 0; i < nv*3; i++ ) m.pos[i] = vtx[i];
+  m.quad.resize(nv);
+  m.stamp.assign(nv, 0);
+  m.vfaces.resize(nv);
+  m.face.assign(idx, idx + nf*3);
+  m.alive.assign(nf, 1);
+  m.nLive = nf;
+
+  // face quadrics, adjacency, edges
+  std::vector<unsigned long long> edges;
+  edges.reserve(nf*3);
+  std::vector<double> fn(nf*3, 0.0);
+  for ( int f = 0; f < nf; f++ ) {
+    const int* fv = &m.face[f*3];
+    if ( fv[0] == fv[1] || fv[1] == fv[2] || fv[2] == fv[0] ) {
+      m.alive[f] = 0; m.nLive--; continue;
+    }
+    double n[3];
+    m.faceNormal(f, -1, 0, n);
+    double l = sqrt(n[0]*n[0] + n[1]*n[1] + n[2]*n[2]);
+    for ( int i = 0; i < 3; i++ ) m.vfaces[fv[i]].push_back(f);
+    for ( int i = 0; i < 3; i++ )
+      edges.push_back(edgeKey(fv[i], fv[(i+1)%3]));
+    if ( l <= 0.0 ) continue;
+    n[0] /= l; n[1] /= l; n[2] /= l;
+    memcpy(&fn[f*3], n, sizeof(double)*3);
+    const double* p = &m.pos[fv[0]*3];
+    double d = -(n[0]*p[0] + n[1]*p[1] + n[2]*p[2]);
+    for ( int i = 0; i < 3; i++ )
+      m.quad[fv[i]].addPlane(n[0], n[1], n[2], d, l*0.5);
+  }
+  std::sort(edges.begin(), edges.end());
+
+  // boundary penalty planes
+  for ( int f = 0; f < nf; f++ ) {
+    if ( ! m.alive[f] ) continue;
+    const int* fv = &m.face[f*3];
+    for ( int i = 0; i < 3; i++ ) {
+      int a = fv[i], b = fv[(i+1)%3];
+      unsigned long long k = edgeKey(a, b);
+      size_t c = std::upper_bound(edges.begin(), edges.end(), k)
+        - std::lower_bound(edges.begin(), edges.end(), k);
+      if ( c != 1 ) continue;
+      const double* pa = &m.pos[a*3];
+      const double* pb = &m.pos[b*3];
+      double e[3] = {pb[0]-pa[0], pb[1]-pa[1], pb[2]-pa[2]};
+      const double* n = &fn[f*3];
+      double q[3] = {e[1]*n[2] - e[2]*n[1],
+                     e[2]*n[0] - e[0]*n[2],
+                     e[0]*n[1] - e[1]*n[0]};
+      double l = sqrt(q[0]*q[0] + q[1]*q[1] + q[2]*q[2]);
+      if ( l <= 0.0 ) continue;
+      q[0] /= l; q[1] /= l; q[2] /= l;
+      double d = -(q[0]*pa[0] + q[1]*pa[1] + q[2]*pa[2]);
+      double w = 1000.0 * (e[0]*e[0] + e[1]*e[1] + e[2]*e[2]);
+      m.quad[a].addPlane(q[0], q[1], q[2], d, w);
+      m.quad[b].addPlane(q[0], q[1], q[2], d, w);
+    }
+  }
+
+  // initial collapses
+  edges.erase(std::unique(edges.begin(), edges.end()), edges.end());
+  for ( size_t k = 0; k < edges.size(); k++ )
+    m.push((int)(edges[k] >> 32), (int)(edges[k] & 0xFFFFFFFFULL));
+  std::vector<unsigned long long>().swap(edges);
+
+  // collapse loop
+  while ( m.nLive > target && ! m.heap.empty() ) {
+    Collapse c = m.heap.top(); m.heap.pop();
+    if ( m.stamp[c.v0] < 0 || m.stamp[c.v1] < 0 ) continue;
+    if ( m.stamp[c.v0] != c.s0 || m.stamp[c.v1] != c.s1 ) continue;
+    if ( m.flips(c.v0, c.v1, c.p) || m.flips(c.v1, c.v0, c.p) ) continue;
+    m.collapse(c);
+  }
+
+  // compact output
+  std::vector<int> remap(nv, -1);
+  int nvo = 0, nfo = 0;
+  for ( int f = 0; f < nf; f++ ) {
+    if ( ! m.alive[f] ) continue;
+    for ( int i = 0; i < 3; i++ ) {
+      int v = m.face[f*3+i];
+      if ( remap[v] < 0 ) {
+        remap[v] = nvo;
+        for ( int j = 0; j < 3; j++ )
+          ovtx[nvo*3+j] = (float)m.pos[v*3+j];
+        nvo++;
+      }
+      oidx[nfo*3+i] = remap[v];
+    }
+    nfo++;
+  }
+  *onv = nvo;
+  return nfo;
+}
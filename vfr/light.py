@@ -102,7 +102,8 @@ class Light(GfxNode):
 
         self.applyMaterial()
 
-        glDisable(GL_LIGHTING)
+        gs = GfxNode.GetGLState()
+        gs.disable(GL_LIGHTING)
         glColor4fv(self._diffuse)
 
         if not self.beginDispList(DLF_WIRE):
@@ -145,7 +146,7 @@ class Light(GfxNode):
 
             self.endDispList(DLF_WIRE)
 
-        glEnable(GL_LIGHTING)
+        gs.enable(GL_LIGHTING)
         self.unApplyMaterial()
 
         self.drawBbox()
@@ -93,6 +93,18 @@ class Lines(GfxNode):
         self.unApplyMatrix()
         return
 
+    def getFeedbackElements(self):
+        """
+        CPUフィードバック用の要素を返す
+        FB_VERTEXでは頂点，FB_EDGEでは2頂点ずつの線分を返します．
+        """
+        if self._feedbackMode == FB_VERTEX:
+            return GfxNode.getFeedbackElements(self)
+        ne = self.nVerts // 2
+        if self._feedbackMode != FB_EDGE or ne < 1: return None
+        return (self.getVertsArray(),
+                N.arange(ne*2, dtype=N.int32).reshape((ne, 2)), None)
+
     def renderWire(self):
         """
         ワイヤーフレームレンダリング
@@ -183,6 +195,22 @@ class LineStrip(GfxNode):
         self.unApplyMatrix()
         return
 
+    def getFeedbackElements(self):
+        """
+        CPUフィードバック用の要素を返す
+        FB_VERTEXでは頂点，FB_EDGEでは連結線分(ループモードの場合は
+        最後の頂点と先頭の頂点の線分を含む)を返します．
+        """
+        if self._feedbackMode == FB_VERTEX:
+            return GfxNode.getFeedbackElements(self)
+        nv = self.nVerts
+        if self._feedbackMode != FB_EDGE or nv < 2: return None
+        a = N.arange(nv - 1, dtype=N.int32)
+        edges = N.stack((a, a+1), axis=1)
+        if self.loopMode:
+            edges = N.concatenate((edges, [[nv-1, 0]])).astype(N.int32)
+        return (self.getVertsArray(), edges, None)
+
     def renderWire(self):
         """
         ワイヤーフレームレンダリング
@@ -0,0 +1,360 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+vfr scene-graph library
+
+Copyright(c) YoH, 2026, All Right Reserved.
+
+"""
+import numpy as N
+import ctypes as C
+import hashlib
+import math
+import os.path
+
+#----------------------------------------------------------------------
+vfr_impl = N.ctypeslib.load_library('vfr_impl',
+                                    os.path.join(os.path.dirname(__file__),
+                                                 "..", "bin"))
+vfr_impl.triaLod_Simplify.restype = C.c_int
+vfr_impl.triaLod_Simplify.argtypes = [
+    C.c_int, C.POINTER(C.c_float),
+    C.c_int, C.POINTER(C.c_int),
+    C.c_int,
+    C.POINTER(C.c_float), C.POINTER(C.c_int), C.POINTER(C.c_int)]
+vfr_impl.gfxTriangles_DrawElements.restype = C.c_int
+vfr_impl.gfxTriangles_DrawElements.argtypes = [
+    C.c_int, C.POINTER(C.c_float*3),
+    C.c_int, C.POINTER(C.c_int),
+    C.c_int, C.POINTER(C.c_float*3),
+    C.c_int, C.POINTER(C.c_float*4),
+    C.c_int, C.c_int, C.c_int]
+
+"""属性タイプ(gfxNode.AT_*と同じ値)"""
+(_AT_WHOLE, _AT_PER_VERTEX) = (0, 1)
+
+"""LODキャッシュファイルの版番号"""
+LOD_FILE_VERSION = 1
+
+
+#----------------------------------------------------------------------
+def Simplify(verts, faces, target):
+    """
+    二次誤差尺度(QEM)による三角形メッシュの簡略化
+    辺の縮約を誤差の小さい順に行い，三角形数をtarget以下にします．
+    (頂点座標配列(n, 3), 三角形の頂点番号配列(m, 3))を返します．
+    失敗した場合はNoneを返します．
+    - verts: 頂点座標配列(float32, (nv, 3))
+    - faces: 三角形の頂点番号配列(int32, (nf, 3))
+    - target: 目標の三角形数
+    """
+    V = N.ascontiguousarray(verts, dtype=N.float32)
+    F = N.ascontiguousarray(faces, dtype=N.int32)
+    if len(V) < 3 or len(F) < 1: return None
+    oV = N.zeros(V.shape, dtype=N.float32)
+    oF = N.zeros(F.shape, dtype=N.int32)
+    onv = C.c_int(0)
+    nf = vfr_impl.triaLod_Simplify(
+        len(V), V.ctypes.data_as(C.POINTER(C.c_float)),
+        len(F), F.ctypes.data_as(C.POINTER(C.c_int)),
+        int(target),
+        oV.ctypes.data_as(C.POINTER(C.c_float)), C.byref(onv),
+        oF.ctypes.data_as(C.POINTER(C.c_int)))
+    if nf < 0: return None
+    return (oV[0:onv.value].copy(), oF[0:nf].copy())
+
+def VertexNormals(verts, faces):
+    """
+    面積で重み付けした頂点毎の法線ベクトルを返す
+    - verts: 頂点座標配列(nv, 3)
+    - faces: 三角形の頂点番号配列(nf, 3)
+    """
+    V = N.asarray(verts, dtype=N.float64)
+    F = N.asarray(faces)
+    fn = N.cross(V[F[:,1]] - V[F[:,0]], V[F[:,2]] - V[F[:,0]])
+    idx = F.reshape((-1,))
+    vn = N.zeros((len(V), 3))
+    for i in range(3):
+        vn[:, i] = N.bincount(idx, weights=N.repeat(fn[:, i], 3),
+                              minlength=len(V))
+    l = N.sqrt((vn * vn).sum(axis=1))
+    l[l < 1e-20] = 1.0
+    return (vn / l[:, None]).astype(N.float32)
+
+def IndexMesh(verts, faces):
+    """
+    座標が一致する頂点を統合したインデックスメッシュを返す
+    インデックスモードでないメッシュ(三角形毎に独立した頂点を持つ
+    三角形の集合)は辺を共有しないため，簡略化の前に統合します．
+    縮退した三角形は削除します．
+    (頂点座標配列(n, 3), 三角形の頂点番号配列(m, 3))を返します．
+    - verts: 頂点座標配列(nv, 3)
+    - faces: 三角形の頂点番号配列(nf, 3)
+    """
+    key = N.ascontiguousarray(N.asarray(verts, dtype=N.float32) + 0.0)
+    (uniq, inv) = N.unique(key, axis=0, return_inverse=True)
+    F = inv.reshape((-1,)).astype(N.int32)[N.asarray(faces)]
+    valid = (F[:,0] != F[:,1]) & (F[:,1] != F[:,2]) & (F[:,2] != F[:,0])
+    return (uniq, F[valid])
+
+def MeshKey(verts, faces):
+    """
+    メッシュの内容から求めたキャッシュ用のキー文字列を返す
+    - verts: 頂点座標配列
+    - faces: 三角形の頂点番号配列
+    """
+    h = hashlib.sha1()
+    h.update(N.ascontiguousarray(verts, dtype=N.float32).tobytes())
+    h.update(N.ascontiguousarray(faces, dtype=N.int32).tobytes())
+    return h.hexdigest()
+
+
+#----------------------------------------------------------------------
+class LODChain(object):
+    """
+    LOD(詳細度)チェーンクラス
+    LODChainクラスは，元の三角形メッシュをQEMで段階的に簡略化した
+    レベルの列を保持します．レベル0は元のメッシュ(ノード自身のデータ)で，
+    レベル1以降を頂点座標，三角形の頂点番号，頂点毎の法線ベクトルの
+    配列として保持します．
+      _nFaces: レベル毎の三角形数(レベル0を含む)
+      _levels: レベル1以降の(頂点座標, 頂点番号, 法線ベクトル)のリスト
+      _key: 元のメッシュのキー(MeshKey)
+    """
+    def __init__(self):
+        self._nFaces = [0]
+        self._levels = []
+        self._key = None
+        return
+
+    def build(self, verts, faces, ratio =0.5, minFaces =1000, maxLevels =8):
+        """
+        LODチェーンの構築
+        直前のレベルの三角形数にratioを乗じた数を目標として簡略化を繰り返し，
+        三角形数がminFacesを下回るかmaxLevelsに達したら終了します．
+        構築したレベル数(レベル0を除く)を返します．
+        - verts: 元のメッシュの頂点座標配列(nv, 3)
+        - faces: 元のメッシュの三角形の頂点番号配列(nf, 3)
+        - ratio: レベル毎の三角形数の縮小率
+        - minFaces: 最小の三角形数
+        - maxLevels: 最大レベル数
+        """
+        self._nFaces = [len(faces)]
+        self._levels = []
+        self._key = MeshKey(verts, faces)
+        if ratio <= 0.0 or ratio >= 1.0: return 0
+        (V, F) = (verts, faces)
+        while len(self._levels) < maxLevels:
+            target = int(len(F) * ratio)
+            if target < minFaces: break
+            res = Simplify(V, F, target)
+            if res is None or len(res[1]) >= len(F): break
+            (V, F) = res
+            self._levels.append((V, F, VertexNormals(V, F)))
+            self._nFaces.append(len(F))
+        return len(self._levels)
+
+    def save(self, path):
+        """
+        LODチェーンのファイル出力(NumPy npz形式)
+        成功した場合はTrueを返します．
+        - path: 出力ファイルのパス
+        """
+        arrs = {'version':N.array([LOD_FILE_VERSION]),
+                'nFaces':N.array(self._nFaces, dtype=N.int64),
+                'key':N.array([self._key if self._key else ''])}
+        for i, (V, F, Vn) in enumerate(self._levels):
+            arrs['v%d' % i] = V
+            arrs['f%d' % i] = F
+            arrs['n%d' % i] = Vn
+        try:
+            with open(path, 'wb') as f:
+                N.savez(f, **arrs)
+        except:
+            return False
+        return True
+
+    def load(self, path):
+        """
+        LODチェーンのファイル入力
+        成功した場合はTrueを返します．
+        - path: 入力ファイルのパス
+        """
+        try:
+            with N.load(path) as z:
+                if int(z['version'][0]) != LOD_FILE_VERSION: return False
+                nFaces = [int(x) for x in z['nFaces']]
+                levels = []
+                for i in range(len(nFaces) - 1):
+                    levels.append((z['v%d' % i], z['f%d' % i],
+                                   z['n%d' % i]))
+                key = str(z['key'][0])
+        except:
+            return False
+        self._nFaces = nFaces
+        self._levels = levels
+        self._key = key if len(key) > 0 else None
+        return True
+
+    def getKey(self):
+        """
+        元のメッシュのキーを返す
+        """
+        return self._key
+
+    def getNumLevels(self):
+        """
+        レベル数(レベル0を含む)を返す
+        """
+        return len(self._nFaces)
+
+    def getNumFaces(self, level):
+        """
+        指定レベルの三角形数を返す
+        - level: レベル
+        """
+        if level < 0 or level >= len(self._nFaces): return 0
+        return self._nFaces[level]
+
+    def getLevel(self, level):
+        """
+        指定レベルの(頂点座標, 頂点番号, 法線ベクトル)配列を返す
+        レベル0および範囲外の場合はNoneを返します．
+        - level: レベル
+        """
+        if level < 1 or level > len(self._levels): return None
+        return self._levels[level-1]
+
+    def pickLevel(self, targetFaces):
+        """
+        目標の三角形数を下回らない最も粗いレベルを返す
+        - targetFaces: 目標の三角形数
+        """
+        lv = 0
+        for i in range(1, len(self._nFaces)):
+            if self._nFaces[i] < targetFaces: break
+            lv = i
+        return lv
+
+    def draw(self, level):
+        """
+        指定レベルの描画
+        頂点毎の法線ベクトルを持つインデックス三角形として描画します．
+        描画した場合はTrueを返します．
+        - level: レベル(1以上)
+        """
+        lvl = self.getLevel(level)
+        if lvl is None: return False
+        (V, F, Vn) = lvl
+        ret = vfr_impl.gfxTriangles_DrawElements(
+            len(V), V.ctypes.data_as(C.POINTER(C.c_float*3)),
+            F.size, F.ctypes.data_as(C.POINTER(C.c_int)),
+            len(Vn), Vn.ctypes.data_as(C.POINTER(C.c_float*3)),
+            0, None, _AT_PER_VERTEX, _AT_WHOLE, 0)
+        return (ret != 0)
+
+
+def GetLODChain(verts, faces, cacheDir =None, ratio =0.5, minFaces =1000,
+                maxLevels =8):
+    """
+    LODチェーンの取得
+    cacheDirが指定された場合，メッシュのキーをファイル名とするキャッシュ
+    ファイルが存在すればそれを読み込み，存在しなければ構築して保存します．
+    - verts: 元のメッシュの頂点座標配列(nv, 3)
+    - faces: 元のメッシュの三角形の頂点番号配列(nf, 3)
+    - cacheDir: キャッシュディレクトリ．Noneの場合はキャッシュしません．
+    - ratio, minFaces, maxLevels: LODChain.build参照
+    """
+    chain = LODChain()
+    path = None
+    if cacheDir:
+        key = MeshKey(verts, faces)
+        name = '%s_%g_%d_%d.lod.npz' % (key, ratio, minFaces, maxLevels)
+        path = os.path.join(cacheDir, name)
+        if os.path.exists(path) and chain.load(path) \
+               and chain.getKey() == key:
+            return chain
+    chain.build(verts, faces, ratio, minFaces, maxLevels)
+    if path:
+        try:
+            if not os.path.isdir(cacheDir):
+                os.makedirs(cacheDir)
+        except:
+            pass
+        chain.save(path)
+    return chain
+
+
+#----------------------------------------------------------------------
+class LODSelector(object):
+    """
+    LODレベル選択クラス
+    レンダリング時に，ノードのワールド座標系でのバウンディングボックスを
+    画面に投影した大きさ(ピクセル)から描画するLODレベルを選択します．
+    投影サイズの2乗×facesPerPixel×2^(-(bias+qualityBias))を目標の
+    三角形数とし，
+    それを下回らない最も粗いレベルを選びます．
+      _T: ワールド座標からクリップ座標への変換行列(転置)
+      _viewport: ビューポートの幅と高さ
+      bias: LODバイアス．大きいほど粗いレベルを選択します
+      qualityBias: 描画品質(quality.RenderQuality)によるLODバイアスの加算値
+      facesPerPixel: 投影面積1ピクセル当たりの目標の三角形数
+      selected: フレーム内で選択されたレベル毎のノード数
+    """
+    def __init__(self):
+        self._T = N.identity(4)
+        self._viewport = (1, 1)
+        self.bias = 0.0
+        self.qualityBias = 0.0
+        self.facesPerPixel = 0.5
+        self.selected = {}
+        return
+
+    def begin(self, PM, MVM, viewport):
+        """
+        フレームの開始
+        - PM: プロジェクション行列(utilMath.Mat4)
+        - MVM: モデルビュー行列(utilMath.Mat4)
+        - viewport: ビューポート(x, y, 幅, 高さ)
+        """
+        self._T = N.dot(N.asarray(MVM.m_v, dtype=N.float64).reshape((4,4)),
+                        N.asarray(PM.m_v, dtype=N.float64).reshape((4,4)))
+        self._viewport = (max(int(viewport[2]), 1), max(int(viewport[3]), 1))
+        self.selected = {}
+        return
+
+    def projectedSize(self, node):
+        """
+        ノードのバウンディングボックスの投影サイズ(ピクセル)を返す
+        視点の後方にかかる場合はビューポートの大きさを返します．
+        - node: GfxNode
+        """
+        bb = node.getWorldBbox()
+        x = (bb[0][0], bb[1][0])
+        y = (bb[0][1], bb[1][1])
+        z = (bb[0][2], bb[1][2])
+        P = N.array([[x[i], y[j], z[k], 1.0] \
+                     for i in (0,1) for j in (0,1) for k in (0,1)])
+        Cl = N.dot(P, self._T)
+        w = Cl[:,3]
+        if (w <= 1e-8).any():
+            return float(max(self._viewport))
+        ndc = Cl[:,0:2] / w[:,None]
+        ext = ndc.max(axis=0) - ndc.min(axis=0)
+        return max(ext[0] * 0.5 * self._viewport[0],
+                   ext[1] * 0.5 * self._viewport[1])
+
+    def select(self, node, chain):
+        """
+        ノードの描画LODレベルを返す
+        - node: GfxNode
+        - chain: ノードのLODChain
+        """
+        if chain is None or chain.getNumLevels() < 2:
+            return 0
+        px = self.projectedSize(node)
+        bias = self.bias + self.qualityBias
+        target = px * px * self.facesPerPixel * math.pow(2.0, -bias)
+        lv = chain.pickLevel(target)
+        self.selected[lv] = self.selected.get(lv, 0) + 1
+        return lv
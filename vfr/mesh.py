@@ -81,7 +81,7 @@ class Mesh2D(GfxNode):
         except:
             return False
         self.meshSize = ns
-        self.notice()
+        self.noticeData()
         return True
 
     def renderFeedBack(self, tgt):
@@ -143,6 +143,28 @@ class Mesh2D(GfxNode):
         self.unApplyMatrix()
         return
 
+    def getFeedbackElements(self):
+        """
+        CPUフィードバック用の要素を返す
+        FB_VERTEXでは頂点，FB_FACEでは四角形を分割した三角形(四角形の番号)，
+        FB_EDGEでは横線，縦線の順に付番した辺を返します．
+        """
+        if self._feedbackMode == FB_VERTEX:
+            return GfxNode.getFeedbackElements(self)
+        if self._feedbackMode == FB_FACE:
+            return self.getPickTriangles()
+        (m, n) = (self.meshSize.x, self.meshSize.y)
+        if self._feedbackMode != FB_EDGE or m < 2 or n < 2 \
+               or self.nVerts < m * n:
+            return None
+        (i, j) = N.meshgrid(N.arange(m-1), N.arange(n))
+        a = (j * m + i).reshape((-1,))
+        (j, i) = N.meshgrid(N.arange(n-1), N.arange(m))
+        b = (j * m + i).reshape((-1,))
+        edges = N.concatenate((N.stack((a, a+1), axis=1),
+                               N.stack((b, b+m), axis=1)))
+        return (self.getVertsArray()[0:m*n], edges, None)
+
     def generateNormals(self):
         """
         法線ベクトル再計算
@@ -163,7 +185,7 @@ class Mesh2D(GfxNode):
             v2.m_v[0:] = x[0:]
             vn = v1.cross(v2).unit()
             self._normals[0][0:] = vn[0:]
-            self.notice()
+            self.noticeData()
             return True
 
         # allocate normals
@@ -182,7 +204,7 @@ class Mesh2D(GfxNode):
                                              self.meshSize.x, self.meshSize.y,
                                              self._normalMode)
         if ret == 0: return False
-        self.notice()
+        self.noticeData()
         return True
 
     def getFeedbackSize(self):
@@ -198,6 +220,22 @@ class Mesh2D(GfxNode):
             fsz = fsz * 2
         return fsz
 
+    def getPickTriangles(self):
+        """
+        CPUピッキング用の三角形を返す
+        格子の四角形を2つの三角形に分割し，面番号として四角形の番号
+        (renderFeedBackのFB_FACEと同じ番号)を付けます．
+        """
+        (m, n) = (self.meshSize.x, self.meshSize.y)
+        if m < 2 or n < 2 or self.nVerts < m * n: return None
+        (i, j) = N.meshgrid(N.arange(m-1), N.arange(n-1))
+        a = (j * m + i).reshape((-1,))
+        faces = N.empty((len(a)*2, 3), dtype=N.int32)
+        faces[0::2] = N.stack((a, a+1, a+m+1), axis=1)
+        faces[1::2] = N.stack((a, a+m+1, a+m), axis=1)
+        fids = N.repeat(N.arange(len(a)), 2)
+        return (self.getVertsArray()[0:m*n], faces, fids)
+
     def renderSolid(self):
         """
         ソリッドレンダリング
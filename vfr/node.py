@@ -121,6 +121,7 @@ class Node(Base):
       _id: ID番号．全てのNodeクラスの派生クラスを通じて，ユニークな整数が
            割り振られます．
       _name: ノード名．指定しない場合は'%%noname%%'に設定されます．
+      _parent: 親ノード．複数のグループに属する場合は，そのうちの一つです．
     """
 
     """ノードシーケンシャル番号"""
@@ -137,6 +138,7 @@ class Node(Base):
         Node._sequence += 1
         self._id = Node._sequence
         self._name = Node._NONAME if not 'name' in args else args['name']
+        self._parent = None
         return
         
     def __del__(self):
@@ -160,10 +162,14 @@ class Node(Base):
         名前を設定する．
         - name: 設定する名前
         """
+        oldName = self._name
         if name is None or name == '':
-            self._name = _NONAME
+            self._name = Node._NONAME
         else:
             self._name = name
+        if oldName == self._name: return
+        for r in self.getRoots():
+            if hasattr(r, 'renameIndex'): r.renameIndex(self, oldName)
 
     def getID(self):
         """
@@ -171,6 +177,42 @@ class Node(Base):
         """
         return self._id
 
+    def getRoots(self):
+        """
+        ルートノードのリストを返す．
+        参照リンクのグループを辿って到達できるルートノードを，経路毎に
+        返します．
+        """
+        roots = []
+        stack = [self]
+        while len(stack) > 0:
+            n = stack.pop()
+            parents = [r for r in n._Ref if isinstance(r, Group)]
+            if len(parents) < 1:
+                roots.append(n)
+            else:
+                stack.extend(parents)
+        return roots
+
+    def getParent(self):
+        """
+        親ノードを返す．
+        """
+        return self._parent
+
+    def relinkParent(self):
+        """
+        親ノードの再設定
+        参照リンクの中から自分を子供に持つグループを探し，親ノードに
+        設定します．該当するグループが無い場合はNoneを設定します．
+        """
+        self._parent = None
+        for r in self._Ref:
+            if isinstance(r, Group) and self in r._children:
+                self._parent = r
+                break
+        return
+
     def rumor(self, ref):
         """
         参照先からの破壊通知を受け取リます．参照先のdestroy()から自動的に
@@ -256,6 +298,10 @@ class Group(Node):
         if node is self: return False
         self._children.append(node)
         node.addRef(self)
+        if node._parent is None:
+            node._parent = self
+        for r in self.getRoots():
+            if hasattr(r, 'updateIndex'): r.updateIndex(node, True)
         self.notice()
         return True
 
@@ -268,7 +314,11 @@ class Group(Node):
         if node is None: return False
         if node in self._children:
             self._children.remove(node)
+            for r in self.getRoots():
+                if hasattr(r, 'updateIndex'): r.updateIndex(node, False)
             node.remRef(self)
+            if node._parent is self:
+                node.relinkParent()
             self.notice()
             return True
         return False
@@ -279,9 +329,17 @@ class Group(Node):
         全ての子供ノードへの参照を削除します．
         """
         chlds = copy.copy(self._children)
+        roots = [r for r in self.getRoots() if hasattr(r, 'updateIndex')]
+        for r in roots:
+            for c in chlds:
+                r.updateIndex(c, False)
         for c in chlds:
             c.remRef(self)
-        del chlds, self._children[:]
+        del self._children[:]
+        for c in chlds:
+            if c._parent is self:
+                c.relinkParent()
+        del chlds
 
     def getNumChildren(self):
         """
@@ -10,6 +10,7 @@ Copyright(c) YoH, 2026, All Right Reserved.
 #----------------------------------------------------------------------
 import ctypes as C
 import numpy as N
+from . import trace
 
 import os.path
 vfr_impl = N.ctypeslib.load_library('vfr_impl',
@@ -133,6 +134,126 @@ class Obj(object):
         if self.nColors < 0: self.nColors = 0
         return
 
+    #-------- numpy view interface --------
+    def getVertsArray(self):
+        """
+        頂点座標配列のNumPyビューを返す
+        ObjDataの頂点座標領域をコピーせずに参照する，形状(nVerts, 3)の
+        float32配列を返します．ビューへの書き込みはObjDataに直接反映されます．
+        alcData等で領域が再確保されるとビューは無効になるため，
+        再確保後は改めて取得してください．
+        """
+        return self.__asArray(self._verts, self.nVerts, (0, 3), N.float32)
+
+    def getNormalsArray(self):
+        """
+        法線ベクトル配列のNumPyビューを返す
+        形状(nNormals, 3)のfloat32配列です．(getVertsArray参照)
+        """
+        return self.__asArray(self._normals, self.nNormals, (0, 3), N.float32)
+
+    def getColorsArray(self):
+        """
+        色(RGBA)配列のNumPyビューを返す
+        形状(nColors, 4)のfloat32配列です．(getVertsArray参照)
+        """
+        return self.__asArray(self._colors, self.nColors, (0, 4), N.float32)
+
+    def getIndicesArray(self):
+        """
+        インデックス配列のNumPyビューを返す
+        形状(nIndices,)のint32配列です．(getVertsArray参照)
+        """
+        return self.__asArray(self._indices, self.nIndices, (0,), N.int32)
+
+    def __asArray(self, ptr, n, eshape, dtype):
+        """
+        ctypesポインタからNumPyビューを生成する
+        - ptr: ObjDataの領域へのポインタ
+        - n: データ数
+        - eshape: データ数0の場合に返す空配列の形状
+        - dtype: データ型
+        """
+        if n < 1 or not ptr:
+            return N.zeros(eshape, dtype=dtype)
+        return N.ctypeslib.as_array(ptr, shape=(n,))
+
+    #-------- bulk data interface --------
+    def setVerts(self, verts):
+        """
+        頂点座標の一括設定
+        頂点座標領域をvertsの個数に再確保し，一括でコピーした後，
+        バウンディングボックスを再計算します．
+        - verts: 頂点座標配列．形状(n, 3)に変換可能な配列です．
+        """
+        if not self.p_impl: return False
+        try:
+            src = N.ascontiguousarray(verts, dtype=N.float32).reshape((-1, 3))
+        except:
+            return False
+        if not self.alcData(nV=src.shape[0]): return False
+        if src.shape[0] > 0:
+            C.memmove(self._verts, src.ctypes.data, src.nbytes)
+        self.generateBbox()
+        return True
+
+    def setNormals(self, normals):
+        """
+        法線ベクトルの一括設定
+        法線ベクトル領域をnormalsの個数に再確保し，一括でコピーします．
+        - normals: 法線ベクトル配列．形状(n, 3)に変換可能な配列です．
+        """
+        if not self.p_impl: return False
+        try:
+            src = N.ascontiguousarray(normals, dtype=N.float32).reshape((-1,3))
+        except:
+            return False
+        if not self.alcData(nN=src.shape[0]): return False
+        if src.shape[0] > 0:
+            C.memmove(self._normals, src.ctypes.data, src.nbytes)
+        return True
+
+    def setColors(self, colors):
+        """
+        色データの一括設定
+        色領域をcolorsの個数に再確保し，一括でコピーします．
+        RGB(形状(n, 3))が指定された場合，アルファ値は1.0になります．
+        - colors: 色配列．形状(n, 4)または(n, 3)の配列です．
+        """
+        if not self.p_impl: return False
+        try:
+            src = N.ascontiguousarray(colors, dtype=N.float32)
+            if src.ndim < 2:
+                src = src.reshape((-1, 4))
+        except:
+            return False
+        if src.shape[1] == 3:
+            rgba = N.ones((src.shape[0], 4), dtype=N.float32)
+            rgba[:, 0:3] = src
+            src = rgba
+        elif src.shape[1] != 4:
+            return False
+        if not self.alcData(nC=src.shape[0]): return False
+        if src.shape[0] > 0:
+            C.memmove(self._colors, src.ctypes.data, src.nbytes)
+        return True
+
+    def setIndices(self, indices):
+        """
+        インデックスデータの一括設定
+        インデックス領域をindicesの個数に再確保し，一括でコピーします．
+        - indices: インデックス配列．int32に変換可能な配列です．
+        """
+        if not self.p_impl: return False
+        try:
+            src = N.ascontiguousarray(indices, dtype=N.int32).reshape((-1,))
+        except:
+            return False
+        if not self.alcData(nI=src.shape[0]): return False
+        if src.shape[0] > 0:
+            C.memmove(self._indices, src.ctypes.data, src.nbytes)
+        return True
+
     def generateBbox(self):
         """
         バウンディングボックス再計算
@@ -175,6 +296,7 @@ class Obj(object):
         return
 
 
+    @trace.Traced('Obj.loadFile', 'load')
     def loadFile(self, path, fmt):
         """
         形状データファイル入力
@@ -0,0 +1,636 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+vfr scene-graph library
+
+Copyright(c) YoH, 2026, All Right Reserved.
+
+CPUピッキング
+ID色によるセレクション描画とglReadPixelsの代わりに，カーソル位置からの
+レイキャストと，セレクション領域の視垂台との交差判定をCPU上で行います．
+三角形で表せるノードにはノード毎のBVH(境界ボリューム階層)を，シーンには
+ノードのワールド座標系でのバウンディングボックスに対するBVHを
+必要になった時点で構築してキャッシュします．
+BVHは三角形(またはノード)の中心のモートン符号順に並べた葉を
+完全二分木にまとめたもので，構築・探索ともNumPyで木の段毎に
+一括処理します．
+"""
+import numpy as N
+from .gfxNode import *
+
+
+#----------------------------------------------------------------------
+def _rowMatrix(M):
+    """
+    Mat4を行ベクトル形式(v' = v・M)の4×4のfloat64配列に変換する
+    """
+    return N.asarray(M.m_v, dtype=N.float64).reshape((4,4))
+
+def _spreadBits(x):
+    """
+    10bitの整数の各ビットの間に2bitずつ0を挟む(モートン符号用)
+    """
+    x = x & 0x3ff
+    x = (x | (x << 16)) & 0x030000ff
+    x = (x | (x << 8)) & 0x0300f00f
+    x = (x | (x << 4)) & 0x030c30c3
+    x = (x | (x << 2)) & 0x09249249
+    return x
+
+def _corners(bmin, bmax):
+    """
+    ボックスの8頂点の同次座標を返す
+    形状(ボックス数, 8, 4)の配列を返します．
+    - bmin, bmax: 形状(ボックス数, 3)の最小点，最大点
+    """
+    n = len(bmin)
+    c = N.empty((n, 8, 4), dtype=N.float64)
+    for k in range(8):
+        c[:, k, 0] = bmax[:, 0] if k & 1 else bmin[:, 0]
+        c[:, k, 1] = bmax[:, 1] if k & 2 else bmin[:, 1]
+        c[:, k, 2] = bmax[:, 2] if k & 4 else bmin[:, 2]
+    c[:, :, 3] = 1.0
+    return c
+
+def _outsideClip(c):
+    """
+    クリップ座標の点群が視垂台のいずれかの面の完全に外側にあるかを返す
+    - c: 形状(個数, 点数, 4)のクリップ座標
+    """
+    x, y, z, w = c[..., 0], c[..., 1], c[..., 2], c[..., 3]
+    return (x > w).all(1) | (x < -w).all(1) | (y > w).all(1) \
+        | (y < -w).all(1) | (z > w).all(1) | (z < -w).all(1)
+
+def _clipDepth(c):
+    """
+    クリップ座標の点群の最小のデプス値(0.0〜1.0)を返す
+    w<=0の点しか無い場合は0.0とします．
+    - c: 形状(個数, 点数, 4)のクリップ座標
+    """
+    w = c[..., 3]
+    with N.errstate(divide='ignore', invalid='ignore'):
+        d = N.where(w > 0, (c[..., 2] / w + 1.0) * 0.5, N.inf)
+    d = d.min(axis=1)
+    d[N.isinf(d)] = 0.0
+    return N.clip(d, 0.0, 1.0)
+
+def _rectDepth(c0, c1, c2):
+    """
+    クリップ座標の三角形群の，クリップ立方体のXY範囲(セレクション領域)内
+    での最小のデプス値(0.0〜1.0)を返す
+    正規化デバイス座標のzは画面上で線形なため，三角形を領域で切り取った
+    多角形の頂点(領域内の頂点，三角形内の領域の隅，辺と領域の境界の
+    交点)での最小値とします．w<=0の頂点を含む三角形は，領域内にある
+    w>0の頂点の最小値(無ければ0.0)とします．
+    - c0, c1, c2: 形状(三角形数, 4)のクリップ座標
+    """
+    c = N.stack((c0, c1, c2), axis=1)
+    w = c[:, :, 3]
+    front = (w > 0.0).all(axis=1)
+    with N.errstate(divide='ignore', invalid='ignore'):
+        p = c[:, :, 0:3] / w[:, :, None]
+    (x, y, z) = (p[:, :, 0], p[:, :, 1], p[:, :, 2])
+    inside = (w > 0.0) & (N.abs(x) <= 1.0) & (N.abs(y) <= 1.0)
+    d = N.where(inside, z, N.inf).min(axis=1)
+    with N.errstate(divide='ignore', invalid='ignore'):
+        # edges crossing the borders of the rectangle
+        for k in range(3):
+            (a, b) = (k, (k+1) % 3)
+            for (u, v) in ((x, y), (y, x)):
+                for B in (-1.0, 1.0):
+                    s = (B - u[:, a]) / (u[:, b] - u[:, a])
+                    o = v[:, a] + s * (v[:, b] - v[:, a])
+                    zz = z[:, a] + s * (z[:, b] - z[:, a])
+                    ok = front & (s >= 0.0) & (s <= 1.0) & (N.abs(o) <= 1.0)
+                    d = N.where(ok, N.minimum(d, zz), d)
+        # corners of the rectangle inside the triangle
+        e1x = x[:, 1] - x[:, 0]; e1y = y[:, 1] - y[:, 0]
+        e2x = x[:, 2] - x[:, 0]; e2y = y[:, 2] - y[:, 0]
+        det = e1x * e2y - e2x * e1y
+        for (X, Y) in ((-1.0, -1.0), (1.0, -1.0), (-1.0, 1.0), (1.0, 1.0)):
+            qx = X - x[:, 0]; qy = Y - y[:, 0]
+            bu = (qx * e2y - e2x * qy) / det
+            bv = (e1x * qy - qx * e1y) / det
+            zz = z[:, 0] + bu * (z[:, 1] - z[:, 0]) + bv * (z[:, 2] - z[:, 0])
+            ok = front & (det != 0.0) & (bu >= 0.0) & (bv >= 0.0) \
+                & (bu + bv <= 1.0)
+            d = N.where(ok, N.minimum(d, zz), d)
+    d = (d + 1.0) * 0.5
+    d[N.isinf(d)] = 0.0
+    return N.clip(d, 0.0, 1.0)
+
+def _bboxTriangles(bb):
+    """
+    バウンディングボックスを12個の三角形で表す
+    (頂点座標配列(8, 3), 頂点番号配列(12, 3))を返します．
+    - bb: バウンディングボックス(Vec3, Vec3)
+    """
+    bmin = N.array([bb[0].m_v[0:3]], dtype=N.float64)
+    bmax = N.array([bb[1].m_v[0:3]], dtype=N.float64)
+    verts = _corners(bmin, bmax)[0, :, 0:3]
+    faces = N.array([[0,2,3], [0,3,1], [4,5,7], [4,7,6],
+                     [0,1,5], [0,5,4], [2,6,7], [2,7,3],
+                     [0,4,6], [0,6,2], [1,3,7], [1,7,5]], dtype=N.int32)
+    return (verts, faces)
+
+
+#----------------------------------------------------------------------
+def RayTriangles(org, dir, v0, v1, v2):
+    """
+    レイと三角形群の交差判定(Möller–Trumbore法)
+    (交差フラグ, レイのパラメータt, 重心座標u, v)の配列のタプルを返します．
+    交点は org + t*dir = (1-u-v)*v0 + u*v1 + v*v2 で，0<=t<=1の範囲のみ
+    交差とみなします．
+    - org, dir: レイの始点と方向(長さ3)
+    - v0, v1, v2: 形状(三角形数, 3)の三角形の頂点座標
+    """
+    e1 = v1 - v0
+    e2 = v2 - v0
+    p = N.cross(dir, e2)
+    det = (e1 * p).sum(axis=1)
+    ok = det != 0.0
+    inv = 1.0 / N.where(ok, det, 1.0)
+    s = org - v0
+    u = (s * p).sum(axis=1) * inv
+    q = N.cross(s, e1)
+    v = (q * dir).sum(axis=1) * inv
+    t = (e2 * q).sum(axis=1) * inv
+    hit = ok & (u >= 0.0) & (v >= 0.0) & (u + v <= 1.0) \
+        & (t >= 0.0) & (t <= 1.0)
+    return (hit, t, u, v)
+
+def ClipTriangles(c0, c1, c2):
+    """
+    クリップ座標の三角形群とクリップ立方体の交差判定
+    交差フラグの配列を返します．3頂点がw>0の三角形は正規化デバイス座標の
+    XY平面で分離軸判定を行い，それ以外の三角形はいずれかの面の完全に
+    外側にあるものだけを除きます．
+    - c0, c1, c2: 形状(三角形数, 4)のクリップ座標
+    """
+    c = N.stack((c0, c1, c2), axis=1)
+    hit = ~_outsideClip(c)
+    w = c[:, :, 3]
+    front = hit & (w > 0.0).all(axis=1)
+    if not front.any(): return hit
+    idx = N.nonzero(front)[0]
+    p = c[idx, :, 0:2] / w[idx, :, None]
+    for k in range(3):
+        a = p[:, k]
+        b = p[:, (k+1) % 3]
+        o = p[:, (k+2) % 3]
+        nx = a[:, 1] - b[:, 1]
+        ny = b[:, 0] - a[:, 0]
+        da = nx * a[:, 0] + ny * a[:, 1]
+        do = nx * o[:, 0] + ny * o[:, 1]
+        r = N.abs(nx) + N.abs(ny)
+        sep = (N.minimum(da, do) > r) | (N.maximum(da, do) < -r)
+        hit[idx[sep]] = False
+    return hit
+
+
+#----------------------------------------------------------------------
+class BVH(object):
+    """
+    境界ボリューム階層クラス
+    要素(三角形やノード)のバウンディングボックスの配列から構築します．
+    要素を中心のモートン符号順に並べてleafSize個ずつ葉にまとめ，
+    葉の数を2のべき乗に切り上げた完全二分木(配列上のヒープ)とします．
+    ノードkの子供は2k+1, 2k+2で，葉jはノードnumLeaves-1+jです．
+      num: 要素数
+      leafSize: 葉あたりの要素数
+      numLeaves: 葉の数(2のべき乗)
+      order: モートン符号順に並べた要素番号の配列
+      nmin, nmax: ノードのバウンディングボックス(形状(ノード数, 3))
+      valid: 要素を含むノードのフラグ
+    """
+    LEAF_SIZE = 8
+
+    def __init__(self, bmin, bmax, leafSize =None):
+        """
+        - bmin, bmax: 形状(要素数, 3)の要素のバウンディングボックス
+        - leafSize: 葉あたりの要素数．Noneの場合はLEAF_SIZE
+        """
+        bmin = N.asarray(bmin, dtype=N.float64).reshape((-1, 3))
+        bmax = N.asarray(bmax, dtype=N.float64).reshape((-1, 3))
+        self.num = n = len(bmin)
+        self.leafSize = ls = BVH.LEAF_SIZE if leafSize is None else leafSize
+        nl = max(1, (n + ls - 1) // ls)
+        P = 1
+        while P < nl: P *= 2
+        self.numLeaves = P
+        self.nmin = N.full((2*P - 1, 3), N.inf)
+        self.nmax = N.full((2*P - 1, 3), -N.inf)
+        if n < 1:
+            self.order = N.zeros((0,), dtype=N.int64)
+            self.valid = N.zeros((2*P - 1,), dtype=bool)
+            return
+
+        # sort elements along the Morton curve
+        cen = (bmin + bmax) * 0.5
+        lo = cen.min(axis=0)
+        ext = cen.max(axis=0) - lo
+        ext[ext <= 0.0] = 1.0
+        q = ((cen - lo) / ext * 1023.0).astype(N.int64)
+        code = _spreadBits(q[:, 0]) | (_spreadBits(q[:, 1]) << 1) \
+            | (_spreadBits(q[:, 2]) << 2)
+        self.order = N.argsort(code, kind='stable')
+
+        # leaves, then internal nodes level by level
+        starts = N.arange(0, n, ls)
+        self.nmin[P-1:P-1+nl] = N.minimum.reduceat(bmin[self.order], starts)
+        self.nmax[P-1:P-1+nl] = N.maximum.reduceat(bmax[self.order], starts)
+        s = P // 2
+        while s >= 1:
+            p = N.arange(s - 1, 2*s - 1)
+            self.nmin[p] = N.minimum(self.nmin[2*p + 1], self.nmin[2*p + 2])
+            self.nmax[p] = N.maximum(self.nmax[2*p + 1], self.nmax[2*p + 2])
+            s //= 2
+        self.valid = (self.nmin <= self.nmax).all(axis=1)
+        return
+
+    def elements(self, leaves):
+        """
+        葉に含まれる要素番号の配列を返す
+        - leaves: 葉番号の配列
+        """
+        leaves = N.asarray(leaves, dtype=N.int64)
+        idx = (leaves[:, None] * self.leafSize
+               + N.arange(self.leafSize)[None, :]).reshape((-1,))
+        return self.order[idx[idx < self.num]]
+
+    def queryRay(self, org, dir, tmax =1.0):
+        """
+        レイと交差する可能性のある要素番号の配列を返す
+        - org, dir: レイの始点と方向(長さ3)
+        - tmax: レイのパラメータtの上限
+        """
+        if self.num < 1: return N.zeros((0,), dtype=N.int64)
+        org = N.asarray(org, dtype=N.float64)
+        dir = N.asarray(dir, dtype=N.float64)
+        inv = 1.0 / N.where(N.abs(dir) < 1e-300, 1e-300, dir)
+        nodes = N.zeros((1,), dtype=N.int64)
+        while True:
+            t0 = (self.nmin[nodes] - org) * inv
+            t1 = (self.nmax[nodes] - org) * inv
+            tn = N.minimum(t0, t1).max(axis=1)
+            tf = N.maximum(t0, t1).min(axis=1)
+            nodes = nodes[self.valid[nodes] & (tn <= tf) & (tf >= 0.0)
+                          & (tn <= tmax)]
+            if len(nodes) < 1 or nodes[0] >= self.numLeaves - 1: break
+            nodes = N.concatenate((2*nodes + 1, 2*nodes + 2))
+        return self.elements(nodes - (self.numLeaves - 1))
+
+    def queryClip(self, M):
+        """
+        視垂台と交差する可能性のある要素番号の配列を返す
+        - M: 要素の座標系からクリップ座標への変換行列(行ベクトル形式,4x4)
+        """
+        if self.num < 1: return N.zeros((0,), dtype=N.int64)
+        nodes = N.zeros((1,), dtype=N.int64)
+        while True:
+            nodes = nodes[self.valid[nodes]]
+            c = N.dot(_corners(self.nmin[nodes], self.nmax[nodes]), M)
+            nodes = nodes[~_outsideClip(c)]
+            if len(nodes) < 1 or nodes[0] >= self.numLeaves - 1: break
+            nodes = N.concatenate((2*nodes + 1, 2*nodes + 2))
+        return self.elements(nodes - (self.numLeaves - 1))
+
+
+#----------------------------------------------------------------------
+class TriangleBVH(BVH):
+    """
+    三角形メッシュのBVHクラス
+    ノードのローカル座標系での三角形集合に対するBVHです．
+      verts: 頂点座標配列(頂点数, 3)
+      faces: 頂点番号配列(三角形数, 3)
+      faceIds: 三角形毎の面番号の配列．Noneの場合は三角形番号です
+    """
+    def __init__(self, verts, faces, faceIds =None, leafSize =None):
+        """
+        - verts: 頂点座標配列(頂点数, 3)
+        - faces: 頂点番号配列(三角形数, 3)
+        - faceIds: 三角形毎の面番号の配列
+        - leafSize: 葉あたりの三角形数
+        """
+        self.verts = N.asarray(verts, dtype=N.float64).reshape((-1, 3))
+        self.faces = N.asarray(faces, dtype=N.int64).reshape((-1, 3))
+        self.faceIds = faceIds
+        tri = self.verts[self.faces]
+        BVH.__init__(self, tri.min(axis=1), tri.max(axis=1), leafSize)
+        return
+
+    def faceId(self, tri):
+        """
+        三角形番号を面番号に変換する
+        """
+        if self.faceIds is None: return tri
+        return self.faceIds[tri]
+
+    def intersect(self, org, dir):
+        """
+        レイと最も近い三角形との交差判定
+        (t, 三角形番号, u, v)を返します．交差しない場合はNoneを返します．
+        - org, dir: ローカル座標系でのレイの始点と方向
+        """
+        cand = self.queryRay(org, dir)
+        if len(cand) < 1: return None
+        f = self.faces[cand]
+        (hit, t, u, v) = RayTriangles(org, dir, self.verts[f[:, 0]],
+                                      self.verts[f[:, 1]], self.verts[f[:, 2]])
+        if not hit.any(): return None
+        k = N.nonzero(hit)[0]
+        k = k[N.argmin(t[k])]
+        return (float(t[k]), int(cand[k]), float(u[k]), float(v[k]))
+
+    def intersectClip(self, M):
+        """
+        視垂台と交差する三角形の判定
+        (三角形番号の配列, 最小デプス値)を返します．デプス値は視垂台の
+        XY範囲内での値です(_rectDepth参照)．交差しない場合は
+        Noneを返します．
+        - M: ローカル座標系からクリップ座標への変換行列(行ベクトル形式,4x4)
+        """
+        cand = self.queryClip(M)
+        if len(cand) < 1: return None
+        f = self.faces[cand]
+        vh = N.empty((len(self.verts), 4), dtype=N.float64)
+        vh[:, 0:3] = self.verts
+        vh[:, 3] = 1.0
+        c = N.dot(vh[N.unique(f)], M)
+        remap = N.zeros((len(self.verts),), dtype=N.int64)
+        remap[N.unique(f)] = N.arange(len(c))
+        c0, c1, c2 = c[remap[f[:, 0]]], c[remap[f[:, 1]]], c[remap[f[:, 2]]]
+        hit = ClipTriangles(c0, c1, c2)
+        if not hit.any(): return None
+        d = _rectDepth(c0[hit], c1[hit], c2[hit])
+        return (cand[hit], float(d.min()))
+
+
+#----------------------------------------------------------------------
+class PickHit(object):
+    """
+    レイキャストのヒット情報クラス
+      node: ヒットしたノード
+      id: セレクション結果のID(ノード自身またはセレクション対象の
+          祖先ノードのID)
+      depth: デプス値(0.0〜1.0)
+      face: 面番号(getPickTriangles参照)
+      bary: 重心座標(w0, w1, w2)
+      point: ローカル座標系での交点(utilMath.Vec3)
+      worldPoint: ワールド座標系での交点(utilMath.Vec3)
+    """
+    def __init__(self, node, id, depth, face, bary, point, worldPoint):
+        self.node = node
+        self.id = id
+        self.depth = depth
+        self.face = face
+        self.bary = bary
+        self.point = point
+        self.worldPoint = worldPoint
+        return
+
+    def __repr__(self):
+        return 'PickHit(id={}, face={}, depth={:.6f})'.format(
+            self.id, self.face, self.depth)
+
+
+#----------------------------------------------------------------------
+class Picker(object):
+    """
+    CPUピッキングクラス
+    シーングラフからセレクション対象の葉ノードを集め，ワールド座標系での
+    バウンディングボックスに対するシーンのBVHをキャッシュします．
+    ノード毎の三角形BVHは各ノードの_pickBVHにキャッシュし，ノードの
+    notice()で破棄されます．
+      _entries: (ノード, セレクション結果のID, ワールド座標系への
+                幾何変換行列(行ベクトル形式))のリスト
+      _key: シーンのBVHを構築した時点のノードとバウンディングボックス
+      _bvh: シーンのBVH
+      hits: 最後のレイキャストのヒット情報(PickHit)のリスト(近い順)
+    RAY_PIXELS: 画素毎のレイキャストで可視判定を行うセレクション領域の
+                最大画素数(クリック程度の大きさの領域)
+    """
+    RAY_PIXELS = 64
+
+    def __init__(self):
+        self._entries = []
+        self._key = None
+        self._bvh = None
+        self.hits = []
+        return
+
+    def collect(self, scene):
+        """
+        セレクション対象の葉ノードの収集
+        renderSelectionと同様に，表示しないノードの子孫を除き，
+        セレクション対象のノードに最も近い祖先のIDを割当てます．
+        (ノード, ID, ワールド座標系への幾何変換行列(行ベクトル形式))の
+        リストを返します．複数のグループに属するノードは，経路毎に
+        その経路で累積した幾何変換行列で登録します．
+        - scene: シーン
+        """
+        entries = []
+        stack = [(scene, 0, N.identity(4))]
+        while stack:
+            (n, pid, T) = stack.pop()
+            if n._renderMode == RT_NONE: continue
+            if n._pickable & (PT_OBJECT | PT_BBOX):
+                pid = n._id
+            W = N.dot(_rowMatrix(n._matrix), T)
+            if hasattr(n, '_children'):
+                stack.extend([(c, pid, W) for c in reversed(n._children)])
+            elif pid != 0:
+                entries.append((n, pid, W))
+        return entries
+
+    def update(self, scene):
+        """
+        シーンのBVHの更新
+        ノードの構成またはワールド座標系でのバウンディングボックスが
+        変わった場合に作り直します．
+        - scene: シーン
+        """
+        entries = self.collect(scene)
+        n = len(entries)
+        lo = N.array([e[0]._bbox[0].m_v[0:3] for e in entries],
+                     dtype=N.float64).reshape((n, 3))
+        hi = N.array([e[0]._bbox[1].m_v[0:3] for e in entries],
+                     dtype=N.float64).reshape((n, 3))
+        W = N.array([e[2] for e in entries]).reshape((n, 4, 4))
+        c = N.einsum('ni,nij->nj', (lo + hi) * 0.5, W[:, 0:3, 0:3]) \
+            + W[:, 3, 0:3]
+        ext = N.einsum('ni,nij->nj', (hi - lo) * 0.5, N.abs(W[:, 0:3, 0:3]))
+        (bmin, bmax) = (c - ext, c + ext)
+        key = (tuple([(e[0]._id, e[1]) for e in entries]),
+               bmin.tobytes(), bmax.tobytes())
+        if self._bvh is not None and key == self._key:
+            return
+        self._entries = entries
+        self._key = key
+        self._bvh = BVH(bmin, bmax, 1)
+        return
+
+    def nodeBVH(self, node):
+        """
+        ノードの三角形BVHを返す
+        三角形で表せないノードはNoneを返します．セレクションモードが
+        PT_BBOXのノードはバウンディングボックスを三角形とします．
+        - node: ノード
+        """
+        key = (node.getNumVerts(), node.getNumIndices(),
+               bool(node._pickable & PT_BBOX) and \
+               not node._pickable & PT_OBJECT)
+        cache = getattr(node, '_pickBVH', None)
+        if cache is not None and cache[0] == key:
+            return cache[1]
+        if key[2]:
+            (verts, faces) = _bboxTriangles(node._bbox)
+            tris = (verts, faces, None)
+        else:
+            tris = node.getPickTriangles()
+            if tris is None and node.getNumVerts() < 1:
+                (verts, faces) = _bboxTriangles(node._bbox)
+                tris = (verts, faces, None)
+        bvh = None
+        if tris is not None and len(tris[1]) > 0:
+            bvh = TriangleBVH(tris[0], tris[1], tris[2])
+        node._pickBVH = (key, bvh)
+        return bvh
+
+    def select(self, scene, PM, MVM, viewport, cx, cy, w, h):
+        """
+        セレクションテスト
+        セレクション領域と交差するノードのIDを，デプス値の小さい順に
+        並べた配列を返します．セレクション領域の中心からのレイキャストの
+        ヒット情報はhitsに格納されます．
+        領域の画素数がRAY_PIXELS以下の場合は画素毎にレイキャストを行い，
+        ID色描画と同様にいずれかの画素で最も手前にあるノードのみを返します．
+        それより大きい領域では，隠れているノードも含めて領域と交差する
+        全てのノードを返します．
+        座標はglReadPixelsと同じウインドウ座標((0,0)は左下隅)です．
+        - scene: シーン
+        - PM: プロジェクション行列(utilMath.Mat4)
+        - MVM: モデルビュー行列(utilMath.Mat4)
+        - viewport: ビューポート(x, y, 幅, 高さ)
+        - cx, cy: セレクション領域の中心
+        - w, h: セレクション領域の幅と高さ
+        """
+        self.hits = []
+        if scene is None or viewport[2] < 1 or viewport[3] < 1:
+            return N.zeros((0,), dtype=int)
+        self.update(scene)
+        VP = N.dot(_rowMatrix(MVM), _rowMatrix(PM))
+        try:
+            iVP = N.linalg.inv(VP)
+        except N.linalg.LinAlgError:
+            return N.zeros((0,), dtype=int)
+
+        # selection rectangle in NDC, as a remap onto the clip cube
+        def ndc(x, y):
+            return (2.0 * (x - viewport[0]) / viewport[2] - 1.0,
+                    2.0 * (y - viewport[1]) / viewport[3] - 1.0)
+        (rx, ry) = (cx - int(w/2), cy - int(h/2))
+        (x0, y0) = ndc(rx, ry)
+        (x1, y1) = ndc(rx + w, ry + h)
+        R = N.identity(4)
+        R[0, 0] = 2.0 / (x1 - x0)
+        R[1, 1] = 2.0 / (y1 - y0)
+        R[3, 0] = -(x1 + x0) / (x1 - x0)
+        R[3, 1] = -(y1 + y0) / (y1 - y0)
+
+        # rectangle test
+        depth = {}
+        points = {}
+        VPR = N.dot(VP, R)
+        for e in self._bvh.queryClip(VPR):
+            (node, pid, W) = self._entries[e]
+            M = N.dot(W, VPR)
+            bvh = self.nodeBVH(node)
+            if bvh is not None:
+                ret = bvh.intersectClip(M)
+                if ret is not None:
+                    depth[pid] = min(depth.get(pid, 1.0), ret[1])
+                continue
+            nv = node.getNumVerts()
+            if nv < 1: continue
+            vh = N.ones((nv, 4), dtype=N.float64)
+            vh[:, 0:3] = node.getVertsArray()
+            c = N.dot(vh, M)
+            cw = c[:, 3]
+            inside = (cw > 0.0) & (N.abs(c[:, 0]) <= cw) \
+                & (N.abs(c[:, 1]) <= cw) & (N.abs(c[:, 2]) <= cw)
+            if inside.any():
+                d = float(_clipDepth(c[inside][None, :, :])[0])
+                points[pid] = min(points.get(pid, 1.0), d)
+
+        # ray cast through the center pixel
+        center = self.__castRay(VP, iVP, ndc(cx + 0.5, cy + 0.5))
+        for (d, pid, hit) in center:
+            self.hits.append(hit)
+
+        if w * h > Picker.RAY_PIXELS:
+            for (pid, d) in points.items():
+                depth[pid] = min(depth.get(pid, 1.0), d)
+            ids = sorted(depth.keys(), key=lambda x: depth[x])
+            return N.array(ids, dtype=int)
+
+        # small (click) rectangle: the front-most node of each pixel
+        visible = {}
+        far = 0.0
+        for j in range(int(h)):
+            for i in range(int(w)):
+                if (rx + i, ry + j) == (cx, cy):
+                    hits = center
+                else:
+                    hits = self.__castRay(VP, iVP,
+                                          ndc(rx + i + 0.5, ry + j + 0.5))
+                if len(hits) < 1:
+                    far = 1.0
+                    continue
+                (d, pid, hit) = hits[0]
+                visible[pid] = min(visible.get(pid, 1.0), d)
+                far = max(far, d)
+        # points and lines are visible if in front of the farthest surface
+        for (pid, d) in points.items():
+            if d <= far:
+                visible[pid] = min(visible.get(pid, 1.0), d)
+        ids = sorted(visible.keys(), key=lambda x: visible[x])
+        return N.array(ids, dtype=int)
+
+    def __castRay(self, VP, iVP, p):
+        """
+        レイキャスト
+        正規化デバイス座標の点を通り，ニア面からファー面へ向かうレイと
+        交差するノード毎の最も近いヒットを，(デプス値, ID, PickHit)の
+        近い順のリストとして返します．
+        - VP: ワールド座標系からクリップ座標への変換行列(行ベクトル形式)
+        - iVP: VPの逆行列
+        - p: 正規化デバイス座標の点(x, y)
+        """
+        p0 = N.dot((p[0], p[1], -1.0, 1.0), iVP)
+        p1 = N.dot((p[0], p[1], 1.0, 1.0), iVP)
+        org = p0[0:3] / p0[3]
+        dir = p1[0:3] / p1[3] - org
+        ret = []
+        for e in self._bvh.queryRay(org, dir):
+            (node, pid, W) = self._entries[e]
+            bvh = self.nodeBVH(node)
+            if bvh is None: continue
+            try:
+                iW = N.linalg.inv(W)
+            except N.linalg.LinAlgError:
+                continue
+            lo = N.dot(N.append(org, 1.0), iW)
+            ld = N.dot(N.append(dir, 0.0), iW)
+            hit = bvh.intersect(lo[0:3] / lo[3], ld[0:3])
+            if hit is None: continue
+            (t, tri, u, v) = hit
+            wp = org + t * dir
+            c = N.dot(N.append(wp, 1.0), VP)
+            d = float(N.clip((c[2] / c[3] + 1.0) * 0.5, 0.0, 1.0))
+            lp = lo[0:3] / lo[3] + t * ld[0:3]
+            ret.append((d, pid, PickHit(node, pid, d, int(bvh.faceId(tri)),
+                                        (1.0 - u - v, u, v),
+                                        Vec3(lp.tolist()), Vec3(wp.tolist()))))
+        ret.sort(key=lambda x: x[0])
+        return ret
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+vfr scene-graph library
+
+Copyright(c) YoH, 2026, All Right Reserved.
+
+PNG画像の出力
+画像ライブラリを使わずに，8bitのRGB/RGBA画像をPNGファイルに出力します．
+PNGWriterは画像を上の行から順に受け取って逐次圧縮・出力するため，
+画像全体をメモリ上に保持する必要がありません．
+"""
+import os
+import zlib
+import struct
+import numpy as N
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+#----------------------------------------------------------------------
+class PNGWriter(object):
+    """
+    PNGファイル出力クラス
+    画像の行を上から順にwriteRows()で受け取り，PNGファイルに出力します．
+    出力は一時ファイルに行い，close()で全ての行が揃った場合に
+    指定されたパスに置き換えるため，途中で失敗した場合に不完全な
+    ファイルが残りません．
+      width, height: 画像サイズ(pixels)
+      alpha: Trueの場合RGBA，Falseの場合RGBで出力します
+      _path: 出力ファイルのパス
+      _f: 一時ファイル
+      _z: zlib圧縮オブジェクト
+      _buf: IDATチャンクに出力する前の圧縮データ
+      _rows: 出力した行数
+    """
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, path, width, height, alpha =True, level =6):
+        """
+        - path: 出力ファイルのパス
+        - width, height: 画像サイズ(pixels)
+        - alpha: Trueの場合RGBA，Falseの場合RGBで出力します
+        - level: zlibの圧縮レベル(0〜9)
+        """
+        self.width = int(width)
+        self.height = int(height)
+        self.alpha = alpha
+        self._path = path
+        self._f = open(path + '.part', 'wb')
+        self._z = zlib.compressobj(level)
+        self._buf = b''
+        self._rows = 0
+        self._f.write(_PNG_SIGNATURE)
+        self.__chunk(b'IHDR', struct.pack('>IIBBBBB', self.width, self.height,
+                                          8, 6 if alpha else 2, 0, 0, 0))
+        return
+
+    def __del__(self):
+        self.abort()
+
+    def __chunk(self, tag, data):
+        """
+        チャンクの出力
+        - tag: チャンクタイプ
+        - data: チャンクデータ
+        """
+        self._f.write(struct.pack('>I', len(data)))
+        self._f.write(tag)
+        self._f.write(data)
+        self._f.write(struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff))
+        return
+
+    def __flush(self, force =False):
+        """
+        圧縮データのIDATチャンクへの出力
+        - force: Trueの場合，CHUNK_SIZEに満たなくても出力します
+        """
+        while len(self._buf) >= PNGWriter.CHUNK_SIZE:
+            self.__chunk(b'IDAT', self._buf[:PNGWriter.CHUNK_SIZE])
+            self._buf = self._buf[PNGWriter.CHUNK_SIZE:]
+        if force and len(self._buf) > 0:
+            self.__chunk(b'IDAT', self._buf)
+            self._buf = b''
+        return
+
+    def writeRows(self, rows):
+        """
+        画像の行の出力
+        形状(行数, 幅, 3または4)のuint8配列を受け取り，続きの行として
+        出力します．RGBA出力でRGBの行を渡した場合はアルファを255とし，
+        RGB出力でRGBAの行を渡した場合はアルファを捨てます．
+        出力した行数を返します．
+        - rows: 画像の行の配列
+        """
+        if self._f is None: return 0
+        rows = N.asarray(rows, dtype=N.uint8)
+        if rows.ndim == 2:
+            rows = rows.reshape((1,) + rows.shape)
+        n = min(rows.shape[0], self.height - self._rows)
+        if n < 1 or rows.shape[1] != self.width: return 0
+        nc = 4 if self.alpha else 3
+        data = N.empty((n, self.width * nc + 1), dtype=N.uint8)
+        data[:, 0] = 0 # filter type: None
+        pix = data[:, 1:].reshape((n, self.width, nc))
+        pix[:, :, 0:3] = rows[0:n, :, 0:3]
+        if self.alpha:
+            pix[:, :, 3] = rows[0:n, :, 3] if rows.shape[2] > 3 else 255
+        self._buf += self._z.compress(data.tobytes())
+        self.__flush()
+        self._rows += n
+        return n
+
+    def getNumRows(self):
+        """
+        出力した行数を返す
+        """
+        return self._rows
+
+    def close(self):
+        """
+        出力の終了
+        全ての行が出力されている場合はファイルを完成させてTrueを返します．
+        行が不足している場合は出力を破棄してFalseを返します．
+        """
+        if self._f is None: return False
+        if self._rows < self.height:
+            self.abort()
+            return False
+        self._buf += self._z.flush()
+        self.__flush(True)
+        self.__chunk(b'IEND', b'')
+        self._f.close()
+        self._f = None
+        os.replace(self._path + '.part', self._path)
+        return True
+
+    def abort(self):
+        """
+        出力の破棄
+        一時ファイルを削除します．
+        """
+        if getattr(self, '_f', None) is None: return
+        self._f.close()
+        self._f = None
+        try:
+            os.remove(self._path + '.part')
+        except OSError:
+            pass
+        return
+
+
+#----------------------------------------------------------------------
+def WritePNG(path, img, alpha =True):
+    """
+    画像をPNGファイルに出力する関数です．成功した場合はTrueを返します．
+    - path: 出力ファイルのパス
+    - img: 形状(高さ, 幅, 3または4)のuint8配列(上の行から順)
+    - alpha: Trueの場合RGBA，Falseの場合RGBで出力します
+    """
+    img = N.asarray(img)
+    if img.ndim != 3 or img.shape[2] < 3: return False
+    try:
+        w = PNGWriter(path, img.shape[1], img.shape[0], alpha)
+        w.writeRows(img)
+        return w.close()
+    except (IOError, OSError):
+        return False
@@ -8,6 +8,7 @@ Copyright(c) YoH, 2026, All Right Reserved.
 """
 from .gfxNode import *
 from .utilMath import *
+import numpy as N
 import math
 
 #----------------------------------------------------------------------
@@ -22,14 +23,28 @@ class PrimSet(GfxNode):
       _prim: プリミティブ
       _rsMode: プリミティブの回転／スケール適用フラグ
                (PRIMSET_ROT, PRIMSET_SCALE のコンビネーション)
+      _batchMode: バッチ描画モード
+      _instMatrix: 頂点毎の幾何変換行列のキャッシュ(無効時はNone)
+      _batch: 幾何変換済みの結合形状のキャッシュ(無効時はNone)
+      MAX_BATCH_VERTS: 結合形状の最大頂点数(頂点数×プリミティブの頂点数)
+    バッチ描画モードでは，全ての頂点の幾何変換行列をNumPyで一括計算し，
+    プリミティブが三角形集合で表せる場合(getTriangleArrays()がNoneでない
+    場合)は，幾何変換済みの形状を一つの配列に結合して一度に描画します．
+    三角形集合で表せない場合や，結合形状の頂点数がMAX_BATCH_VERTSを
+    超える場合は，一括計算した行列を用いて頂点毎にプリミティブを描画します．
     """
+    MAX_BATCH_VERTS = 1 << 22
+
     def __init__(self, **args):
         """
-        args: rsMode =PRIMSET_ROT|PRIMSET_SCALE
+        args: rsMode =PRIMSET_ROT|PRIMSET_SCALE, batch =True
         """
         GfxNode.__init__(self, **args)
         self._rsMode = PRIMSET_ROT|PRIMSET_SCALE if not 'rsMode' in args \
             else args['rsMode']
+        self._batchMode = True if not 'batch' in args else args['batch']
+        self._instMatrix = None
+        self._batch = None
         self._prim = None
 
     def __del__(self):
@@ -50,7 +65,7 @@ class PrimSet(GfxNode):
         if self._prim:
             self._prim.addRef(self)
         self.generateBbox()
-        self.notice()
+        self.noticeData()
         return
 
     def getPrimitive(self):
@@ -72,7 +87,7 @@ class PrimSet(GfxNode):
         """
         if self._rsMode == rsm: return
         self._rsMode = rsm
-        self.notice()
+        self.noticeData()
         return
 
     def getRotScaleMode(self):
@@ -81,6 +96,209 @@ class PrimSet(GfxNode):
         """
         return self._rsMode
 
+    def setBatchMode(self, mode):
+        """
+        バッチ描画モードの設定
+        - mode: バッチ描画モード
+        """
+        if self._batchMode == mode: return
+        self._batchMode = mode
+        self.noticeData()
+        return
+
+    def getBatchMode(self):
+        """
+        バッチ描画モードを返す
+        """
+        return self._batchMode
+
+    def invalidateDispList(self):
+        """
+        OpenGLディスプレイリストの無効化
+        頂点毎の幾何変換行列と結合形状のキャッシュも破棄します．
+        """
+        self._instMatrix = None
+        self._batch = None
+        GfxNode.invalidateDispList(self)
+        return
+
+    def calcRotScale(self):
+        """
+        頂点毎の回転／スケール行列の一括計算
+        (回転行列(頂点数, 3, 3), 回転スケール行列(頂点数, 3, 3))の
+        float64配列のタプルを返します．行列は列ベクトルに作用します．
+        法線ベクトルを持たない頂点は単位行列です．
+        """
+        n = self.nVerts
+        R = N.zeros((n, 3, 3))
+        R[:, 0, 0] = R[:, 1, 1] = R[:, 2, 2] = 1.0
+        RS = R.copy()
+        nn = min(n, self.nNormals)
+        if nn < 1 or not self._rsMode:
+            return (R, RS)
+
+        vec = self.getNormalsArray()[0:nn].astype(N.float64)
+        l = N.sqrt((vec * vec).sum(axis=1))
+        l[l < 1e-6] = 1e-6
+        if self._rsMode & PRIMSET_ROT:
+            v = vec / l[:, None]
+            (vx, vy, c) = (v[:,0], v[:,1], v[:,2])
+            sn = N.sqrt(vx*vx + vy*vy)
+            rot = (vx != 0.0) | (vy != 0.0)
+            sr = N.where(rot, sn, 1.0)
+            (kx, ky) = (-vy / sr, vx / sr)
+            c1 = 1.0 - c
+            Rn = R[0:nn]
+            Rn[:, 0, 0] = c + c1*kx*kx
+            Rn[:, 0, 1] = c1*kx*ky
+            Rn[:, 0, 2] = sn*ky
+            Rn[:, 1, 0] = c1*kx*ky
+            Rn[:, 1, 1] = c + c1*ky*ky
+            Rn[:, 1, 2] = -sn*kx
+            Rn[:, 2, 0] = -sn*ky
+            Rn[:, 2, 1] = sn*kx
+            Rn[:, 2, 2] = c
+            Rn[~rot] = N.identity(3)
+        RS[0:nn] = R[0:nn]
+        if self._rsMode & PRIMSET_SCALE:
+            RS[0:nn] *= l[:, None, None]
+        return (R, RS)
+
+    def getInstanceMatrices(self):
+        """
+        頂点毎の幾何変換行列を返す
+        各頂点位置へプリミティブを配置する幾何変換行列を，OpenGLの
+        列優先の並び(glMultMatrixfにそのまま渡せる形式)で格納した
+        形状(頂点数, 16)のfloat32配列を返します．
+        結果はノードの変更通知まで保持されます．
+        """
+        if self._instMatrix is None:
+            n = self.nVerts
+            (R, RS) = self.calcRotScale()
+            M = N.zeros((n, 4, 4), dtype=N.float32)
+            M[:, 0:3, 0:3] = RS.transpose((0, 2, 1))
+            if n > 0:
+                M[:, 3, 0:3] = self.getVertsArray()
+            M[:, 3, 3] = 1.0
+            self._instMatrix = M.reshape((n, 16))
+        return self._instMatrix
+
+    def buildBatch(self):
+        """
+        結合形状の構築
+        プリミティブの三角形配列を各頂点の幾何変換で変換し，一つの配列に
+        結合します．(頂点座標配列, 法線ベクトル配列またはNone,
+        頂点毎の色配列またはNone)のタプルを返します．
+        バッチ描画できない場合や，結合形状の頂点数がMAX_BATCH_VERTSを
+        超える場合はNoneを返します．
+        """
+        if not self._batchMode or not self._prim: return None
+        if self.nVerts < 1: return None
+        if self._prim._colorMode != AT_WHOLE: return None
+        if self._colorMode == AT_PER_VERTEX and \
+               0 < self.nColors < self.nVerts:
+            return None
+        tris = self._prim.getTriangleArrays()
+        if tris is None: return None
+        (P, Pn) = tris
+        if self.nVerts * len(P) > PrimSet.MAX_BATCH_VERTS: return None
+
+        (R, RS) = self.calcRotScale()
+        pos = self.getVertsArray().astype(N.float64)
+        V = N.einsum('nij,mj->nmi', RS, P) + pos[:, None, :]
+        V = N.ascontiguousarray(V.reshape((-1, 3)), dtype=N.float32)
+        Vn = None
+        if not Pn is None:
+            Vn = N.einsum('nij,mj->nmi', R, Pn)
+            Vn = N.ascontiguousarray(Vn.reshape((-1, 3)), dtype=N.float32)
+        Vc = None
+        if self._colorMode == AT_PER_VERTEX and self.nColors >= self.nVerts:
+            Vc = N.repeat(self.getColorsArray()[0:self.nVerts],
+                          len(P), axis=0)
+        return (V, Vn, Vc)
+
+    def glyphStride(self):
+        """
+        描画するプリミティブの間引き間隔を返す
+        描画品質(GfxNode.GetRenderQuality())のグリフの間引き間隔です．
+        """
+        q = GfxNode.GetRenderQuality()
+        if q is None: return 1
+        return q.glyphDecimation(self.nVerts)
+
+    def drawBatch(self, colors, stride =1):
+        """
+        結合形状の描画
+        結合形状をglDrawArraysで一度に描画します．間引き間隔が
+        指定された場合は，該当する頂点のプリミティブのみを
+        glMultiDrawArraysで描画します．
+        描画した場合はTrueを返します．
+        - colors: 頂点毎の色配列の使用
+        - stride: プリミティブの間引き間隔
+        """
+        if self._batch is None:
+            self._batch = self.buildBatch()
+            if self._batch is None:
+                self._batch = False
+        if not self._batch: return False
+        (V, Vn, Vc) = self._batch
+
+        glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, V)
+        if not Vn is None:
+            glEnableClientState(GL_NORMAL_ARRAY)
+            glNormalPointer(GL_FLOAT, 0, Vn)
+        if colors and not Vc is None:
+            glEnableClientState(GL_COLOR_ARRAY)
+            glColorPointer(4, GL_FLOAT, 0, Vc)
+        if stride > 1:
+            m = len(V) // self.nVerts
+            first = N.arange(0, self.nVerts, stride, dtype=N.int32) * m
+            count = N.full(len(first), m, dtype=N.int32)
+            glMultiDrawArrays(GL_TRIANGLES, first, count, len(first))
+            self.countDrawn(len(first) * m)
+        else:
+            glDrawArrays(GL_TRIANGLES, 0, len(V))
+            self.countDrawn(len(V))
+        glPopClientAttrib()
+        return True
+
+    def __countInstances(self, stride):
+        """
+        頂点毎に描画したプリミティブの描画数の記録
+        プロファイラが設定されている場合に，描画したプリミティブの数を
+        描画呼び出し数，その頂点数の合計を頂点数として記録します．
+        (GfxNode.countDrawn参照)
+        - stride: プリミティブの間引き間隔
+        """
+        if GfxNode.GetProfiler() is None: return
+        n = len(range(0, self.nVerts, stride))
+        tris = self._prim.getTriangleArrays()
+        m = self._prim.nVerts if tris is None else len(tris[0])
+        self.countDrawn(n * m, n)
+        return
+
+    def calcBboxPointsArray(self):
+        """
+        全頂点のバウンディングボックスの一括計算
+        calcBboxPoints()を全頂点について一括で行い，
+        (最小座標(頂点数, 3), 最大座標(頂点数, 3))の配列のタプルを返します．
+        プリミティブが無い場合はNoneを返します．
+        """
+        if not self._prim: return None
+        n = self.nVerts
+        pbb = self._prim.getBbox()
+        pos = self.getVertsArray().astype(N.float64)
+        scFac = N.ones((n, 1))
+        nn = min(n, self.nNormals)
+        if (self._rsMode & PRIMSET_SCALE) and nn > 0:
+            vec = self.getNormalsArray()[0:nn].astype(N.float64)
+            scFac[0:nn, 0] = N.sqrt((vec * vec).sum(axis=1))
+        lo = pos + N.array(pbb[0][0:3], dtype=N.float64) * scFac
+        hi = pos + N.array(pbb[1][0:3], dtype=N.float64) * scFac
+        return (lo, hi)
+
     def calcBboxPoints(self, idx, xbb):
         """
         頂点毎のバウンディングボックス更新
@@ -106,7 +324,7 @@ class PrimSet(GfxNode):
         """
         if self._prim and self._prim == ref:
             self._prim = None
-            self.notice()
+            self.noticeData()
             return
         Node.rumor(self, ref)
         return
@@ -116,7 +334,7 @@ class PrimSet(GfxNode):
         バウンディングボックス再計算
         """
         if not self._prim:
-            Node.generateBbox()
+            GfxNode.generateBbox(self)
             return
 
         if self.nVerts < 1:
@@ -124,25 +342,30 @@ class PrimSet(GfxNode):
             self._bbox[1][:] = self._bbox[0][:]
             self.checkBbox()
             return
-        
-        xbb = [Vec3(), Vec3()]
-        if not self.calcBboxPoints(0, self._bbox):
-            self._bbox[0][:] = self._verts[0][:]
-            self._bbox[1][:] = self._bbox[0][:]
-            
-        for i in range(1, self.nVerts):
-            if not self.calcBboxPoints(i, xbb):
-                xbb[0][:] = self._verts[i][:]
-                xbb[1][:] = xbb[0][:]
-            if self._bbox[0][0] > xbb[0][0]: self._bbox[0][0] = xbb[0][0]
-            if self._bbox[1][0] < xbb[1][0]: self._bbox[1][0] = xbb[1][0]
-            if self._bbox[0][1] > xbb[0][1]: self._bbox[0][1] = xbb[0][1]
-            if self._bbox[1][1] < xbb[1][1]: self._bbox[1][1] = xbb[1][1]
-            if self._bbox[0][2] > xbb[0][2]: self._bbox[0][2] = xbb[0][2]
-            if self._bbox[1][2] < xbb[1][2]: self._bbox[1][2] = xbb[1][2]
+
+        (lo, hi) = self.calcBboxPointsArray()
+        self._bbox[0][:] = lo.min(axis=0)
+        self._bbox[1][:] = hi.max(axis=0)
         self.checkBbox()
         return
 
+    def callPrimRenderAt(self, rt, mat):
+        """
+        幾何変換行列を指定したプリミティブのレンダリング関数呼び出し
+        - rt: レンダリングモード
+        - mat: 幾何変換行列(OpenGLの列優先の並び)
+        """
+        glPushMatrix()
+        glMultMatrixf(mat)
+        if rt & (RT_SMOOTH | RT_NOLIGHT | RT_FLAT):
+            self._prim.renderSolid()
+        if rt & RT_WIRE:
+            self._prim.renderWire()
+        if rt & RT_POINT:
+            self._prim.renderPoint()
+        glPopMatrix()
+        return
+
     def callPrimRender(self, rt, pos, vec =None):
         """
         プリミティブのレンダリング関数呼び出し
@@ -184,7 +407,17 @@ class PrimSet(GfxNode):
         プリミティブのrenderSolid()を呼び出す
         """
         if not self._prim: return
-        for index in range(self.nVerts):
+        stride = self.glyphStride()
+        if self._batchMode:
+            if self.drawBatch(True, stride): return
+            M = self.getInstanceMatrices()
+            for index in range(0, self.nVerts, stride):
+                if self._colorMode == AT_PER_VERTEX and index < self.nColors:
+                    glColor4fv(self._colors[index])
+                self.callPrimRenderAt(RT_SMOOTH, M[index])
+            self.__countInstances(stride)
+            return
+        for index in range(0, self.nVerts, stride):
             if self._colorMode == AT_PER_VERTEX and index < self.nColors:
                 glColor4fv(self._colors[index])
             if index < self.nNormals:
@@ -192,6 +425,7 @@ class PrimSet(GfxNode):
                                     self._verts[index], self._normals[index])
             else:
                 self.callPrimRender(RT_SMOOTH, self._verts[index])
+        self.__countInstances(stride)
         return
 
     def renderWire(self):
@@ -200,7 +434,19 @@ class PrimSet(GfxNode):
         プリミティブのrenderWire()を呼び出す
         """
         if not self._prim: return
-        for index in range(self.nVerts):
+        stride = self.glyphStride()
+        if self._batchMode:
+            if self.drawBatch(not self._useAuxLineColor, stride): return
+            M = self.getInstanceMatrices()
+            for index in range(0, self.nVerts, stride):
+                if not self._useAuxLineColor and \
+                       self._colorMode == AT_PER_VERTEX and \
+                       index < self.nColors:
+                    glColor4fv(self._colors[index])
+                self.callPrimRenderAt(RT_WIRE, M[index])
+            self.__countInstances(stride)
+            return
+        for index in range(0, self.nVerts, stride):
             if not self._useAuxLineColor and \
                    self._colorMode == AT_PER_VERTEX and index < self.nColors:
                 glColor4fv(self._colors[index])
@@ -209,6 +455,7 @@ class PrimSet(GfxNode):
                                     self._verts[index], self._normals[index])
             else:
                 self.callPrimRender(RT_WIRE, self._verts[index])
+        self.__countInstances(stride)
         return
 
     def renderPoint(self):
@@ -217,8 +464,17 @@ class PrimSet(GfxNode):
         プリミティブのrenderPoint()を呼び出す．プリミティブがNoneの場合は
         GfxNode.renderPoint()を呼び出す．
         """
-        if self._prim:
-            for index in range(self.nVerts):
+        stride = self.glyphStride()
+        if self._prim and self._batchMode:
+            M = self.getInstanceMatrices()
+            for index in range(0, self.nVerts, stride):
+                if not self._useAuxPointColor and \
+                       self._colorMode == AT_PER_VERTEX and \
+                       index < self.nColors:
+                    glColor4fv(self._colors[index])
+                self.callPrimRenderAt(RT_POINT, M[index])
+        elif self._prim:
+            for index in range(0, self.nVerts, stride):
                 if not self._useAuxPointColor and \
                        self._colorMode == AT_PER_VERTEX and \
                        index < self.nColors:
@@ -231,5 +487,7 @@ class PrimSet(GfxNode):
                     self.callPrimRender(RT_POINT, self._verts[index])
         else:
             GfxNode.renderPoint(self)
+            return
+        self.__countInstances(stride)
         return
 
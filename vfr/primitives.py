@@ -8,6 +8,101 @@ Copyright(c) YoH, 2026, All Right Reserved.
 """
 from .gfxNode import *
 from .utilMath import *
+import numpy as N
+import ctypes as C
+
+#----------------------------------------------------------------------
+import os.path
+vfr_impl = N.ctypeslib.load_library('vfr_impl',
+                                    os.path.join(os.path.dirname(__file__),
+                                                 "..", "bin"))
+vfr_impl.gfxTriangles_DrawTrias.restype = C.c_int
+vfr_impl.gfxTriangles_DrawTrias.argtypes = [
+    C.c_int, C.POINTER(C.c_float*3),
+    C.c_int, C.POINTER(C.c_float*3),
+    C.c_int, C.POINTER(C.c_float*4),
+    C.c_int, C.c_int, C.c_int]
+
+
+#----------------------------------------------------------------------
+# テッセレーションキャッシュ
+#  (プリミティブ種別, 再分割回数, 寸法...)をキーとし，
+#  (頂点座標配列, 法線ベクトル配列)のfloat32配列のタプルを保持します．
+#  配列は同じキーの全てのインスタンスで共有されます．
+_tessCache = {}
+
+def GetTessellation(key, builder):
+    """
+    テッセレーション結果の取得
+    キャッシュに無い場合はbuilder()で生成して登録します．
+    - key: キャッシュのキー
+    - builder: (頂点座標配列, 法線ベクトル配列)を返す生成関数
+    """
+    try:
+        return _tessCache[key]
+    except KeyError:
+        pass
+    (V, Vn) = builder()
+    V = N.ascontiguousarray(V, dtype=N.float32)
+    Vn = N.ascontiguousarray(Vn, dtype=N.float32)
+    V.setflags(write=False)
+    Vn.setflags(write=False)
+    _tessCache[key] = (V, Vn)
+    return _tessCache[key]
+
+def ClearTessellation():
+    """
+    テッセレーションキャッシュの破棄
+    """
+    _tessCache.clear()
+    return
+
+def DrawTessellation(tess):
+    """
+    テッセレーション結果の描画
+    頂点毎の法線ベクトルを持つ三角形集合として，一度のネイティブ関数
+    呼び出しで描画します．
+    - tess: (頂点座標配列, 法線ベクトル配列)
+    """
+    (V, Vn) = tess
+    nv = len(V)
+    if nv < 3: return
+    ret = vfr_impl.gfxTriangles_DrawTrias(
+        nv, V.ctypes.data_as(C.POINTER(C.c_float*3)),
+        nv, Vn.ctypes.data_as(C.POINTER(C.c_float*3)),
+        0, None, AT_PER_VERTEX, AT_WHOLE, 0)
+    if ret == 0: pass
+    return
+
+def _xzUnit(a, b, y):
+    """
+    2頂点のxz成分の和を正規化し，y成分をyとした頂点の配列を返す
+    (Cone/Cylinderの円周方向の再分割)
+    - a, b: 頂点の配列(n, 3)
+    - y: y成分の配列(n,)
+    """
+    m = a + b
+    m[:, 1] = 0.0
+    l = N.sqrt((m * m).sum(axis=1))
+    m /= N.where(l < 1e-8, 1.0, l)[:, None]
+    m[l < 1e-8] = (0.0, 0.0, 1.0)
+    m[:, 1] = y
+    return m
+
+def _subdivFan(T, level):
+    """
+    三角形(v1, v2, v3)の辺v2-v3を円周方向に2分割する操作をlevel回
+    繰り返した三角形の配列を返す(Cone.subdivFace, Cylinder.subdivTriと
+    同じ順序)
+    - T: 三角形の配列(n, 3, 3)
+    - level: 再分割回数
+    """
+    for l in range(level):
+        v23 = _xzUnit(T[:,1], T[:,2], T[:,1,1])
+        T = N.stack((N.stack((T[:,0], T[:,1], v23), axis=1),
+                     N.stack((T[:,0], v23, T[:,2]), axis=1)),
+                    axis=1).reshape((-1, 3, 3))
+    return T
 
 #----------------------------------------------------------------------
 class Cube(GfxNode):
@@ -234,6 +329,41 @@ class Ball(GfxNode):
         self.subdivFace(v12, v23, v31, level -1, phase)
         return
 
+    def tessellate(self):
+        """
+        テッセレーション
+        subdivFace()と同じ三角形分割をNumPyで一括して行い，
+        (頂点座標配列, 法線ベクトル配列)を返します．
+        """
+        S = N.array([v[0:3] for v in Ball.__surface], dtype=N.float64)
+        T = S[N.array(Ball.__sindex)]
+        for l in range(self.subdiv):
+            m12 = T[:,0] + T[:,1]
+            m23 = T[:,1] + T[:,2]
+            m31 = T[:,2] + T[:,0]
+            for m in (m12, m23, m31):
+                m /= N.sqrt((m * m).sum(axis=1))[:, None]
+            T = N.stack((N.stack((T[:,0], m12, m31), axis=1),
+                         N.stack((T[:,1], m23, m12), axis=1),
+                         N.stack((T[:,2], m31, m23), axis=1),
+                         N.stack((m12, m23, m31), axis=1)),
+                        axis=1).reshape((-1, 3, 3))
+        Vn = T.reshape((-1, 3))
+        return (Vn * self.radius, Vn)
+
+    def getTessellation(self):
+        """
+        キャッシュされたテッセレーション結果を返す
+        """
+        return GetTessellation(('Ball', self.subdiv, self.radius),
+                               self.tessellate)
+
+    def getTriangleArrays(self):
+        """
+        形状の三角形配列を返す
+        """
+        return self.getTessellation()
+
     def renderSolid(self):
         """
         ソリッドレンダリング
@@ -242,11 +372,7 @@ class Ball(GfxNode):
         if self.beginDispList(DLF_SOLID): return
 
         # draw
-        for i in range(8):
-            self.subdivFace(Ball.__surface[Ball.__sindex[i][0]],
-                            Ball.__surface[Ball.__sindex[i][1]],
-                            Ball.__surface[Ball.__sindex[i][2]],
-                            self.subdiv, i);
+        DrawTessellation(self.getTessellation())
 
         # end display-list definition
         self.endDispList(DLF_SOLID)
@@ -362,6 +488,39 @@ class Cone(GfxNode):
         self.subdivFace(v1, v23, v3, level -1, phase)
         return
 
+    def tessellate(self):
+        """
+        テッセレーション
+        subdivFace()と同じ三角形分割をNumPyで一括して行い，
+        (頂点座標配列, 法線ベクトル配列)を返します．
+        """
+        S = N.array([v[0:3] for v in Cone.__surface], dtype=N.float64)
+        nb = 8 if self.showBottom else 4
+        T = _subdivFan(S[N.array(Cone.__sindex[0:nb])], self.subdiv)
+        Tn = T.copy()
+        Tn[:, :, 1] = 0.0
+        side = T[:, 0, 1] > 0.5
+        Tn[side, 0] = Cone.__snormal[0][0:3]
+        Tn[~side] = Cone.__snormal[1][0:3]
+        T[:, :, 0] *= self.radius
+        T[:, :, 1] *= self.height * 0.5
+        T[:, :, 2] *= self.radius
+        return (T.reshape((-1, 3)), Tn.reshape((-1, 3)))
+
+    def getTessellation(self):
+        """
+        キャッシュされたテッセレーション結果を返す
+        """
+        return GetTessellation(('Cone', self.subdiv, self.radius,
+                                self.height, bool(self.showBottom)),
+                               self.tessellate)
+
+    def getTriangleArrays(self):
+        """
+        形状の三角形配列を返す
+        """
+        return self.getTessellation()
+
     def renderSolid(self):
         """
         ソリッドレンダリング
@@ -370,17 +529,7 @@ class Cone(GfxNode):
         if self.beginDispList(DLF_SOLID): return
 
         # draw
-        for i in range(4):
-            self.subdivFace(Cone.__surface[Cone.__sindex[i][0]],
-                            Cone.__surface[Cone.__sindex[i][1]],
-                            Cone.__surface[Cone.__sindex[i][2]],
-                            self.subdiv, i)
-        if self.showBottom:
-            for i in range(4, 8):
-                self.subdivFace(Cone.__surface[Cone.__sindex[i][0]],
-                                Cone.__surface[Cone.__sindex[i][1]],
-                                Cone.__surface[Cone.__sindex[i][2]],
-                                self.subdiv, i)
+        DrawTessellation(self.getTessellation())
                 
         # end display-list definition
         self.endDispList(DLF_SOLID)
@@ -547,6 +696,61 @@ class Cylinder(GfxNode):
         self.subdivQuad(v12, v2, v3, v34, level -1, phase)
         return
 
+    def tessellate(self):
+        """
+        テッセレーション
+        subdivTri()/subdivQuad()と同じ分割をNumPyで一括して行い，
+        (頂点座標配列, 法線ベクトル配列)を返します．
+        側面の四角形は2つの三角形として返します．
+        """
+        S = N.array([v[0:3] for v in Cylinder.__surface], dtype=N.float64)
+        tidx = []
+        if self.showTop: tidx += list(Cylinder.__tindex[0:4])
+        if self.showBottom: tidx += list(Cylinder.__tindex[4:8])
+        Vs = []
+        Ns = []
+        if len(tidx) > 0:
+            T = _subdivFan(S[N.array(tidx)], self.subdiv)
+            Tn = N.zeros(T.shape)
+            Tn[:, :, 1] = N.where(T[:, 0, 1] > 0.0, 1.0, -1.0)[:, None]
+            Vs.append(T)
+            Ns.append(Tn)
+
+        Q = S[N.array(Cylinder.__qindex)]
+        for l in range(self.subdiv):
+            v12 = _xzUnit(Q[:,0], Q[:,1], Q[:,0,1])
+            v34 = _xzUnit(Q[:,2], Q[:,3], Q[:,2,1])
+            Q = N.stack((N.stack((Q[:,0], v12, v34, Q[:,3]), axis=1),
+                         N.stack((v12, Q[:,1], Q[:,2], v34), axis=1)),
+                        axis=1).reshape((-1, 4, 3))
+        T = Q[:, (0, 1, 2, 0, 2, 3)].reshape((-1, 3, 3))
+        Tn = T.copy()
+        Tn[:, :, 1] = 0.0
+        Vs.append(T)
+        Ns.append(Tn)
+
+        V = N.concatenate(Vs).reshape((-1, 3))
+        Vn = N.concatenate(Ns).reshape((-1, 3))
+        V[:, 0] *= self.radius
+        V[:, 1] *= self.height * 0.5
+        V[:, 2] *= self.radius
+        return (V, Vn)
+
+    def getTessellation(self):
+        """
+        キャッシュされたテッセレーション結果を返す
+        """
+        return GetTessellation(('Cylinder', self.subdiv, self.radius,
+                                self.height, bool(self.showTop),
+                                bool(self.showBottom)),
+                               self.tessellate)
+
+    def getTriangleArrays(self):
+        """
+        形状の三角形配列を返す
+        """
+        return self.getTessellation()
+
     def renderSolid(self):
         """
         ソリッドレンダリング
@@ -555,24 +759,7 @@ class Cylinder(GfxNode):
         if self.beginDispList(DLF_SOLID): return
 
         # draw
-        if self.showTop:
-            for i in range(4):
-                self.subdivTri(Cylinder.__surface[Cylinder.__tindex[i][0]],
-                               Cylinder.__surface[Cylinder.__tindex[i][1]],
-                               Cylinder.__surface[Cylinder.__tindex[i][2]],
-                               self.subdiv)
-        if self.showBottom:
-            for i in range(4, 8):
-                self.subdivTri(Cylinder.__surface[Cylinder.__tindex[i][0]],
-                               Cylinder.__surface[Cylinder.__tindex[i][1]],
-                               Cylinder.__surface[Cylinder.__tindex[i][2]],
-                               self.subdiv)
-        for i in range(4):
-            self.subdivQuad(Cylinder.__surface[Cylinder.__qindex[i][0]],
-                            Cylinder.__surface[Cylinder.__qindex[i][1]],
-                            Cylinder.__surface[Cylinder.__qindex[i][2]],
-                            Cylinder.__surface[Cylinder.__qindex[i][3]],
-                            self.subdiv, i)
+        DrawTessellation(self.getTessellation())
 
         # end display-list definition
         self.endDispList(DLF_SOLID)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+vfr scene-graph library
+
+Copyright(c) YoH, 2026, All Right Reserved.
+
+"""
+import time
+
+
+#----------------------------------------------------------------------
+class RenderProfiler(object):
+    """
+    レンダリングプロファイラクラス
+    RenderProfilerクラスは，1フレームのレンダリング中にノード毎の
+    描画時間，描画呼び出し数，頂点数，ディスプレイリストの再作成数，
+    OpenGLの状態変更数を記録します．
+    描画時間はCPU側の経過時間(秒)で，子供のノードを含む時間(time)と
+    含まない時間(self)を記録します．描画呼び出し数はノードの
+    renderSolid/renderWire/renderPoint等の呼び出し数，状態変更数は
+    OpenGLステートキャッシュ(glState.GLStateCache)を介して発行された
+    状態変更の数です．
+    フレームの終了時に，記録はgetReport()で取得できる辞書に変換されます．
+      _gs: 状態変更数を参照するOpenGLステートキャッシュ
+      _nodes: フレーム内のノードID毎の記録
+      _stack: 記録中のノードのスタック
+               [記録, 開始時刻, 開始時の状態変更数,
+                子供の描画時間, 子供の状態変更数]
+      _t0: フレームの開始時刻
+      _report: 直前のフレームの記録
+      frameCount: 記録したフレーム数
+    """
+    def __init__(self):
+        self._gs = None
+        self._nodes = {}
+        self._stack = []
+        self._t0 = 0.0
+        self._report = None
+        self.frameCount = 0
+        return
+
+    def begin(self, gs =None):
+        """
+        フレームの開始
+        - gs: 状態変更数を参照するOpenGLステートキャッシュ
+        """
+        self._gs = gs
+        self._nodes = {}
+        self._stack = []
+        self._t0 = time.perf_counter()
+        return
+
+    def end(self):
+        """
+        フレームの終了
+        フレームの記録をまとめ，直前のフレームの記録として保持します．
+        """
+        frameTime = time.perf_counter() - self._t0
+        nodes = sorted(self._nodes.values(),
+                       key=lambda x: x['self'], reverse=True)
+        self._report = {
+            'frame': self.frameCount,
+            'time': frameTime,
+            'calls': sum([x['calls'] for x in nodes]),
+            'verts': sum([x['verts'] for x in nodes]),
+            'dlRebuilds': sum([x['dlRebuilds'] for x in nodes]),
+            'stateChanges': sum([x['stateChanges'] for x in nodes]),
+            'nodes': nodes,
+            }
+        self.frameCount += 1
+        self._gs = None
+        self._nodes = {}
+        self._stack = []
+        return self._report
+
+    def __record(self, node):
+        """
+        ノードの記録を返す
+        - node: GfxNode
+        """
+        rec = self._nodes.get(node._id)
+        if rec is None:
+            rec = {'id': node._id, 'name': node._name,
+                   'type': type(node).__name__,
+                   'time': 0.0, 'self': 0.0, 'count': 0,
+                   'calls': 0, 'verts': 0, 'dlRebuilds': 0,
+                   'stateChanges': 0}
+            self._nodes[node._id] = rec
+        return rec
+
+    def __issued(self):
+        """
+        OpenGLステートキャッシュが発行した状態変更数を返す
+        """
+        if self._gs is None: return 0
+        return self._gs.issued
+
+    #-------- node interface --------
+    def enter(self, node):
+        """
+        ノードのレンダリング開始
+        - node: GfxNode
+        """
+        rec = self.__record(node)
+        rec['count'] += 1
+        self._stack.append([rec, time.perf_counter(), self.__issued(),
+                            0.0, 0])
+        return
+
+    def leave(self, node):
+        """
+        ノードのレンダリング終了
+        - node: GfxNode
+        """
+        if len(self._stack) < 1: return
+        (rec, t0, s0, ct, cs) = self._stack.pop()
+        dt = time.perf_counter() - t0
+        ds = self.__issued() - s0
+        rec['time'] += dt
+        rec['self'] += dt - ct
+        rec['stateChanges'] += ds - cs
+        if len(self._stack) > 0:
+            self._stack[-1][3] += dt
+            self._stack[-1][4] += ds
+        return
+
+    def countDraw(self, node, verts, calls =1):
+        """
+        描画呼び出しの記録
+        - node: GfxNode
+        - verts: 描画した頂点数
+        - calls: 描画呼び出し数
+        """
+        rec = self.__record(node)
+        rec['calls'] += calls
+        rec['verts'] += verts
+        return
+
+    def countDispList(self, node):
+        """
+        ディスプレイリストの再作成の記録
+        - node: GfxNode
+        """
+        self.__record(node)['dlRebuilds'] += 1
+        return
+
+    #-------- report interface --------
+    def getReport(self):
+        """
+        直前のフレームの記録を返す
+        以下のキーを持つ辞書を返します．記録が無い場合はNoneを返します．
+          frame: フレーム番号
+          time: フレームの描画時間(秒)
+          calls, verts, dlRebuilds, stateChanges: 全ノードの合計
+          nodes: ノード毎の記録(selfの降順)のリスト．各記録は
+                 id, name, type, time, self, count(レンダリング回数),
+                 calls, verts, dlRebuilds, stateChanges
+                 をキーとする辞書です
+        """
+        return self._report
+
+    def getTopNodes(self, n =10, key ='self'):
+        """
+        直前のフレームでコストの大きいノードの記録を返す
+        - n: 返す記録の数
+        - key: 並べ替えのキー('self', 'time', 'calls', 'verts'等)
+        """
+        if self._report is None: return []
+        nodes = sorted(self._report['nodes'],
+                       key=lambda x: x[key], reverse=True)
+        return nodes[0:n]
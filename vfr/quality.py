@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+vfr scene-graph library
+
+Copyright(c) YoH, 2026, All Right Reserved.
+
+"""
+import collections
+
+"""
+品質レベル毎の設定
+(ボリュームのスライス数の比率, LODバイアス, 点の間引き間隔,
+ グリフの間引き間隔, アンチエイリアス, フォグ)
+"""
+QUALITY_LEVELS = (
+    (1.0,  0.0, 1, 1, True,  True),
+    (0.75, 0.5, 1, 1, True,  True),
+    (0.5,  1.0, 2, 1, False, True),
+    (0.35, 2.0, 4, 2, False, False),
+    (0.25, 3.0, 8, 4, False, False),
+    )
+
+
+#----------------------------------------------------------------------
+class RenderQuality(object):
+    """
+    レンダリング品質クラス
+    RenderQualityクラスは，レンダリング中の各ノードが参照する描画品質の
+    設定を保持します．
+    代理描画モードでは，描画負荷の大きいノードを簡略化した代理形状で
+    描画します．代理形状はノードの種類毎に異なり，LODチェーンを持つ
+    三角形集合は最も粗いLODレベル，持たない三角形集合は間引いた点群，
+    ボリュームレンダリングはスライス数を減らした描画となります．
+      proxy: 代理描画モード
+      proxyFaces: 代理形状で描画する三角形数の下限
+      proxyPoints: 点群で代理描画する際の最大点数
+    品質レベル(0が最高品質)はQUALITY_LEVELSの設定を選択し，ボリュームの
+    スライス数，LODバイアス，点とグリフの間引き，アンチエイリアスと
+    フォグの有無を段階的に切り替えます．
+    ガバナーモードでは，update()に渡されたフレームの描画時間が目標の
+    描画時間を保つように品質レベルを上下させます．
+      level: 品質レベル
+      governor: ガバナーモード
+      targetTime: 目標のフレーム描画時間(秒)
+      upRatio: 品質を下げる描画時間の目標に対する比率
+      downRatio: 品質を上げる描画時間の目標に対する比率
+      decimateMin: 点とグリフの間引きを行う最小のデータ数
+      _history: (描画時間, 品質レベル)のフレーム毎の履歴
+    """
+    def __init__(self, **args):
+        """
+        args: proxy =False, proxyFaces =50000, proxyPoints =20000,
+              governor =False, targetTime =1.0/30, historySize =120
+        """
+        self.proxy = False if not 'proxy' in args else args['proxy']
+        self.proxyFaces = 50000 if not 'proxyFaces' in args \
+            else args['proxyFaces']
+        self.proxyPoints = 20000 if not 'proxyPoints' in args \
+            else args['proxyPoints']
+        self.level = 0
+        self.governor = False if not 'governor' in args else args['governor']
+        self.targetTime = 1.0/30 if not 'targetTime' in args \
+            else args['targetTime']
+        self.upRatio = 1.2
+        self.downRatio = 0.6
+        self.decimateMin = 1000
+        historySize = 120 if not 'historySize' in args \
+            else args['historySize']
+        self._history = collections.deque(maxlen=historySize)
+        return
+
+    def isProxy(self):
+        """
+        代理描画モードを返す
+        """
+        return self.proxy
+
+    def pointStride(self, n):
+        """
+        点群代理描画の間引き間隔を返す
+        n点をproxyPoints点以下に間引くための間隔を返します．
+        - n: 間引く前の点数
+        """
+        if self.proxyPoints < 1 or n <= self.proxyPoints:
+            return 1
+        return (n + self.proxyPoints - 1) // self.proxyPoints
+
+    #-------- quality level interface --------
+    def setLevel(self, level):
+        """
+        品質レベルの設定
+        - level: 品質レベル(0〜getMaxLevel())
+        """
+        self.level = min(max(int(level), 0), self.getMaxLevel())
+        return
+
+    def getLevel(self):
+        """
+        品質レベルを返す
+        """
+        return self.level
+
+    def getMaxLevel(self):
+        """
+        最も低い品質レベルを返す
+        """
+        return len(QUALITY_LEVELS) - 1
+
+    def sliceRatio(self):
+        """
+        ボリュームレンダリングのスライス数の比率を返す
+        """
+        return QUALITY_LEVELS[self.level][0]
+
+    def lodBias(self):
+        """
+        LODバイアスの加算値を返す
+        """
+        return QUALITY_LEVELS[self.level][1]
+
+    def pointDecimation(self, n):
+        """
+        ポイントレンダリングの間引き間隔を返す
+        データ数がdecimateMin未満の場合は1を返します．
+        - n: 点の数
+        """
+        if n < self.decimateMin: return 1
+        return QUALITY_LEVELS[self.level][2]
+
+    def glyphDecimation(self, n):
+        """
+        グリフ(PrimSet, Vectors)の間引き間隔を返す
+        データ数がdecimateMin未満の場合は1を返します．
+        - n: グリフの数
+        """
+        if n < self.decimateMin: return 1
+        return QUALITY_LEVELS[self.level][3]
+
+    def antiAlias(self):
+        """
+        アンチエイリアスの可否を返す
+        """
+        return QUALITY_LEVELS[self.level][4]
+
+    def fog(self):
+        """
+        フォグの可否を返す
+        """
+        return QUALITY_LEVELS[self.level][5]
+
+    #-------- governor interface --------
+    def update(self, frameTime):
+        """
+        フレーム描画時間の登録
+        描画時間を履歴に追加し，ガバナーモードの場合は次のフレームの
+        品質レベルを決定します．目標の描画時間をupRatio倍以上超えた場合は
+        超過の度合いに応じて品質を下げ，downRatio倍を下回った場合は
+        品質を1段階上げます．新しい品質レベルを返します．
+        - frameTime: フレームの描画時間(秒)
+        """
+        self._history.append((frameTime, self.level))
+        if not self.governor or self.targetTime <= 0.0:
+            return self.level
+        if frameTime > self.targetTime * self.upRatio:
+            step = 1
+            r = frameTime / self.targetTime
+            while r >= 4.0 and step < self.getMaxLevel():
+                r *= 0.5
+                step += 1
+            self.setLevel(self.level + step)
+        elif frameTime < self.targetTime * self.downRatio:
+            self.setLevel(self.level - 1)
+        return self.level
+
+    def getHistory(self):
+        """
+        フレーム毎の(描画時間, 品質レベル)の履歴を返す
+        古いフレームから順に並んだリストを返します．
+        """
+        return list(self._history)
+
+    def clearHistory(self):
+        """
+        描画時間の履歴のクリア
+        """
+        self._history.clear()
+        return
+
+    def getFrameTime(self):
+        """
+        直前のフレームの描画時間(秒)を返す
+        履歴が空の場合は0.0を返します．
+        """
+        if len(self._history) < 1: return 0.0
+        return self._history[-1][0]
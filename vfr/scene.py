@@ -7,6 +7,11 @@ Copyright(c) YoH, 2026, All Right Reserved.
 """
 from .gfxGroup import *
 from .light import *
+import numpy as N
+
+#----------------------------------------------------------------------
+"""レンダリングリストのエントリ種別"""
+(RL_GROUP, RL_NODE, RL_CUSTOM, RL_BBOX) = range(4)
 
 #----------------------------------------------------------------------
 class Scene(GfxGroup):
@@ -14,13 +19,28 @@ class Scene(GfxGroup):
     シーンクラス
     Sceneクラスは、複数の子供のシーングラフノードとライティングノードを
     持つ事ができるノードで、シーングラフのルートとなるものです.
+    配下のノードはID番号および名前による索引で管理され，検索は定数時間で
+    行われます．索引はシーン配下のaddChild/remChild/remAllChildren/destroy
+    およびsetNameに応じて更新されます．
+      _light: ライティングノードのリスト
+      _idIndex: ID番号からノードへの索引．{ID: [ノード, 経路数]}
+      _nameIndex: 名前からノードのリストへの索引
+      _useRenderList: レンダリングリスト使用モード
+      _renderList: 不透明/半透明パスのレンダリングリスト．無効時はNone
     """
     def __init__(self, **args):
         GfxGroup.__init__(self, **args)
+        self._idIndex = {}
+        self._nameIndex = {}
+        self._useRenderList = True if not 'renderList' in args \
+            else args['renderList']
+        self._renderList = None
         self._light = [Light(0, name='light0'), Light(1, name='light1'),
                        Light(2, name='light2'), Light(3, name='light3')]
         for l in self._light:
             l.addRef(self)
+            l._parent = self
+            self.updateIndex(l, True)
         self._light[0]._on = True
         return
 
@@ -30,6 +50,8 @@ class Scene(GfxGroup):
     def destroy(self):
         del self._light[:]
         GfxGroup.destroy(self)
+        self._idIndex.clear()
+        self._nameIndex.clear()
         return
 
     def getNodeById(self, id):
@@ -40,13 +62,9 @@ class Scene(GfxGroup):
         - id: 検索するノードID
         """
         if id == self._id: return self
-        for c in self._children:
-            ret = c.getNodeById(id)
-            if ret: return ret
-        for c in self._light:
-            ret = c.getNodeById(id)
-            if ret: return ret
-        return None
+        ent = self._idIndex.get(id)
+        if ent is None: return None
+        return ent[0]
 
     def getNodeByName(self, name):
         """
@@ -56,13 +74,70 @@ class Scene(GfxGroup):
         - name: 検索するノードの名前
         """
         if self._name == name : return self
-        for c in self._children:
-            ret = c.getNodeByName(name)
-            if ret: return ret
-        for c in self._light:
-            ret = c.getNodeByName(name)
-            if ret: return ret
-        return None
+        lst = self._nameIndex.get(name)
+        if not lst: return None
+        return lst[0]
+
+    def getNodesByName(self, name):
+        """
+        名前によるノード検索
+        子供のノード群およびライティングノード群から、指定された名前の
+        全てのノードを検索し、リストで返します．
+        - name: 検索するノードの名前
+        """
+        lst = [self] if self._name == name else []
+        for n in self._nameIndex.get(name, []):
+            if not n in lst: lst.append(n)
+        return lst
+
+    def updateIndex(self, node, add):
+        """
+        索引の更新
+        指定されたノードとその配下のノードを索引に登録または削除します．
+        Groupから自動的に呼び出されます．
+        - node: 登録または削除するノード
+        - add: Trueの場合は登録，Falseの場合は削除
+        """
+        stack = [node]
+        while len(stack) > 0:
+            n = stack.pop()
+            ent = self._idIndex.get(n._id)
+            if add:
+                if ent is None:
+                    self._idIndex[n._id] = [n, 1]
+                else:
+                    ent[1] += 1
+                self._nameIndex.setdefault(n._name, []).append(n)
+            else:
+                if ent is None: continue
+                ent[1] -= 1
+                if ent[1] < 1:
+                    del self._idIndex[n._id]
+                lst = self._nameIndex.get(n._name)
+                if lst and n in lst:
+                    lst.remove(n)
+                    if len(lst) < 1:
+                        del self._nameIndex[n._name]
+            if hasattr(n, '_children'):
+                stack.extend(n._children)
+        return
+
+    def renameIndex(self, node, oldName):
+        """
+        名前の索引の更新
+        ノード名の変更に応じて名前の索引を更新します．
+        Node.setNameから自動的に呼び出されます．
+        - node: 名前を変更したノード
+        - oldName: 変更前の名前
+        """
+        lst = self._nameIndex.get(oldName)
+        if not lst or not node in lst: return
+        cnt = lst.count(node)
+        self._nameIndex[oldName] = [n for n in lst if not n is node]
+        if len(self._nameIndex[oldName]) < 1:
+            del self._nameIndex[oldName]
+        self._nameIndex.setdefault(node._name, []).extend([node] * cnt)
+        return
 
     def accumMatrix(self, tid, M):
         """
@@ -78,6 +153,13 @@ class Scene(GfxGroup):
             M1 = M * self._matrix
             M.m_v[0:] = M1.m_v[0:]
             return True
+        tnode = self.getNodeById(tid)
+        if tnode is None: return False
+        PM = self.getPathMatrix(tnode)
+        if not PM is None:
+            M1 = M * PM
+            M.m_v[0:] = M1.m_v[0:]
+            return True
         for c in self._children:
             if c.getNodeById(tid):
                 M1 = M * self._matrix
@@ -92,6 +174,20 @@ class Scene(GfxGroup):
                 return True
         return False
 
+    def invalidateWorld(self):
+        """
+        ワールド座標系への幾何変換行列のキャッシュ無効化
+        自分自身と配下のノードおよびライティングノードのキャッシュを
+        無効化します．
+        """
+        if self._worldMatrix is None:
+            GfxNode.invalidateWorld(self)
+            return
+        GfxGroup.invalidateWorld(self)
+        for l in self._light:
+            l.invalidateWorld()
+        return
+
     def clearDispList(self):
         """
         OpenGLディスプレイリストの破棄
@@ -119,6 +215,9 @@ class Scene(GfxGroup):
         レンダリングパスは2パスで，1パス目に不透明ノードを，2パス目に
         半透明ノードをレンダリングします.
         """
+        prof = GfxNode.GetProfiler()
+        if prof: prof.enter(self)
+
         self.applyMatrix()
         self.applyMaterial()
 
@@ -126,21 +225,185 @@ class Scene(GfxGroup):
         for c in self._light:
             c.render()
 
-        # Traverse Non-Transparent Children
-        for c in self._children:
-            c.render_(False)
+        # Frustum culling
+        culler = GfxNode.GetCuller()
+        if culler:
+            culler.pushMatrix(self)
 
-        # Traverse Transparent Children
-        glEnable(GL_BLEND)
-        glDepthMask(GL_FALSE)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        for c in self._children:
-            c.render_(True)
-        glDepthMask(GL_TRUE)
-        glDisable(GL_BLEND)
+        if self._useRenderList:
+            if self._renderList is None:
+                self.compileRenderList()
+
+            # Render Non-Transparent List
+            self.renderList(self._renderList[0], False)
+
+            # Render Transparent List
+            glEnable(GL_BLEND)
+            glDepthMask(GL_FALSE)
+            glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+            self.renderList(self._renderList[1], True)
+            glDepthMask(GL_TRUE)
+            glDisable(GL_BLEND)
+        else:
+            if culler:
+                children = [c for c in self._children if culler.isVisible(c)]
+            else:
+                children = self._children
+
+            # Traverse Non-Transparent Children
+            for c in children:
+                c.render_(False)
+
+            # Traverse Transparent Children
+            glEnable(GL_BLEND)
+            glDepthMask(GL_FALSE)
+            glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+            for c in children:
+                c.render_(True)
+            glDepthMask(GL_TRUE)
+            glDisable(GL_BLEND)
+
+        if culler:
+            culler.popMatrix()
 
         self.unApplyMaterial()
         self.unApplyMatrix()
+
+        if prof: prof.leave(self)
+        return
+
+    #-------- render list interface --------
+    def setRenderListMode(self, mode):
+        """
+        レンダリングリスト使用モードの設定
+        - mode: レンダリングリスト使用モード
+        """
+        self._useRenderList = mode
+        self._renderList = None
+        self.notice(False)
+        return
+
+    def getRenderListMode(self):
+        """
+        レンダリングリスト使用モードを返す
+        """
+        return self._useRenderList
+
+    def invalidateRenderList(self):
+        """
+        レンダリングリストの無効化
+        次回のレンダリング時にレンダリングリストを再構築します．
+        """
+        self._renderList = None
+        return
+
+    def compileRenderList(self):
+        """
+        レンダリングリストの構築
+        シーングラフを辿り，不透明パスと半透明パスのそれぞれについて，
+        [種別, ノード, 親までの累積幾何変換行列, 同(転置,4x4),
+         マテリアルを適用するグループのタプル]
+        のエントリからなるリストを構築します．
+        グループのエントリ(RL_GROUP)は最後の要素に配下のエントリの終了位置を
+        持ち，視垂台カリングで配下をまとめて除外するために使用します．
+        render_を再定義しているノードは，そのrender_を呼び出すエントリ
+        (RL_CUSTOM)として登録します．
+        """
+        T = N.identity(4)
+        self._renderList = ([], [])
+        self.__compile(self, T, (), False, self._renderList[0])
+        self.__compile(self, T, (), True, self._renderList[1])
+        return self._renderList
+
+    def __compile(self, group, T, chain, transpMode, out):
+        """
+        レンダリングリストの構築(グループ単位)
+        - group: 対象のグループ
+        - T: グループの子供の座標系への累積幾何変換行列(転置,4x4)
+        - chain: マテリアルを適用するグループのタプル
+        - transpMode: 半透明モード
+        - out: エントリを追加するリスト
+        """
+        W = T.astype(N.float32).reshape(16)
+        for c in group._children:
+            if c._renderMode == RT_NONE and not c._showBbox: continue
+            rfunc = type(c).render_
+            if rfunc is GfxGroup.render_:
+                if c._renderMode == RT_NONE: continue
+                M = N.asarray(c._matrix.m_v, dtype=N.float64).reshape((4,4))
+                Tc = N.dot(M, T)
+                cchain = chain + (c,) if c._useLocalMaterial else chain
+                idx = len(out)
+                out.append([RL_GROUP, c, None, T, idx+1])
+                self.__compile(c, Tc, cchain, transpMode, out)
+                if c._showBbox and \
+                   ((transpMode and c._bboxColor[3] <= 0.999) or \
+                    (not transpMode and c._bboxColor[3] > 0.999)):
+                    out.append([RL_BBOX, c, Tc.astype(N.float32).reshape(16),
+                                Tc, chain])
+                if len(out) == idx + 1:
+                    out.pop()
+                else:
+                    out[idx][4] = len(out)
+            elif rfunc is GfxNode.render_:
+                if c._transparent == transpMode:
+                    out.append([RL_NODE, c, W, T, chain])
+            else:
+                out.append([RL_CUSTOM, c, W, T, chain])
+        return
+
+    def renderList(self, lst, transpMode):
+        """
+        レンダリングリストの描画
+        - lst: レンダリングリスト
+        - transpMode: 半透明モード
+        """
+        culler = GfxNode.GetCuller()
+        cur = ()
+        i = 0
+        n = len(lst)
+        while i < n:
+            (kind, node, W, T, x) = lst[i]
+            if kind == RL_GROUP:
+                if culler and not culler.isVisibleAt(node, T):
+                    i = x
+                else:
+                    i += 1
+                continue
+            i += 1
+            if culler and kind != RL_BBOX and not culler.isVisibleAt(node, T):
+                continue
+            if x != cur:
+                for g in reversed(cur): g.unApplyMaterial()
+                for g in x: g.applyMaterial()
+                cur = x
+            glPushMatrix()
+            glMultMatrixf(W)
+            if kind == RL_NODE:
+                node.render()
+            elif kind == RL_CUSTOM:
+                if culler: culler.pushTransform(T)
+                node.render_(transpMode)
+                if culler: culler.popMatrix()
+                GfxNode.GetGLState().invalidate()
+            else:
+                node.drawBbox()
+            glPopMatrix()
+        for g in reversed(cur): g.unApplyMaterial()
+        return
+
+    def notice(self, invalidateDL =True):
+        """
+        変更通知
+        レンダリングリストを無効化し，基底クラスのnotice()を呼び出します.
+        ノードのデータのみの変更通知(GfxNode.noticeData)の場合は，
+        シーングラフの構造や幾何変換は変わらないため，レンダリングリストを
+        無効化しません．
+        - invalidateDL: ディスプレイリスト無効化フラグ
+        """
+        if not GfxNode.IsDataNotice():
+            self._renderList = None
+        GfxGroup.notice(self, invalidateDL)
         return
 
     def renderBbox(self):
@@ -44,7 +44,7 @@ class TexNode(Base):
         if glIsTexture(self._texId):
             glDeleteTextures(1, [self._texId])
         self._texId = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, self._texId)
+        GfxNode.GetGLState().bindTexture(GL_TEXTURE_2D, self._texId)
 
         glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
@@ -90,8 +90,9 @@ class TexNode(Base):
             return False
         if not glIsTexture(self._texId):
             return False
-        glEnable(GL_TEXTURE_2D)
-        glBindTexture(GL_TEXTURE_2D, self._texId)
+        gs = GfxNode.GetGLState()
+        gs.enable(GL_TEXTURE_2D)
+        gs.bindTexture(GL_TEXTURE_2D, self._texId)
         glTexGeni(GL_S, GL_TEXTURE_GEN_MODE, GL_OBJECT_LINEAR);
         glTexGeni(GL_T, GL_TEXTURE_GEN_MODE, GL_OBJECT_LINEAR);
 
@@ -136,13 +137,14 @@ class TexNode(Base):
     def disable(self):
         if self._mapType == TexNode.TEX_NOMAP:
             return
-        glBindTexture(GL_TEXTURE_2D, 0)
+        gs = GfxNode.GetGLState()
+        gs.bindTexture(GL_TEXTURE_2D, 0)
         glDisable(GL_TEXTURE_GEN_S)
         glDisable(GL_TEXTURE_GEN_T)
         glMatrixMode(GL_TEXTURE)
         glLoadIdentity()
         glMatrixMode(GL_MODELVIEW)
-        glDisable(GL_TEXTURE_2D)
+        gs.disable(GL_TEXTURE_2D)
         return
 
     
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+vfr scene-graph library
+
+Copyright(c) YoH, 2026, All Right Reserved.
+
+タイル描画
+GL_MAX_VIEWPORT_DIMSやフレームバッファの上限を超える大きさの画像
+(ポスター)を，視界を分割したタイル毎にオフスクリーン描画し，
+PNGファイルに出力します．
+タイルは上の列から順に描画し，1列分の帯のみをメモリに保持して
+PNGファイルに逐次出力するため，画像全体をメモリに保持しません．
+タイルは周囲にmarginの余白を付けて描画し，余白を切り落として
+並べます．タイルの境界付近にある太い点や線が，隣のタイルで
+欠けることを防ぎます．
+カメラが描画領域(ウインドウ)に設定されている場合は，そのOpenGL
+コンテキストのフレームバッファオブジェクト(TileFramebuffer)に
+タイルを描画するため，ディスプレイリスト，頂点バッファ，テクスチャ，
+シェーダーをそのまま使用できます．
+"""
+from . import drawAreaOffscreen # must be imported before OpenGL
+from .drawAreaOffscreen import DrawAreaOffscreen
+from OpenGL.GL import *
+from . import png_io
+from . import trace
+import numpy as N
+
+
+#----------------------------------------------------------------------
+class TileFramebuffer(object):
+    """
+    タイル描画用フレームバッファクラス
+    現在のOpenGLコンテキストにタイルの大きさのフレームバッファ
+    オブジェクト(色+デプス)を作成し，カメラの描画を行って読み出します．
+      _size: バッファのサイズ(幅, 高さ)
+      _fbo: フレームバッファオブジェクト
+      _rb: カラー，デプスのレンダーバッファ
+    """
+    def __init__(self, width, height):
+        """
+        作成できない場合はRuntimeErrorを送出します．
+        - width, height: バッファのサイズ(pixels)
+        """
+        self._size = (width, height)
+        self._fbo = 0
+        self._rb = None
+        self._fbo = glGenFramebuffers(1)
+        self._rb = glGenRenderbuffers(2)
+        glBindRenderbuffer(GL_RENDERBUFFER, self._rb[0])
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, width, height)
+        glBindRenderbuffer(GL_RENDERBUFFER, self._rb[1])
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH_COMPONENT24,
+                              width, height)
+        glBindRenderbuffer(GL_RENDERBUFFER, 0)
+        prev = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
+        glBindFramebuffer(GL_FRAMEBUFFER, self._fbo)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0,
+                                  GL_RENDERBUFFER, self._rb[0])
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT,
+                                  GL_RENDERBUFFER, self._rb[1])
+        ok = glCheckFramebufferStatus(GL_FRAMEBUFFER) \
+            == GL_FRAMEBUFFER_COMPLETE
+        glBindFramebuffer(GL_FRAMEBUFFER, int(prev))
+        if not ok:
+            self.destroy()
+            raise RuntimeError('TileFramebuffer: incomplete framebuffer')
+        return
+
+    def destroy(self):
+        """
+        フレームバッファオブジェクトの破棄
+        作成したコンテキストがカレントの状態で呼び出します．
+        """
+        if self._rb is not None:
+            glDeleteRenderbuffers(2, self._rb)
+            self._rb = None
+        if self._fbo:
+            glDeleteFramebuffers(1, [self._fbo])
+            self._fbo = 0
+        return
+
+    def render(self, camera):
+        """
+        描画と画像の取得
+        カメラの描画を行い，形状(高さ, 幅, 4)のuint8のRGBA配列を，
+        上の行から順に返します(DrawAreaOffscreen.render参照)．
+        - camera: カメラ
+        """
+        (w, h) = self._size
+        prev = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
+        vp = glGetIntegerv(GL_VIEWPORT)
+        glBindFramebuffer(GL_FRAMEBUFFER, self._fbo)
+        glClearColor(0.0, 0.0, 0.0, 0.0)
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        glEnable(GL_SCISSOR_TEST)
+        glViewport(0, 0, w, h)
+        glScissor(0, 0, w, h)
+        camera.redraw(float(w) / float(h))
+        glDisable(GL_SCISSOR_TEST)
+        glFinish()
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        buf = glReadPixels(0, 0, w, h, GL_RGBA, GL_UNSIGNED_BYTE)
+        glBindFramebuffer(GL_FRAMEBUFFER, int(prev))
+        glViewport(vp[0], vp[1], vp[2], vp[3])
+        if isinstance(buf, bytes):
+            img = N.frombuffer(buf, dtype=N.uint8)
+        else:
+            img = N.asarray(buf, dtype=N.uint8)
+        return img.reshape((h, w, 4))[::-1].copy()
+
+
+#----------------------------------------------------------------------
+@trace.Traced('tiledRender.RenderPoster', 'render')
+def RenderPoster(camera, path, width, height, **args):
+    """
+    カメラの視界を指定した大きさの画像としてタイル描画し，PNGファイルに
+    出力する関数です．成功した場合はTrueを返します．
+    描画中はカメラの描画品質ガバナーと代理描画を無効にし，描画後に
+    元に戻します．カメラが既に他の描画領域(ウインドウ)に設定されている
+    場合は，その描画領域のOpenGLコンテキストでTileFramebufferに描画し，
+    drawAreaとbackendは使用しません．
+    - camera: カメラ
+    - path: 出力ファイルのパス
+    - width, height: 画像サイズ(pixels)
+    args: tileSize =1024, margin =16, sizeScale =1.0, alpha =True,
+          backend =None, drawArea =None, progress =None
+      tileSize: タイルの大きさ(pixels, 余白を除く)
+      margin: タイルの余白(pixels)．描画する最大の点サイズ・線幅の
+              半分以上とします
+      sizeScale: 点サイズと線幅の倍率．画面表示と見かけの太さを
+                 揃える場合は，画像の幅/画面の幅を指定します
+      alpha: Trueの場合RGBA，Falseの場合RGBで出力します
+      backend: オフスクリーンコンテキストのバックエンド('egl', 'osmesa')
+      drawArea: 描画に使用するDrawAreaOffscreen．Noneの場合は作成します
+      progress: 進捗通知関数．progress(描画したタイル数, 全タイル数)の
+                形式でタイル毎に呼び出されます
+    """
+    tileSize = 1024 if not 'tileSize' in args else args['tileSize']
+    margin = 16 if not 'margin' in args else args['margin']
+    sizeScale = 1.0 if not 'sizeScale' in args else args['sizeScale']
+    alpha = True if not 'alpha' in args else args['alpha']
+    backend = None if not 'backend' in args else args['backend']
+    da = None if not 'drawArea' in args else args['drawArea']
+    progress = None if not 'progress' in args else args['progress']
+    if width < 1 or height < 1 or tileSize < 1 or margin < 0:
+        return False
+
+    # tiles are rendered with a fixed size; edge tiles are cropped
+    tw = min(tileSize, width)
+    th = min(tileSize, height)
+    (TW, TH) = (tw + 2*margin, th + 2*margin)
+    nx = (width + tw - 1) // tw
+    ny = (height + th - 1) // th
+
+    orgDA = camera._da
+    fb = None
+    ownDA = False
+    if orgDA:
+        # the window's context: its GL objects stay valid
+        orgDA.makeCurrent()
+        try:
+            fb = TileFramebuffer(TW, TH)
+        except Exception:
+            return False
+    else:
+        ownDA = da is None
+        if ownDA:
+            da = DrawAreaOffscreen(TW, TH, backend)
+        else:
+            da.setSize(TW, TH)
+        da.setCamera(camera)
+
+    saved = (camera.getGovernor(), camera.getQualityLevel(),
+             camera.getProxyMode(), camera.getSizeScale())
+    camera.setGovernor(False)
+    camera.setProxyMode(False)
+    camera.setSizeScale(sizeScale)
+
+    writer = None
+    ret = False
+    try:
+        writer = png_io.PNGWriter(path, width, height, alpha)
+        strip = N.empty((th, width, 4), dtype=N.uint8)
+        for j in range(ny):
+            y = j * th          # top row of the strip (top-down)
+            h = min(th, height - y)
+            for i in range(nx):
+                x = i * tw
+                w = min(tw, width - x)
+                # tile rectangle with margin (bottom-left origin)
+                camera.setTile((width, height, x - margin,
+                                height - y - th - margin, TW, TH))
+                img = fb.render(camera) if fb else da.render()
+                strip[0:h, x:x+w] = img[margin:margin+h, margin:margin+w]
+                if progress:
+                    progress(j * nx + i + 1, nx * ny)
+            writer.writeRows(strip[0:h])
+        ret = writer.close()
+    finally:
+        if writer and not ret:
+            writer.abort()
+        camera.setTile(None)
+        camera.setGovernor(saved[0])
+        camera.setQualityLevel(saved[1])
+        camera.setProxyMode(saved[2])
+        camera.setSizeScale(saved[3])
+        if fb:
+            orgDA.makeCurrent()
+            fb.destroy()
+        if ownDA:
+            # display lists belong to the context being destroyed
+            da.makeCurrent()
+            camera.clearDispList()
+            da.setCamera(None)
+            da.destroy()
+        camera.notice()
+    return ret
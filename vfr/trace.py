@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+vfr scene-graph library
+
+Copyright(c) YoH, 2026, All Right Reserved.
+
+スパントレーサ
+ファイル入力，可視化オブジェクトの更新，描画等の処理区間(スパン)の
+開始時刻と所要時間を記録し，Chrome trace形式(chrome://tracing,
+Perfetto)のJSONに出力します．
+記録は既定で無効で，無効時のスパンは有効判定のみを行います．
+環境変数VFR_TRACEにファイルパスを指定した場合，import時に記録を
+有効にし，プロセス終了時にそのパスへ出力します．
+"""
+import os
+import sys
+import time
+import json
+import atexit
+import threading
+import functools
+
+_enabled = False
+_events = []
+_t0 = time.perf_counter()
+
+
+#----------------------------------------------------------------------
+def Enable(mode =True):
+    """
+    記録の有効/無効の設定
+    - mode: Trueの場合記録を有効にします
+    """
+    global _enabled
+    _enabled = mode
+    return
+
+def IsEnabled():
+    """
+    記録が有効かどうかを返す
+    """
+    return _enabled
+
+def Clear():
+    """
+    記録したイベントの破棄
+    """
+    del _events[:]
+    return
+
+def GetEvents():
+    """
+    記録したイベントのリストを返す
+    各イベントはChrome trace形式のイベントの辞書です．
+    """
+    return list(_events)
+
+def _now():
+    """
+    トレース開始からの経過時間(マイクロ秒)を返す
+    """
+    return (time.perf_counter() - _t0) * 1e6
+
+
+#----------------------------------------------------------------------
+class Span(object):
+    """
+    スパンクラス
+    with文で囲んだ処理区間を一つの完了イベント(ph='X')として記録します．
+    記録が無効の場合は何も記録しません．
+      name: スパン名
+      cat: カテゴリ名
+      args: イベントに付加する引数の辞書
+      _ts: 開始時刻(マイクロ秒)．記録しない場合はNone
+    """
+    __slots__ = ('name', 'cat', 'args', '_ts')
+
+    def __init__(self, name, cat ='vfr', **args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self._ts = None
+        return
+
+    def __enter__(self):
+        if _enabled:
+            self._ts = _now()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._ts is None: return False
+        ev = {'name': self.name, 'cat': self.cat, 'ph': 'X',
+              'ts': self._ts, 'dur': _now() - self._ts,
+              'pid': os.getpid(), 'tid': threading.get_ident()}
+        if exc_type is not None:
+            self.args['exception'] = exc_type.__name__
+        if self.args:
+            ev['args'] = self.args
+        _events.append(ev)
+        self._ts = None
+        return False
+
+def Traced(name =None, cat ='vfr'):
+    """
+    関数をスパンで囲むデコレータ
+    記録が無効の場合は関数をそのまま呼び出します．
+    - name: スパン名．Noneの場合は関数の修飾名を使用します
+    - cat: カテゴリ名
+    """
+    def deco(func):
+        sname = func.__qualname__ if name is None else name
+        @functools.wraps(func)
+        def wrapper(*a, **k):
+            if not _enabled:
+                return func(*a, **k)
+            with Span(sname, cat):
+                return func(*a, **k)
+        return wrapper
+    return deco
+
+def Instant(name, cat ='vfr', **args):
+    """
+    瞬間イベント(ph='i')の記録
+    - name: イベント名
+    - cat: カテゴリ名
+    """
+    if not _enabled: return
+    ev = {'name': name, 'cat': cat, 'ph': 'i', 's': 't', 'ts': _now(),
+          'pid': os.getpid(), 'tid': threading.get_ident()}
+    if args:
+        ev['args'] = args
+    _events.append(ev)
+    return
+
+
+#----------------------------------------------------------------------
+def ToChromeTrace():
+    """
+    記録したイベントをChrome trace形式の辞書で返す
+    """
+    meta = {'name': 'process_name', 'ph': 'M', 'pid': os.getpid(),
+            'args': {'name': os.path.basename(sys.argv[0]) \
+                     if sys.argv and sys.argv[0] else 'python'}}
+    return {'traceEvents': [meta] + list(_events),
+            'displayTimeUnit': 'ms'}
+
+def Dump(path):
+    """
+    記録したイベントのChrome trace形式のJSONファイルへの出力
+    出力に成功した場合はTrueを返します．
+    - path: 出力ファイルのパス
+    """
+    try:
+        with open(path, 'w') as f:
+            json.dump(ToChromeTrace(), f)
+    except Exception:
+        return False
+    return True
+
+
+#----------------------------------------------------------------------
+if os.environ.get('VFR_TRACE'):
+    Enable(True)
+    atexit.register(Dump, os.environ['VFR_TRACE'])
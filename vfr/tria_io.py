@@ -8,38 +8,127 @@ Copyright(c) YoH, 2026, All Right Reserved.
 """
 from .triangles import *
 from .utilMath import *
+import numpy as N
+import os.path
 import struct
+from . import trace
+
+#----------------------------------------------------------------------
+# STL binary facet record (50bytes): normal, 3 vertices, attribute word
+STL_FACET = N.dtype([('normal', '<f4', (3,)),
+                     ('verts', '<f4', (3, 3)),
+                     ('attr', '<u2')])
 
 #----------------------------------------------------------------------
 def IsStlAscii(path):
     """
     指定されたSTLファイルがASCIIかBINARYかの判定を行い，結果を返す関数です．
     ASCIIの場合は1を，BINARYの場合は0を，エラーの場合は-1を返します．
+    ヘッダの面数(リトルエンディアンまたはビッグエンディアン)とファイル
+    サイズが一致する場合はBINARY，一致しない場合は先頭が'solid'であれば
+    ASCIIとします．
     - path: STLファイルのパス
     """
     try:
-        f = open(path, 'r')
+        size = os.path.getsize(path)
+        f = open(path, 'rb')
     except:
         return -1 # error (can not open)
     try:
-        f.read(80)
-        nf = struct.unpack('i', f.read(4))[0]
+        head = f.read(84)
+    finally:
         f.close()
-    except:
+    if len(head) < 84:
         return 1 # maybe ascii
+    for fmt in ('<i', '>i'):
+        nf = struct.unpack(fmt, head[80:84])[0]
+        if size == 84 + STL_FACET.itemsize * nf:
+            return 0 # binary
+    if head.lstrip().startswith(b'solid'):
+        return 1 # ascii
+    nf = struct.unpack('<i', head[80:84])[0]
     if nf < 0 or nf > 500000000:
         return 1 # maybe ascii
     return 0 # binary
 
 #----------------------------------------------------------------------
-def Read(path, fmt =None):
+def FaceIndices(tria):
+    """
+    指定されたノードの三角形を構成する頂点番号の配列(形状(三角形数, 3))を
+    返す関数です．インデックスモードでないノードの場合は，頂点を3個づつに
+    区切った頂点番号を返します．
+    - tria: Trianglesノード
+    """
+    if 'getFaceIndices' in dir(tria):
+        return tria.getFaceIndices()
+    nf = tria.getNumVerts() // 3
+    return N.arange(nf*3, dtype=N.int32).reshape((nf, 3))
+
+#----------------------------------------------------------------------
+def FacetNormals(tria, fidx, start =0):
+    """
+    指定されたノードの三角形毎の法線ベクトルの配列(形状(三角形数, 3))を
+    返す関数です．AT_PER_VERTEXの場合は3頂点の法線ベクトルの平均，
+    AT_PER_FACEの場合は面の法線ベクトルとし，法線ベクトルが無い三角形は
+    (0,0,1)とします．
+    - tria: Trianglesノード
+    - fidx: 三角形を構成する頂点番号の配列(FaceIndices参照)
+    - start: fidxの先頭の三角形番号(AT_PER_FACEの場合に使用)
+    """
+    nf = len(fidx)
+    nml = N.zeros((nf, 3), dtype=N.float32)
+    nml[:, 2] = 1.0
+    nn = tria.getNumNormals()
+    if nn < 1 or nf < 1:
+        return nml
+    if tria._normalMode == AT_PER_VERTEX:
+        normals = tria.getNormalsArray()
+        ok = fidx.max(axis=1) < nn
+        idx = fidx[ok]
+        nml[ok] = (normals[idx[:, 0]] + normals[idx[:, 1]]
+                   + normals[idx[:, 2]]) * (1/3.0)
+    elif tria._normalMode == AT_PER_FACE:
+        n = min(nf, nn - start)
+        if n > 0:
+            nml[0:n] = tria.getNormalsArray()[start:start+n]
+    return nml
+
+def STLFacets(tria, fidx, start =0, end =None):
+    """
+    指定されたノードの三角形を，STLバイナリの面レコード(STL_FACET)の
+    配列として返す関数です．
+    - tria: Trianglesノード
+    - fidx: 三角形を構成する頂点番号の配列(FaceIndices参照)
+    - start, end: 出力する三角形番号の範囲(endがNoneの場合は最後まで)
+    """
+    if end is None: end = len(fidx)
+    idx = fidx[start:end]
+    rec = N.zeros(len(idx), dtype=STL_FACET)
+    rec['normal'] = FacetNormals(tria, idx, start)
+    rec['verts'] = tria.getVertsArray()[idx]
+    return rec
+
+#----------------------------------------------------------------------
+@trace.Traced('tria_io.Read', 'load')
+def Read(path, fmt =None, weld =False, tol =0.0, lod =False, lodDir =None,
+         mapped =False):
     """
     指定された形状ファイルを読み込み，対応するTrianglesノードを生成して返す
     関数です．戻り値は生成したTrianglesノードとフォーマット文字列のタプルです．
+    weldがTrueの場合，読み込み後に頂点の溶接を行いインデックスモードの
+    Trianglesノードを生成します．圧縮率はTrianglesノードの_weldRatioに
+    設定されます．
+    lodがTrueの場合，読み込み後にLODチェーンを構築します
+    (Triangles.buildLOD参照)．
     - path: 形状ファイルのパス
     - fmt: 形状ファイルのフォーマット．以下のいずれかの文字列で指定する．
         Wavefront OBJ: 'obj', STL Ascii: 'sla', STL Binary: 'slb'
         Noneの場合はpathのサフィックスから判定する．
+    - weld: 頂点溶接フラグ
+    - tol: 頂点溶接の許容誤差(Triangles.weld参照)
+    - lod: LODチェーン構築フラグ
+    - lodDir: LODチェーンのキャッシュディレクトリ
+    - mapped: STL Binaryの場合のメモリマップ読み込みフラグ(ReadSLB参照)
     """
     if not path or len(path) < 1: return (None, '')
     xfmt = None
@@ -65,25 +154,32 @@ def Read(path, fmt =None):
                 elif is_ascii == 0:
                     xfmt = 'slb'
     if xfmt == 'obj':
-        return (ReadOBJ(path), 'obj')
-    if xfmt == 'sla':
-        return (ReadSLA(path), 'sla')
-    if xfmt == 'slb':
-        return (ReadSLB(path), 'slb')
-    return None
+        tria = ReadOBJ(path)
+    elif xfmt == 'sla':
+        tria = ReadSLA(path)
+    elif xfmt == 'slb':
+        tria = ReadSLB(path, mapped)
+    else:
+        return None
+    if weld and tria:
+        tria.weld(tol)
+    if lod and tria:
+        tria.buildLOD(cacheDir=lodDir)
+    return (tria, xfmt)
 
-def Write(tria, path, fmt =None):
+def Write(tria, path, fmt =None, chunkSize =None):
     """
     指定されたTrianglesノードの頂点および法線ベクトルデータを，指定された
     形状ファイルに出力します．成功した場合はTrueを返します．
     Trianglesノードは，3つ以上の頂点を持っている必要があります．
     また，法線ベクトルを持たない場合は，全ての法線ベクトルを(0,0,1)として
-    出力します．
+    出力します．インデックスモードのTrianglesノードにも対応します．
     - tria: Trianglesノード
     - path: 形状ファイルのパス
     - fmt: 形状ファイルのフォーマット．以下のいずれかの文字列で指定する．
         Wavefront OBJ: 'obj', STL Ascii: 'sla', STL Binary: 'slb'
         Noneの場合はpathのサフィックスから判定する．
+    - chunkSize: STLの場合の1回に出力する三角形数(WriteSLB参照)
     """
     if not path or len(path) < 1: return False
     xfmt = None
@@ -108,9 +204,9 @@ def Write(tria, path, fmt =None):
     if xfmt == 'obj':
         return WriteOBJ(tria, path)
     if xfmt == 'sla':
-        return WriteSLA(tria, path)
+        return WriteSLA(tria, path, chunkSize)
     if xfmt == 'slb':
-        return WriteSLB(tria, path)
+        return WriteSLB(tria, path, chunkSize)
     return False
 
 
@@ -131,7 +227,12 @@ def ReadSLA(path):
     return tria
 
 
-def WriteSLA(tria, path):
+# one facet of SLA(STL Ascii): normal and 3 vertices
+_SLA_FACET = 'facet normal %f %f %f\nouter loop\n' \
+             'vertex %f %f %f\nvertex %f %f %f\nvertex %f %f %f\n' \
+             'endloop\nendfacet\n'
+
+def WriteSLA(tria, path, chunkSize =None):
     """
     TrianglesノードからSLA(STL Ascii)ファイルへの出力
     指定されたTrianglesノードの頂点および法線ベクトルデータを，指定された
@@ -141,6 +242,7 @@ def WriteSLA(tria, path):
     出力します．
     - tria: Trianglesノード
     - path: SLAファイルのパス
+    - chunkSize: 1回に整形，出力する三角形数(Noneの場合は65536)
     """
     if tria is None:
         return False
@@ -148,47 +250,25 @@ def WriteSLA(tria, path):
         return False
     if tria.getNumVerts() < 3:
         return False
-    
+    if not chunkSize or chunkSize < 1:
+        chunkSize = 65536
+
+    fidx = FaceIndices(tria)
+    nf = len(fidx)
     try:
         f = open(path, 'w')
     except:
         return False
-    f.write('solid ascii\n')
-
-    nn = tria.getNumNormals()
-    nf = tria.getNumVerts() / 3
-    for i in range(nf):
-        if tria._normalMode == AT_PER_VERTEX:
-            if i*3+2 < nn:
-                nml = Vec3(tria._normals[i*3]) + \
-                    Vec3(tria._normals[i*3+1]) + Vec3(tria._normals[i*3+2])
-                nml = nml * (1/3.0)
-            else:
-                nml = (0.0, 0.0, 1.0)
-            f.write('facet normal %f %f %f\n' % (nml[0], nml[1], nml[2]))
-        elif tria._normalMode == AT_PER_FACE:
-            if i < nn:
-                f.write('facet normal %f %f %f\n' % (tria._normals[i][0],
-                                                     tria._normals[i][1],
-                                                     tria._normals[i][2]))
-            else:
-                f.write('facet normal 0.0 0.0 1.0\n')
-        else:
-            f.write('facet normal 0.0 0.0 1.0\n')
-
-        f.write('outer loop\n')
-        f.write('vertex %f %f %f\n' % (tria._verts[i*3  ][0],
-                                       tria._verts[i*3  ][1],
-                                       tria._verts[i*3  ][2]))
-        f.write('vertex %f %f %f\n' % (tria._verts[i*3+1][0],
-                                       tria._verts[i*3+1][1],
-                                       tria._verts[i*3+1][2]))
-        f.write('vertex %f %f %f\n' % (tria._verts[i*3+2][0],
-                                       tria._verts[i*3+2][1],
-                                       tria._verts[i*3+2][2]))
-        f.write('endloop\n')
-        f.write('endfacet\n')
-
+    try:
+        f.write('solid ascii\n')
+        for start in range(0, nf, chunkSize):
+            rec = STLFacets(tria, fidx, start, start + chunkSize)
+            val = N.concatenate((rec['normal'],
+                                 rec['verts'].reshape((-1, 9))), axis=1)
+            f.write(_SLA_FACET * len(rec) % tuple(val.ravel().tolist()))
+    except:
+        f.close()
+        return False
     f.close()
     return True
 
@@ -196,12 +276,21 @@ def WriteSLA(tria, path):
 #----------------------------------------------------------------------
 # STL/Binary interface
 
-def ReadSLB(path):
+def ReadSLB(path, mapped =False):
     """
     SLB(STL Binary)ファイルの入力
     指定されたSLBファイルを入力し，対応するTrianglesノードを生成して返します．
+    mappedがTrueの場合，ファイルをメモリマップしたMappedTrianglesノードを
+    生成します．データは描画または編集の時点でObjDataに取り込まれます．
     - path: SLBファイルのパス
+    - mapped: メモリマップ読み込みフラグ
     """
+    if mapped:
+        smap = STLMap(path)
+        if smap.getNumFaces() < 1:
+            smap.close()
+            return None
+        return MappedTriangles(stlMap=smap)
     tria = Triangles()
     if not tria.loadFile(path, 'slb'):
         del tria
@@ -210,7 +299,7 @@ def ReadSLB(path):
     return tria
 
 
-def WriteSLB(tria, path):
+def WriteSLB(tria, path, chunkSize =None):
     """
     TrianglesノードからSLB(STL Binary)ファイルへの出力
     指定されたTrianglesノードの頂点および法線ベクトルデータを，指定された
@@ -218,57 +307,277 @@ def WriteSLB(tria, path):
     Trianglesノードは，3つ以上の頂点を持っている必要があります．
     また，法線ベクトルを持たない場合は，全ての法線ベクトルを(0,0,1)として
     出力します．
+    面レコードの表を一括で作成して1回で出力します．chunkSizeを指定した場合は
+    その三角形数毎に作成，出力し，メモリ使用量を抑えます．
     - tria: Trianglesノード
     - path: SLBファイルのパス
+    - chunkSize: 1回に出力する三角形数(Noneの場合は全て)
     """
     if tria is None:
         return False
     if not '_GfxNode__useDispList' in dir(tria):
         return False
-    nv = tria.getNumVerts()
-    nf = nv / 3
+    fidx = FaceIndices(tria)
+    nf = len(fidx)
     if nf < 1:
         return False
-    nn = tria.getNumNormals()
-    
+    if not chunkSize or chunkSize < 1:
+        chunkSize = nf
+
     try:
         f = open(path, 'wb')
     except:
         return False
+    try:
+        # header(80bytes) and number of facets
+        f.write(struct.pack('<80sI', b'created by using tria_io.WriteSLB', nf))
+        for start in range(0, nf, chunkSize):
+            f.write(STLFacets(tria, fidx, start, start + chunkSize).tobytes())
+    except:
+        f.close()
+        return False
+    f.close()
+    return True
+
+
+#----------------------------------------------------------------------
+# STL/Binary memory-mapped interface
+
+class STLMap(object):
+    """
+    STLバイナリファイルのメモリマップ
+    ファイルの面レコード(50bytes)をnumpy.memmapで参照し，頂点座標と
+    法線ベクトルをレコード上のストライド付きビューとして提供します．
+    データはページ単位で必要になった時点でのみ読み込まれます．
+    面数がリトルエンディアンで不正な値の場合は，ObjData_LoadSLBと同様に
+    ビッグエンディアンのファイルとして扱います．
+      path: ファイルのパス
+      _rec: 面レコード配列(numpy.memmap, STL_FACET)．開けない場合はNone
+      _bbox: 算出したバウンディングボックス(最小座標, 最大座標)のキャッシュ
+    """
+    def __init__(self, path):
+        self.path = path
+        self._rec = None
+        self._bbox = None
+        try:
+            size = os.path.getsize(path)
+            with open(path, 'rb') as f:
+                f.seek(80)
+                head = f.read(4)
+        except:
+            return
+        if len(head) < 4: return
+        dt = STL_FACET
+        nf = struct.unpack('<i', head)[0]
+        if nf < 0 or nf > 500000000:
+            nf = struct.unpack('>i', head)[0]
+            if nf < 0 or nf > 500000000: return
+            dt = STL_FACET.newbyteorder('>')
+        nf = min(nf, (size - 84) // STL_FACET.itemsize)
+        if nf < 1: return
+        self._rec = N.memmap(path, dtype=dt, mode='r', offset=84, shape=(nf,))
+        return
+
+    def close(self):
+        """
+        メモリマップの解放
+        取得済みのビューは以後使用できません．
+        """
+        self._rec = None
+        return
+
+    def getNumFaces(self):
+        """
+        三角形数を返す
+        """
+        if self._rec is None: return 0
+        return len(self._rec)
+
+    def getRecords(self):
+        """
+        面レコード配列(STL_FACET)のビューを返す
+        """
+        return self._rec
+
+    def getVertsView(self):
+        """
+        頂点座標のビューを返す
+        形状(三角形数, 3, 3)のfloat32配列です．コピーせずにファイル上の
+        レコードを参照するため，連続した配列ではありません．
+        """
+        if self._rec is None: return N.zeros((0, 3, 3), dtype=N.float32)
+        return self._rec['verts']
 
-    # write header(80bytes)
-    f.write(struct.pack('80s', 'created by using tria_io.WriteSLB'))
-
-    # write data
-    f.write(struct.pack('i', nf))
-    for i in range(nf):
-        if tria._normalMode == AT_PER_VERTEX:
-            if i*3+2 < nn:
-                nml = Vec3(tria._normals[i*3]) + \
-                    Vec3(tria._normals[i*3+1]) + Vec3(tria._normals[i*3+2])
-                nml = nml * (1/3.0)
-            else:
-                nml = (0.0, 0.0, 1.0)
-            f.write(struct.pack('fff', nml[0], nml[1], nml[2]))
-        elif tria._normalMode == AT_PER_FACE:
-            if i < nn:
-                f.write(struct.pack('fff', tria._normals[i][0],
-                                    tria._normals[i][1], tria._normals[i][2]))
-            else:
-                f.write(struct.pack('fff', 0.0, 0.0, 1.0))
+    def getNormalsView(self):
+        """
+        面の法線ベクトルのビューを返す
+        形状(三角形数, 3)のfloat32配列です．(getVertsView参照)
+        """
+        if self._rec is None: return N.zeros((0, 3), dtype=N.float32)
+        return self._rec['normal']
+
+    def getBbox(self, step =1, chunkSize =1048576):
+        """
+        バウンディングボックスを返す
+        頂点座標のビューをchunkSize個の三角形毎に走査し，
+        (最小座標, 最大座標)の配列のタプルを返します．
+        stepを指定した場合は，step個毎に間引いた三角形から概算します．
+        全ての三角形から算出した結果はキャッシュされます．
+        三角形が無い場合はNoneを返します．
+        - step: 三角形の間引き間隔
+        - chunkSize: 1回に走査する三角形数
+        """
+        if self._rec is None: return None
+        if step <= 1 and self._bbox is not None: return self._bbox
+        V = self.getVertsView()[::max(1, int(step))]
+        lo = N.full(3, N.inf, dtype=N.float32)
+        hi = N.full(3, -N.inf, dtype=N.float32)
+        for start in range(0, len(V), chunkSize):
+            c = V[start:start+chunkSize]
+            lo = N.minimum(lo, c.min(axis=(0, 1)))
+            hi = N.maximum(hi, c.max(axis=(0, 1)))
+        if step <= 1: self._bbox = (lo, hi)
+        return (lo, hi)
+
+    def materialize(self, tria, chunkSize =1048576):
+        """
+        Trianglesノードへのデータの取り込み
+        ObjData_LoadSLBと同様に，頂点座標，頂点毎の法線ベクトル(面の
+        法線ベクトルの複製)，インデックス領域に面毎の属性値を設定します．
+        chunkSize個の三角形毎にObjDataの領域へ直接コピーします．
+        成功した場合はTrueを返します．
+        - tria: Trianglesノード
+        - chunkSize: 1回にコピーする三角形数
+        """
+        nf = self.getNumFaces()
+        if nf < 1: return False
+        if not tria.alcData(nV=nf*3, nN=nf*3, nI=nf): return False
+        V = tria.getVertsArray().reshape((nf, 3, 3))
+        Nm = tria.getNormalsArray().reshape((nf, 3, 3))
+        A = tria.getIndicesArray()
+        rec = self._rec
+        for start in range(0, nf, chunkSize):
+            end = min(nf, start + chunkSize)
+            V[start:end] = rec['verts'][start:end]
+            Nm[start:end] = rec['normal'][start:end, N.newaxis, :]
+            A[start:end] = rec['attr'][start:end]
+        return True
+
+
+class MappedTriangles(Triangles):
+    """
+    メモリマップしたSTLバイナリファイルのTrianglesノードクラス
+    生成時にはファイルをメモリマップ(STLMap)し，SAMPLE_FACES個程度に
+    間引いた三角形からバウンディングボックスを概算するのみで，頂点座標等の
+    データは描画や編集などでデータが必要になった時点でObjDataに
+    取り込みます(materialize)．取り込み後はメモリマップを解放し，
+    正確なバウンディングボックスを再計算して，Trianglesノードと同様に
+    動作します．取り込み前に正確なバウンディングボックスが必要な場合は
+    generateBbox(exact=True)を呼び出します．
+    取り込み前のデータはgetMap()のビューで参照できます．
+      _stlMap: STLMap(取り込み後はNone)
+      _exactBbox: バウンディングボックスが全ての頂点から算出したものか
+    """
+    SAMPLE_FACES = 65536
+    _stlMap = None
+
+    def __init__(self, **args):
+        """
+        args: stlMap =None
+        """
+        Triangles.__init__(self, **args)
+        self._normalMode = AT_PER_VERTEX
+        self._stlMap = None if not 'stlMap' in args else args['stlMap']
+        self._exactBbox = False
+        self.generateBbox()
+
+    def getMap(self):
+        """
+        取り込み前のSTLMapを返す
+        取り込み後はNoneを返します．
+        """
+        return self._stlMap
+
+    def isMaterialized(self):
+        """
+        データがObjDataに取り込まれているかを返す
+        """
+        return self._stlMap is None
+
+    def materialize(self):
+        """
+        データのObjDataへの取り込み
+        取り込み済みの場合は何もしません．成功した場合はTrueを返します．
+        """
+        smap = self._stlMap
+        if smap is None: return True
+        self._stlMap = None
+        ret = smap.materialize(self)
+        smap.close()
+        if ret: self.generateBbox()
+        self.noticeData()
+        return ret
+
+    def isExactBbox(self):
+        """
+        バウンディングボックスが全ての頂点から算出したものかを返す
+        """
+        return self._stlMap is None or self._exactBbox
+
+    def generateBbox(self, exact =False):
+        """
+        バウンディングボックス再計算
+        取り込み前はメモリマップから，exactがFalseの場合は間引いた
+        三角形から概算し，Trueの場合は全ての三角形を走査して算出します．
+        - exact: 全ての三角形から算出するかどうか
+        """
+        smap = self._stlMap
+        if smap is None:
+            return Triangles.generateBbox(self)
+        if exact or self._exactBbox:
+            bb = smap.getBbox()
+            self._exactBbox = True
         else:
-            f.write(struct.pack('fff', 0.0, 0.0, 1.0))
+            step = smap.getNumFaces() // MappedTriangles.SAMPLE_FACES
+            bb = smap.getBbox(step=max(1, step))
+            self._exactBbox = step <= 1
+        if bb is None: return False
+        self.setBbox(bb[0], bb[1])
+        return True
 
-        f.write(struct.pack('fff', tria._verts[i*3  ][0],
-                            tria._verts[i*3  ][1], tria._verts[i*3  ][2]))
-        f.write(struct.pack('fff', tria._verts[i*3+1][0],
-                            tria._verts[i*3+1][1], tria._verts[i*3+1][2]))
-        f.write(struct.pack('fff', tria._verts[i*3+2][0],
-                            tria._verts[i*3+2][1], tria._verts[i*3+2][2]))
-        f.write(struct.pack('cc', '\0', '\0'))
+    def destroy(self):
+        """
+        無効化
+        メモリマップを解放し，基底クラスのdestroy()を呼び出します．
+        """
+        if self._stlMap is not None:
+            self._stlMap.close()
+            self._stlMap = None
+        Triangles.destroy(self)
 
-    f.close()
-    return True
+def _Materializing(func):
+    """
+    呼び出し前にMappedTriangles.materialize()を行うメソッドを返す
+    """
+    def method(self, *args, **kwargs):
+        if self._stlMap is not None:
+            self.materialize()
+        return func(self, *args, **kwargs)
+    method.__name__ = func.__name__
+    method.__doc__ = func.__doc__
+    return method
+
+# methods which need the data in ObjData
+for _name in ('render', 'renderProxy', 'renderSelection', 'renderFeedBack',
+              'getNumVerts', 'getNumNormals', 'getNumIndices', 'getNumFaces',
+              'getVertsArray', 'getNormalsArray', 'getIndicesArray',
+              'getFaceIndices', 'getTriangleArrays', 'getPickTriangles',
+              'getFeedbackElements', 'setVert', 'setNormal', 'setIndice',
+              'setVerts', 'setNormals', 'setIndices', 'setIndexed',
+              'noticeRange', 'generateNormals', 'weld', 'buildLOD'):
+    setattr(MappedTriangles, _name,
+            _Materializing(getattr(Triangles, _name)))
+del _name
 
 
 #----------------------------------------------------------------------
@@ -311,7 +620,8 @@ def WriteOBJ(tria, path):
     nn = tria.getNumNormals()
     if nv < 3:
         return False
-    nf = nv / 3
+    fidx = FaceIndices(tria) + 1
+    nf = len(fidx)
     if nn >= nv and tria._normalMode == AT_PER_VERTEX:
         hasNml = True
     else:
@@ -336,11 +646,11 @@ def WriteOBJ(tria, path):
     # write faces
     if hasNml:
         for i in range(nf):
-            f.write('f %d//%d %d//%d %d//%d\n' %
-                    (i*3+1, i*3+1, i*3+2, i*3+2, i*3+3, i*3+3))
+            (i0, i1, i2) = fidx[i]
+            f.write('f %d//%d %d//%d %d//%d\n' % (i0, i0, i1, i1, i2, i2))
     else:
         for i in range(nf):
-            f.write('f %d %d %d\n' % (i*3+1, i*3+2, i*3+3))
+            f.write('f %d %d %d\n' % tuple(fidx[i]))
 
     f.close()
     return True
@@ -8,6 +8,7 @@ Copyright(c) YoH, 2026, All Right Reserved.
 """
 from .gfxNode import *
 from .utilMath import *
+from .lod import GetLODChain, IndexMesh
 import numpy as N
 import ctypes as C
 
@@ -31,6 +32,18 @@ vfr_impl.gfxTriangles_CalcNormals.restype = C.c_int
 vfr_impl.gfxTriangles_CalcNormals.argtypes = [
     C.c_int, C.POINTER(C.c_float*3),
     C.c_int, C.POINTER(C.c_float*3), C.c_int]
+vfr_impl.gfxTriangles_DrawElements.restype = C.c_int
+vfr_impl.gfxTriangles_DrawElements.argtypes = [
+    C.c_int, C.POINTER(C.c_float*3),
+    C.c_int, C.POINTER(C.c_int),
+    C.c_int, C.POINTER(C.c_float*3),
+    C.c_int, C.POINTER(C.c_float*4),
+    C.c_int, C.c_int, C.c_int]
+vfr_impl.gfxTriangles_CalcNormalsIndexed.restype = C.c_int
+vfr_impl.gfxTriangles_CalcNormalsIndexed.argtypes = [
+    C.c_int, C.POINTER(C.c_float*3),
+    C.c_int, C.POINTER(C.c_int),
+    C.c_int, C.POINTER(C.c_float*3), C.c_int]
 
 
 #----------------------------------------------------------------------
@@ -42,9 +55,250 @@ class Triangles(GfxNode):
     頂点数が3の倍数でない場合，最後の1ないし2個の頂点は無視されます．
     ただし、レンダリングモードがRT_POINTの場合，頂点数が3の倍数でなくとも
     登録されている全ての頂点をポイントレンダリングします．
+    インデックスモードの場合，頂点集合はユニークな頂点とし，インデックス
+    配列(_indices)を3個づつに区切った頂点番号で三角形を構成します．
+    インデックスモードでは，AT_PER_VERTEXの法線ベクトルおよび色は
+    ユニークな頂点毎に，AT_PER_FACEの場合は三角形毎に保持します．
+    LODチェーン(lod.LODChain)が設定されている場合，カメラのLODレベル選択
+    (GfxNode.GetLODSelector())が選んだ簡略化レベルでソリッドレンダリング
+    します．
+    描画品質(GfxNode.GetRenderQuality())が代理描画モードの場合，
+    最も粗いLODレベル，またはLODチェーンが無ければ間引いた頂点の点群で
+    描画します．
+      _indexed: インデックスモード
+      _weldRatio: 直前のweldによる頂点数の圧縮率
+      _lod: LODチェーン
+      _lodLevel: 直前に描画したLODレベル
+      _lodKey: LODチェーンを設定した時点の_meshVersion
+      _meshVersion: 頂点座標・頂点番号の変更回数
     """
     def __init__(self, **args):
         GfxNode.__init__(self, **args)
+        self._indexed = False if not 'indexed' in args else args['indexed']
+        self._weldRatio = 1.0
+        self._lod = None
+        self._lodLevel = 0
+        self._lodKey = None
+        self._meshVersion = 0
+
+    def setIndexed(self, indexed):
+        """
+        インデックスモードの設定
+        - indexed: インデックスモード
+        """
+        if self._indexed == indexed: return
+        self._indexed = indexed
+        self._meshVersion += 1
+        self.noticeData()
+        return
+
+    def isIndexed(self):
+        """
+        インデックスモードを返す
+        """
+        return self._indexed
+
+    def getNumFaces(self):
+        """
+        三角形数を返す
+        """
+        if self._indexed:
+            return self.nIndices // 3
+        return self.nVerts // 3
+
+    def getFaceIndices(self):
+        """
+        三角形を構成する頂点番号の配列を返す
+        形状(三角形数, 3)のint32配列を返します．インデックスモードの場合は
+        インデックス配列のビューです．
+        """
+        nf = self.getNumFaces()
+        if self._indexed:
+            return self.getIndicesArray()[0:nf*3].reshape((nf, 3))
+        return N.arange(nf*3, dtype=N.int32).reshape((nf, 3))
+
+    #-------- LOD interface --------
+    def setLOD(self, chain):
+        """
+        LODチェーンの設定
+        - chain: lod.LODChain．Noneの場合はLODを使用しません．
+        """
+        self._lod = chain
+        self._lodLevel = 0
+        self._lodKey = None if chain is None else self._meshVersion
+        self.notice(False)
+        return
+
+    def getLOD(self):
+        """
+        LODチェーンを返す
+        """
+        return self._lod
+
+    def buildLOD(self, ratio =0.5, minFaces =1000, maxLevels =8,
+                 cacheDir =None):
+        """
+        LODチェーンの構築
+        現在のメッシュをQEMで段階的に簡略化したLODチェーンを構築し，
+        設定します．構築したレベル数(レベル0を除く)を返します．
+        インデックスモードでない場合は，座標が一致する頂点を統合した
+        メッシュ(lod.IndexMesh)を簡略化します．ノードのデータは変更しません．
+        cacheDirを指定した場合，構築結果をディスクにキャッシュします．
+        - ratio, minFaces, maxLevels: lod.LODChain.build参照
+        - cacheDir: キャッシュディレクトリ
+        """
+        if self.getNumFaces() < 1: return 0
+        verts = self.getVertsArray()
+        faces = self.getFaceIndices()
+        if not self._indexed:
+            (verts, faces) = IndexMesh(verts, faces)
+            if len(faces) < 1: return 0
+        chain = GetLODChain(verts, faces, cacheDir, ratio, minFaces, maxLevels)
+        self.setLOD(chain)
+        return chain.getNumLevels() - 1
+
+    def getLODLevel(self):
+        """
+        直前に描画したLODレベルを返す
+        """
+        return self._lodLevel
+
+    def selectLOD(self):
+        """
+        描画するLODレベルの選択
+        LODチェーンは色を持たないため，色がAT_WHOLEでない場合は0を返します．
+        LODチェーンを設定した後に頂点座標・頂点番号が変更されていれば
+        (_meshVersion参照)，LODチェーンを破棄して0を返します．
+        """
+        self._lodLevel = 0
+        if self._lod is None: return 0
+        if self._colorMode != AT_WHOLE: return 0
+        if self._lodKey != self._meshVersion:
+            self._lod = None
+            self._lodKey = None
+            return 0
+        q = GfxNode.GetRenderQuality()
+        if q and q.isProxy():
+            self._lodLevel = self._lod.getNumLevels() - 1
+            return self._lodLevel
+        sel = GfxNode.GetLODSelector()
+        if sel is None: return 0
+        self._lodLevel = sel.select(self, self._lod)
+        return self._lodLevel
+
+    def notice(self, invalidateDL =True):
+        """
+        変更通知
+        データ変更通知(noticeData)以外でディスプレイリストを無効化する
+        場合は，頂点座標・頂点番号が変更された可能性があるため，
+        _meshVersionを更新します．(GfxNode.notice参照)
+        - invalidateDL: ディスプレイリスト無効化フラグ
+        """
+        if invalidateDL and not GfxNode.IsDataNotice():
+            self._meshVersion += 1
+        GfxNode.notice(self, invalidateDL)
+        return
+
+    def noticeRange(self, kind, i0, i1, update =True):
+        """
+        部分変更通知
+        頂点座標・頂点番号の変更の場合は_meshVersionを更新します．
+        (GfxNode.noticeRange参照)
+        """
+        if kind == VB_VERTS or kind == VB_INDICES:
+            self._meshVersion += 1
+        GfxNode.noticeRange(self, kind, i0, i1, update)
+        return
+
+    def renderProxy(self):
+        """
+        代理描画
+        代理描画モードで三角形数がRenderQuality.proxyFacesを超える場合に，
+        頂点を間引いた点群を描画します．描画した場合はTrueを返します．
+        """
+        q = GfxNode.GetRenderQuality()
+        if q is None or not q.isProxy(): return False
+        if self.getNumFaces() <= q.proxyFaces: return False
+
+        stride = q.pointStride(self.nVerts)
+        verts = N.ascontiguousarray(self.getVertsArray()[::stride])
+        nc = 0
+        col = None
+        if self._colorMode == AT_PER_VERTEX and self.nColors >= self.nVerts:
+            cols = N.ascontiguousarray(self.getColorsArray()[::stride])
+            nc = len(cols)
+            col = cols.ctypes.data_as(C.POINTER(C.c_float*4))
+
+        gs = GfxNode.GetGLState()
+        gs.disable(GL_LIGHTING)
+        ret = vfr_impl.gfxNode_DrawPoints(
+            len(verts), verts.ctypes.data_as(C.POINTER(C.c_float*3)),
+            nc, col, 0, 0)
+        if ret == 0: pass
+        self.countDrawn(len(verts))
+        if not self._renderMode & RT_NOLIGHT:
+            gs.enable(GL_LIGHTING)
+        return True
+
+    def weld(self, tol =0.0):
+        """
+        頂点の溶接(重複頂点の統合)
+        座標が一致する頂点(tol > 0の場合は一辺tolの格子に量子化した座標が
+        一致する頂点)を統合し，インデックスモードのメッシュに変換します．
+        統合はソートベースで行い，縮退した三角形は削除されます．
+        AT_PER_VERTEXの法線ベクトルは統合後の頂点について再計算します．
+        統合後の頂点数/統合前の頂点数(圧縮率)を返し，_weldRatioに設定します．
+        失敗した場合は-1.0を返します．
+        - tol: 統合の許容誤差
+        """
+        nf = self.getNumFaces()
+        if nf < 1 or self.nVerts < 3: return -1.0
+        nv0 = self.nVerts
+        verts = self.getVertsArray()
+        fidx = self.getFaceIndices().copy()
+
+        # sort-based dedup
+        if tol > 0.0:
+            key = N.floor(verts / tol + 0.5).astype(N.int64)
+        else:
+            key = N.ascontiguousarray(verts + 0.0) # -0.0 -> 0.0
+        (uniq, first, inv) = N.unique(key, axis=0, return_index=True,
+                                      return_inverse=True)
+        inv = inv.reshape((-1,)).astype(N.int32)
+        fidx = inv[fidx]
+
+        # remove degenerated faces
+        valid = (fidx[:,0] != fidx[:,1]) & (fidx[:,1] != fidx[:,2]) & \
+            (fidx[:,2] != fidx[:,0])
+        fidx = fidx[valid]
+
+        # per-vertex/per-face attributes
+        nverts = verts[first]
+        ncols = None
+        if self._colorMode == AT_PER_VERTEX and self.nColors >= nv0:
+            ncols = self.getColorsArray()[first]
+        elif self._colorMode == AT_PER_FACE and self.nColors >= nf:
+            ncols = self.getColorsArray()[0:nf][valid]
+        nnmls = None
+        if self._normalMode == AT_PER_FACE and self.nNormals >= nf:
+            nnmls = self.getNormalsArray()[0:nf][valid]
+        
+        Obj.setVerts(self, nverts)
+        Obj.setIndices(self, fidx)
+        if not ncols is None:
+            Obj.setColors(self, ncols)
+        self._indexed = True
+        self._meshVersion += 1
+        if not nnmls is None:
+            Obj.setNormals(self, nnmls)
+            self.noticeData()
+        elif self._normalMode == AT_WHOLE:
+            self.noticeData()
+        else:
+            self.generateNormals()
+
+        self._weldRatio = float(len(nverts)) / float(nv0)
+        return self._weldRatio
 
     def renderFeedBack(self, tgt):
         """
@@ -78,8 +332,14 @@ class Triangles(GfxNode):
                                                   0, None,  0, 1)
                 if ret == 0: pass
         elif self._feedbackMode == FB_FACE:
-            # call gfxNode_DrawPoints
-            if self.nVerts > 0:
+            if self._indexed:
+                # call gfxTriangles_DrawElements
+                if self.nVerts > 0 and self.nIndices > 2:
+                    ret = vfr_impl.gfxTriangles_DrawElements(
+                        self.nVerts, self._verts, self.nIndices, self._indices,
+                        0,None, 0,None,  0, 0, 1)
+                    if ret == 0: pass
+            elif self.nVerts > 0:
                 ret = vfr_impl.gfxTriangles_DrawTrias(self.nVerts, self._verts,
                                                       0,None, 0,None,  0, 0, 1)
                 if ret == 0: pass
@@ -91,13 +351,24 @@ class Triangles(GfxNode):
         self.unApplyMatrix()
         return
 
+    def getFeedbackElements(self):
+        """
+        CPUフィードバック用の要素を返す
+        FB_VERTEXでは頂点，FB_FACEでは三角形を返します．
+        """
+        if self._feedbackMode == FB_VERTEX:
+            return GfxNode.getFeedbackElements(self)
+        if self._feedbackMode == FB_FACE and self.getNumFaces() > 0:
+            return (self.getVertsArray(), self.getFaceIndices(), None)
+        return None
+
     def generateNormals(self):
         """
         法線ベクトル再計算
         法線ベクトルタイプに応じ，法線ベクトルを確保し自動計算します．
         成功するとTrueを返します．(頂点数 < 3) の場合は何も実行しません．
         """
-        numFace = self.getNumVerts() / 3
+        numFace = self.getNumFaces()
         if self._normalMode == AT_PER_VERTEX:
             numFace = self.getNumVerts()
         else:
@@ -107,13 +378,19 @@ class Triangles(GfxNode):
         # Allocate Normals' area
         self.alcData(nN = numFace)
 
-        # Calc normals by gfxTriangles_CalcNormals
-        ret = vfr_impl.gfxTriangles_CalcNormals(self.nVerts, self._verts,
-                                                self.nNormals, self._normals,
-                                                self._normalMode)
+        if self._indexed:
+            # Calc normals by gfxTriangles_CalcNormalsIndexed
+            ret = vfr_impl.gfxTriangles_CalcNormalsIndexed(
+                self.nVerts, self._verts, self.nIndices, self._indices,
+                self.nNormals, self._normals, self._normalMode)
+        else:
+            # Calc normals by gfxTriangles_CalcNormals
+            ret = vfr_impl.gfxTriangles_CalcNormals(
+                self.nVerts, self._verts, self.nNormals, self._normals,
+                self._normalMode)
         if ret == 0: pass
 
-        self.notice()
+        self.noticeData()
         return (ret != 0)
 
     def renderSolid(self):
@@ -122,14 +399,40 @@ class Triangles(GfxNode):
         ソリッドモード(面塗りつぶし)でOpenGLによるレンダリングを行います．
         """
         if self.nVerts < 3: return
+        if self._indexed and self.nIndices < 3: return
+
+        # level of detail
+        if self.selectLOD() > 0:
+            if self._lod.draw(self._lodLevel):
+                self.countDrawn(self._lod.getNumFaces(self._lodLevel) * 3)
+                return
+        elif self.renderProxy():
+            return
+
+        # vertex buffer object
+        if self.useVBO() and self._normalMode != AT_PER_FACE \
+                and self._colorMode != AT_PER_FACE:
+            if self.nNormals > 0 and self._normalMode == AT_WHOLE:
+                glNormal3fv(self._normals[0])
+            count = self.getNumFaces() * 3
+            self.countDrawn(count)
+            self.getVertexBuffer().draw(
+                self, GL_TRIANGLES, count,
+                normals=(self._normalMode == AT_PER_VERTEX and \
+                         self.nNormals >= self.nVerts),
+                colors=(self._colorMode == AT_PER_VERTEX and \
+                        self.nColors >= self.nVerts),
+                indices=self._indexed)
+            return
 
         # display-list check
+        self.countDrawn(self.nIndices if self._indexed else self.nVerts)
         if self.beginDispList(DLF_SOLID): return
 
         if self.nNormals > 0 and self._normalMode == AT_WHOLE:
             glNormal3fv(self._normals[0])
         
-        # draw trias via gfxTriangles_DrawTrias
+        # draw trias via gfxTriangles_DrawTrias/DrawElements
         nv = self.nVerts
         vtx = self._verts
         if self._normalMode == AT_WHOLE:
@@ -144,15 +447,48 @@ class Triangles(GfxNode):
         else:
             nc = self.nColors
             col = self._colors
-        ret = vfr_impl.gfxTriangles_DrawTrias(nv, vtx,  nn, nml,  nc, col,
-                                              self._normalMode,
-                                              self._colorMode, 0)
+        if self._indexed:
+            ret = vfr_impl.gfxTriangles_DrawElements(
+                nv, vtx,  self.nIndices, self._indices,  nn, nml,  nc, col,
+                self._normalMode, self._colorMode, 0)
+        else:
+            ret = vfr_impl.gfxTriangles_DrawTrias(nv, vtx,  nn, nml,  nc, col,
+                                                  self._normalMode,
+                                                  self._colorMode, 0)
         if ret == 0: pass
 
         # end display-list definition
         self.endDispList(DLF_SOLID)
         return
 
+    def getTriangleArrays(self):
+        """
+        形状の三角形配列を返す
+        (頂点座標配列(3×三角形数, 3), 法線ベクトル配列(同形状またはNone))
+        のfloat32配列のタプルを返します．インデックスモードの場合は
+        三角形毎に頂点を展開します．
+        """
+        nf = self.getNumFaces()
+        if nf < 1: return None
+        fidx = self.getFaceIndices().reshape((-1,))
+        verts = self.getVertsArray()[fidx]
+        normals = None
+        if self._normalMode == AT_PER_VERTEX and self.nNormals >= self.nVerts:
+            normals = self.getNormalsArray()[fidx]
+        elif self._normalMode == AT_PER_FACE and self.nNormals >= nf:
+            normals = N.repeat(self.getNormalsArray()[0:nf], 3, axis=0)
+        elif self._normalMode == AT_WHOLE and self.nNormals > 0:
+            normals = N.tile(self.getNormalsArray()[0], (nf*3, 1))
+        return (verts, normals)
+
+    def getPickTriangles(self):
+        """
+        CPUピッキング用の三角形を返す
+        頂点を展開せずに，頂点座標配列と頂点番号配列のビューを返します．
+        """
+        if self.getNumFaces() < 1: return None
+        return (self.getVertsArray(), self.getFaceIndices(), None)
+
     def renderWire(self):
         """
         ワイヤーフレームレンダリング
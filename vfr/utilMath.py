@@ -9,6 +9,8 @@
    Vec3 : represents (x, y, z)
    Mat4 : represents 4x4 matrix
    Quat4 : represents (x, y, z, w) quaternions
+   Mat4.transformPoints/transformDirs/transformBboxes and QuatSlerpArray
+   work on numpy arrays of many points/boxes/quaternions at once
    
 """
 import sys
@@ -27,6 +29,16 @@ def Deg2Rad(x):
 def Rad2Deg(x):
     return (x / math.pi * 180.0)
 
+def _copyArray(org):
+    """copies org into a new float32 array (1-D if possible)
+    """
+    try:
+        a = N.array(org, _dt)
+        if a.ndim == 1: return a
+    except:
+        pass
+    return N.array([x for x in org], _dt)
+
 
 class Vec3(object):
     """
@@ -36,12 +48,12 @@ class Vec3(object):
     
     def __init__(self, org =None):
         if not org is None and isinstance(org, Vec3):
-            self.m_v = N.array([x for x in org.m_v], _dt)
+            self.m_v = N.array(org.m_v, _dt)
         else:
             try:
-                self.m_v = N.array([x for x in org], _dt)
+                self.m_v = _copyArray(org)
             except:
-                self.m_v = N.array([0.0, 0.0, 0.0], _dt)
+                self.m_v = N.zeros(3, _dt)
 
     def __str__(self):
         return 'Vec3' + str(self.m_v)
@@ -61,9 +73,10 @@ class Vec3(object):
     def __add__(self, a):
         b = Vec3()
         if isinstance(a, Vec3):
-            b.m_v = N.array([x + y  for x, y in zip(self.m_v, a.m_v)], _dt)
+            n = min(len(self.m_v), len(a.m_v))
+            b.m_v = N.add(self.m_v[0:n], a.m_v[0:n], dtype=_dt)
         else:
-            b.m_v = N.array([x + a for x in self.m_v], _dt)
+            b.m_v = N.add(self.m_v, a, dtype=_dt)
         return b
 
     __iadd__ = __add__
@@ -75,10 +88,11 @@ class Vec3(object):
     
     def __mul__(self, a):
         if isinstance(a, Vec3):
-            return sum([x * y for x, y in zip(self.m_v, a.m_v)])
+            n = min(len(self.m_v), len(a.m_v))
+            return N.dot(self.m_v[0:n], a.m_v[0:n])
         else:
             b = Vec3()
-            b.m_v = N.array([x * a for x in self.m_v], _dt)
+            b.m_v = N.multiply(self.m_v, a, dtype=_dt)
             return b
 
     __rmul__ = __mul__
@@ -86,19 +100,17 @@ class Vec3(object):
     def cross(self, a):
         cv = Vec3()
         if not isinstance(a, Vec3): return cv
-        cv[0] = self.m_v[1]*a.m_v[2] - self.m_v[2]*a.m_v[1]
-        cv[1] = self.m_v[2]*a.m_v[0] - self.m_v[0]*a.m_v[2]
-        cv[2] = self.m_v[0]*a.m_v[1] - self.m_v[1]*a.m_v[0]
+        cv.m_v = N.cross(self.m_v[0:3], a.m_v[0:3]).astype(_dt)
         return cv
 
     def __abs__(self):
-        return math.sqrt(sum([x * x for x in self.m_v]))
+        return math.sqrt(float(N.dot(self.m_v, self.m_v)))
 
     def unit(self):
         a = self.__abs__()
         b = Vec3((0,0,1))
         if a < 1e-8: return b
-        b.m_v = N.array([x/a for x in self.m_v], _dt)
+        b.m_v = N.divide(self.m_v, a, dtype=_dt)
         return b
 
 
@@ -114,12 +126,12 @@ class Mat4(object):
 
     def __init__(self, org =None):
         if not org is None and isinstance(org, Mat4):
-            self.m_v = N.array([x for x in org.m_v], _dt)
+            self.m_v = N.array(org.m_v, _dt)
         else:
             try:
-                self.m_v = N.array([x for x in org], _dt)
+                self.m_v = _copyArray(org)
             except:
-                self.m_v = N.array([0.0 for i in range(16)], _dt)
+                self.m_v = N.zeros(16, _dt)
                 self.Identity()
 
 
@@ -137,27 +149,49 @@ class Mat4(object):
         self.m_v[0] = self.m_v[5] = self.m_v[10] = self.m_v[15] = 1.0
     
     def __mul__(self, m):
+        # column-major m_v reshaped to (4,4) is the transposed matrix,
+        # so that A*B is computed as (B^T A^T)^T
         if isinstance(m, Mat4):
             w = Mat4()
-            for i in range(4):
-                for j in range(4):
-                    w.m_v[i*4 +j] = 0.0
-                    for k in range(4):
-                        l = i * 4
-                        w.m_v[l + j] += (self.m_v[j + k*4] * m.m_v[l + k])
+            w.m_v = N.dot(m.m_v.reshape(4, 4),
+                          self.m_v.reshape(4, 4)).reshape(16)
             return w
         elif isinstance(m, Vec3):
+            R = self.m_v.reshape(4, 4)
             w = Vec3()
-            for i in range(0,3):
-                w.m_v[i] = 0.0
-                for k in range(0,3):
-                    w.m_v[i] += (self.m_v[i + k*4] * m.m_v[k])
-                w.m_v[i] += self.m_v[i + 12]
+            w.m_v = N.dot(m.m_v[0:3], R[0:3, 0:3]) + R[3, 0:3]
             return w
         else:
-            w = Mat4([x*m for x in self.m_v])
+            w = Mat4(self.m_v * m)
             return w
-        
+
+    def transformPoints(self, pts):
+        """transforms points (n, 3) at once, same as M * Vec3 for each
+        """
+        p = N.asarray(pts)
+        if p.dtype.kind != 'f': p = p.astype(N.float64)
+        R = self.m_v.reshape(4, 4).astype(p.dtype)
+        return N.dot(p[..., 0:3], R[0:3, 0:3]) + R[3, 0:3]
+
+    def transformDirs(self, dirs):
+        """transforms direction vectors (n, 3) at once (no translation)
+        """
+        d = N.asarray(dirs)
+        if d.dtype.kind != 'f': d = d.astype(N.float64)
+        R = self.m_v.reshape(4, 4).astype(d.dtype)
+        return N.dot(d[..., 0:3], R[0:3, 0:3])
+
+    def transformBboxes(self, bmin, bmax):
+        """transforms bounding boxes (n, 3) at once,
+        returns (bmin, bmax) of the axis-aligned boxes which enclose
+        the 8 transformed corners of each box
+        """
+        lo = N.asarray(bmin, N.float64)[..., 0:3]
+        hi = N.asarray(bmax, N.float64)[..., 0:3]
+        R = self.m_v.reshape(4, 4).astype(N.float64)
+        c = N.dot((lo + hi) * 0.5, R[0:3, 0:3]) + R[3, 0:3]
+        e = N.dot((hi - lo) * 0.5, N.abs(R[0:3, 0:3]))
+        return (c - e, c + e)
 
     def Scale(self, s):
         w = Mat4()
@@ -247,79 +281,22 @@ class Mat4(object):
 
 
     def transpose(self):
-        x = Mat4(self)
-        x.m_v[ 4] = self.m_v[ 1]; x.m_v[ 1] = self.m_v[ 4]
-        x.m_v[ 8] = self.m_v[ 2]; x.m_v[ 2] = self.m_v[ 8]
-        x.m_v[12] = self.m_v[ 3]; x.m_v[ 3] = self.m_v[12]
-        x.m_v[ 9] = self.m_v[ 6]; x.m_v[ 6] = self.m_v[ 9]
-        x.m_v[13] = self.m_v[ 7]; x.m_v[ 7] = self.m_v[13]
-        x.m_v[14] = self.m_v[11]; x.m_v[11] = self.m_v[14]
+        x = Mat4()
+        x.m_v = N.array(self.m_v.reshape(4, 4).T.reshape(16), _dt)
         return x
 
 
     def inverse(self):
         RET = Mat4()
-        ip = 4;
-        l = [0,0,0,0]
-        m = [0,0,0,0]
-        r = [[self.m_v[ 0], self.m_v[ 4], self.m_v[ 8], self.m_v[12]],
-             [self.m_v[ 1], self.m_v[ 5], self.m_v[ 9], self.m_v[13]],
-             [self.m_v[ 2], self.m_v[ 6], self.m_v[10], self.m_v[14]],
-             [self.m_v[ 3], self.m_v[ 7], self.m_v[11], self.m_v[15]]]
-
-        for k in range(0, ip):
-            m[k] = l[k] = k
-            b = r[k][k]
-            for j in range(k, ip):
-                for i in range(k, ip):
-                    if abs(r[j][i]) > abs(b):
-                        b = r[j][i]; l[k] = i; m[k] = j
-            if abs(b) < 1e-12:
-                RET.m_v = [0.0 for i in self.m_v]
-                return RET # Failed: returns Zero.
-            j = l[k]
-            if j > k:
-                for i in range(0, ip):
-                    t = -r[i][k]
-                    r[i][k] = r[i][j]
-                    r[i][j] = t
-            i = m[k]
-            if i > k:
-                for j in range(0, ip):
-                    t = -r[k][j]
-                    r[k][j] = r[i][j]
-                    r[i][j] = t
-            for i in range(0, ip):
-                if i != k: r[k][i] /= -b
-            for i in range(0, ip):
-                for j in range(0, ip):
-                    if i != k and j != k: r[j][i] += r[k][i] * r[j][k]
-            for j in range(0, ip):
-                if j != k: r[j][k] /= b
-            r[k][k] = 1.0 / b
-            
-        for k in range(ip - 2, -1, -1):
-            i = l[k]
-            if i > k:
-                for j in range(0, ip):
-                    t = r[k][j]
-                    r[k][j] = -r[i][j]
-                    r[i][j] = t
-            j = m[k]
-            if j > k:
-                for i in range(0, ip):
-                    t = r[i][k]
-                    r[i][k] = -r[i][j]
-                    r[i][j] = t
-      
-        RET.m_v[ 0] = r[0][0]; RET.m_v[ 1] = r[1][0]
-        RET.m_v[ 2] = r[2][0]; RET.m_v[ 3] = r[3][0]
-        RET.m_v[ 4] = r[0][1]; RET.m_v[ 5] = r[1][1]
-        RET.m_v[ 6] = r[2][1]; RET.m_v[ 7] = r[3][1]
-        RET.m_v[ 8] = r[0][2]; RET.m_v[ 9] = r[1][2]
-        RET.m_v[10] = r[2][2]; RET.m_v[11] = r[3][2]
-        RET.m_v[12] = r[0][3]; RET.m_v[13] = r[1][3]
-        RET.m_v[14] = r[2][3]; RET.m_v[15] = r[3][3]
+        try:
+            # inv(A^T) = inv(A)^T, so column-major order is kept
+            r = N.linalg.inv(self.m_v.reshape(4, 4).astype(N.float64))
+        except N.linalg.LinAlgError:
+            r = None
+        if r is None or not N.all(N.isfinite(r)):
+            RET.m_v = N.zeros(16, _dt)
+            return RET # Failed: returns Zero.
+        RET.m_v = N.array(r.reshape(16), _dt)
         return RET
 
 
@@ -462,3 +439,26 @@ def QuatSlerp(q1, q2, t):
     if cosX < 0.0: s1 = -s1
     return (q1 * s0) + (q2 * s1)
 
+
+def QuatSlerpArray(q1, q2, t):
+    """Slerp of Quaternions, batched
+    q1, q2 : Quat4 or array (..., 4) of (x, y, z, w)
+    t : scalar or array, broadcast against q1, q2
+    returns array (..., 4) of (x, y, z, w)
+    """
+    def _quat(q):
+        if isinstance(q, Quat4):
+            return N.append(N.asarray(q.m_i.m_v[0:3], N.float64), q.m_w)
+        return N.asarray(q, N.float64)
+    a = _quat(q1)
+    b = _quat(q2)
+    t = N.asarray(t, N.float64)[..., N.newaxis]
+    cosX = N.clip((a * b).sum(axis=-1)[..., N.newaxis], -1.0, 1.0)
+    X = N.arccos(N.abs(cosX))
+    sinX = N.sin(X)
+    near = N.abs(sinX) <= 1e-8
+    sinX = N.where(near, 1.0, sinX)
+    s0 = N.where(near, 1.0 - t, N.sin((1.0 - t) * X) / sinX)
+    s1 = N.where(near, t, N.sin(t * X) / sinX)
+    s1 = N.where(cosX < 0.0, -s1, s1)
+    return a * s0 + b * s1
@@ -82,19 +82,19 @@ class Vectors(GfxNode):
             if self.showHead:
                 changed = True
         if changed:
-            self.notice()
+            self.noticeData()
         return
 
     def setScaleFactor(self, factor):
         if self.scaleFactor != factor:
             self.scaleFactor = factor
-            self.notice()
+            self.noticeData()
         return
 
     def setShowZero(self, mode):
         if self.showZero != mode:
             self.showZero = mode
-            self.notice()
+            self.noticeData()
         return
 
     def renderWire(self):
@@ -104,6 +104,13 @@ class Vectors(GfxNode):
         if self.nVerts < 1 or self.nNormals < 1 :
             return
 
+        # decimated vectors at lower quality
+        q = GfxNode.GetRenderQuality()
+        stride = 1 if q is None else q.glyphDecimation(self.nVerts)
+        if stride > 1 and self.nNormals >= self.nVerts:
+            self.drawDecimated(stride)
+            return
+
         # display-list check
         if self.beginDispList(DLF_WIRE): return
 
@@ -132,6 +139,35 @@ class Vectors(GfxNode):
         self.endDispList(DLF_WIRE)
         return
 
+    def drawDecimated(self, stride):
+        """
+        間引いたベクトルの描画
+        ディスプレイリストを使用せずに，stride個毎のベクトルを描画します．
+        - stride: 間引き間隔
+        """
+        verts = N.ascontiguousarray(self.getVertsArray()[::stride])
+        nmls = N.ascontiguousarray(
+            self.getNormalsArray()[0:self.nVerts:stride])
+        nc = 0
+        col = None
+        if self._colorMode != AT_WHOLE and not self._useAuxLineColor \
+               and self.nColors >= self.nVerts:
+            cols = N.ascontiguousarray(
+                self.getColorsArray()[0:self.nVerts:stride])
+            nc = len(cols)
+            col = cols.ctypes.data_as(C.POINTER(C.c_float*4))
+        showZ, showH = 0, 0
+        if self.showZero: showZ = 1
+        if self.showHead: showH = 1
+        ret = vfr_impl.gfxVectors_DrawVectors(
+            len(verts), verts.ctypes.data_as(C.POINTER(C.c_float*3)),
+            len(nmls), nmls.ctypes.data_as(C.POINTER(C.c_float*3)),
+            nc, col, self.scaleFactor, showZ, self.posType, showH,
+            self.headScale, self.headWidth, 0)
+        if ret == 0: pass
+        self.countDrawn(len(verts))
+        return
+
     def renderFeedBack(self, tgt):
         """
         フィードバックテストのためのレンダリングを行います.
@@ -183,6 +219,31 @@ class Vectors(GfxNode):
         self.unApplyMatrix()
         return
 
+    def getFeedbackElements(self):
+        """
+        CPUフィードバック用の要素を返す
+        FB_VERTEXでは頂点，FB_EDGEではベクトルの線分(表示位置タイプに
+        応じた始点と終点)を返します．長さ0のベクトルは除きます．
+        """
+        if self._feedbackMode == FB_VERTEX:
+            return GfxNode.getFeedbackElements(self)
+        nv = min(self.nVerts, self.nNormals)
+        if self._feedbackMode != FB_EDGE or nv < 1: return None
+        v = self.getVertsArray()[0:nv]
+        p = self.getNormalsArray()[0:nv] * self.scaleFactor
+        if self.posType == VECPOS_CENTER:
+            (pit, tip) = (v - p * 0.5, v + p * 0.5)
+        elif self.posType == VECPOS_TIP:
+            (pit, tip) = (v - p, v)
+        else:
+            (pit, tip) = (v, v + p)
+        ids = N.nonzero(N.sqrt((p * p).sum(axis=1)) >= 1.0e-6)[0]
+        ne = len(ids)
+        verts = N.empty((ne*2, 3), dtype=N.float32)
+        verts[0::2] = pit[ids]
+        verts[1::2] = tip[ids]
+        return (verts, N.arange(ne*2).reshape((ne, 2)), ids)
+
 #----------------------------------------------------------------------
 def ReadPwn(path):
     """
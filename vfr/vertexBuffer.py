@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+vfr scene-graph library
+
+Copyright(c) YoH, 2026, All Right Reserved.
+
+"""
+import ctypes as C
+from OpenGL.GL import *
+
+
+#----------------------------------------------------------------------
+"""バッファ種別"""
+(VB_VERTS, VB_NORMALS, VB_COLORS, VB_INDICES) = range(4)
+
+class VertexBuffer(object):
+    """
+    頂点バッファオブジェクト管理クラス
+    VertexBufferクラスは，Objの頂点座標，法線ベクトル，色，インデックスの
+    各データに対応するOpenGLバッファオブジェクト(VBO)を管理します．
+    データ数が変化した場合はバッファ全体を再転送し，それ以外の場合は
+    markDirtyで指定された範囲のみをglBufferSubDataで転送します．
+      _bufs: バッファ種別毎のOpenGLバッファID
+      _size: バッファ種別毎の転送済みデータ数
+      _dirty: バッファ種別毎の未転送範囲[開始, 終了)．Noneは変更なし
+    """
+    __target = {VB_VERTS:GL_ARRAY_BUFFER, VB_NORMALS:GL_ARRAY_BUFFER,
+                VB_COLORS:GL_ARRAY_BUFFER, VB_INDICES:GL_ELEMENT_ARRAY_BUFFER}
+    __elemSize = {VB_VERTS:12, VB_NORMALS:12, VB_COLORS:16, VB_INDICES:4}
+
+    def __init__(self):
+        self._bufs = [0, 0, 0, 0]
+        self._size = [-1, -1, -1, -1]
+        self._dirty = [None, None, None, None]
+        return
+
+    def invalidate(self, kind =None):
+        """
+        バッファの無効化
+        次回のsyncでバッファ全体を再転送します．
+        - kind: バッファ種別．Noneの場合は全てのバッファ
+        """
+        if kind is None:
+            self._size = [-1, -1, -1, -1]
+        else:
+            self._size[kind] = -1
+        return
+
+    def markDirty(self, kind, i0, i1):
+        """
+        部分変更の登録
+        指定範囲のデータを次回のsyncで転送します．
+        - kind: バッファ種別
+        - i0: 変更範囲の開始データ番号
+        - i1: 変更範囲の終了データ番号(この番号を含まない)
+        """
+        d = self._dirty[kind]
+        if d is None:
+            self._dirty[kind] = [i0, i1]
+        else:
+            if i0 < d[0]: d[0] = i0
+            if i1 > d[1]: d[1] = i1
+        return
+
+    def sync(self, obj, kind):
+        """
+        バッファへのデータ転送
+        指定種別のバッファについて，objのデータとの同期をとります．
+        同期したバッファのIDを返します．
+        - obj: Objインスタンス
+        - kind: バッファ種別
+        """
+        if kind == VB_VERTS: (ptr, n) = (obj._verts, obj.nVerts)
+        elif kind == VB_NORMALS: (ptr, n) = (obj._normals, obj.nNormals)
+        elif kind == VB_COLORS: (ptr, n) = (obj._colors, obj.nColors)
+        else: (ptr, n) = (obj._indices, obj.nIndices)
+        targ = VertexBuffer.__target[kind]
+        esz = VertexBuffer.__elemSize[kind]
+
+        if self._bufs[kind] < 1:
+            self._bufs[kind] = glGenBuffers(1)
+            self._size[kind] = -1
+        glBindBuffer(targ, self._bufs[kind])
+        if self._size[kind] != n:
+            glBufferData(targ, n*esz, C.cast(ptr, C.c_void_p),
+                         GL_DYNAMIC_DRAW)
+            self._size[kind] = n
+        elif not self._dirty[kind] is None:
+            (i0, i1) = self._dirty[kind]
+            if i0 < 0: i0 = 0
+            if i1 > n: i1 = n
+            if i0 < i1:
+                addr = C.cast(ptr, C.c_void_p).value + i0*esz
+                glBufferSubData(targ, i0*esz, (i1-i0)*esz, C.c_void_p(addr))
+        self._dirty[kind] = None
+        return self._bufs[kind]
+
+    def draw(self, obj, prim, count, normals =False, colors =False,
+             indices =False):
+        """
+        バッファを使用した描画
+        必要なバッファを同期し，glDrawArraysまたはglDrawElementsで
+        描画します．
+        - obj: Objインスタンス
+        - prim: OpenGLプリミティブ種別
+        - count: 描画する頂点(インデックス)数
+        - normals: 法線ベクトル配列の使用
+        - colors: 色配列の使用
+        - indices: インデックス配列の使用
+        """
+        if count < 1: return
+        glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+        self.sync(obj, VB_VERTS)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, None)
+        if normals:
+            self.sync(obj, VB_NORMALS)
+            glEnableClientState(GL_NORMAL_ARRAY)
+            glNormalPointer(GL_FLOAT, 0, None)
+        if colors:
+            self.sync(obj, VB_COLORS)
+            glEnableClientState(GL_COLOR_ARRAY)
+            glColorPointer(4, GL_FLOAT, 0, None)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        if indices:
+            self.sync(obj, VB_INDICES)
+            glDrawElements(prim, count, GL_UNSIGNED_INT, None)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        else:
+            glDrawArrays(prim, 0, count)
+        glPopClientAttrib()
+        return
+
+    def clear(self):
+        """
+        バッファの破棄
+        """
+        for i in range(4):
+            if self._bufs[i] > 0:
+                glDeleteBuffers(1, [self._bufs[i]])
+                self._bufs[i] = 0
+        self._size = [-1, -1, -1, -1]
+        self._dirty = [None, None, None, None]
+        return
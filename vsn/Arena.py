@@ -22,27 +22,8 @@ def MatrixBbox(bbox, M):
       M - utilMath.Mat4. 幾何変換行列
       戻り値 -> utilMath.Vec3[2]
     """
-    local = [utilMath.Vec3() for x in range(8)]
-    local[0][0]=bbox[1][0]; local[0][1]=bbox[0][1]; local[0][2]=bbox[0][2]
-    local[1][0]=bbox[1][0]; local[1][1]=bbox[1][1]; local[1][2]=bbox[0][2]
-    local[2][0]=bbox[1][0]; local[2][1]=bbox[1][1]; local[2][2]=bbox[1][2]
-    local[3][0]=bbox[1][0]; local[3][1]=bbox[0][1]; local[3][2]=bbox[1][2]
-    local[4][0]=bbox[0][0]; local[4][1]=bbox[0][1]; local[4][2]=bbox[0][2]
-    local[5][0]=bbox[0][0]; local[5][1]=bbox[0][1]; local[5][2]=bbox[1][2]
-    local[6][0]=bbox[0][0]; local[6][1]=bbox[1][1]; local[6][2]=bbox[1][2]
-    local[7][0]=bbox[0][0]; local[7][1]=bbox[1][1]; local[7][2]=bbox[0][2]
-
-    box = [utilMath.Vec3(), utilMath.Vec3()]
-    out = M * local[0]
-    box[0][:] = out[:]; box[1][:] = out[:]
-    for i in range(1, 8):
-        out = M * local[i]
-        if box[0][0] > out[0]: box[0][0] = out[0]
-        if box[1][0] < out[0]: box[1][0] = out[0]
-        if box[0][1] > out[1]: box[0][1] = out[1]
-        if box[1][1] < out[1]: box[1][1] = out[1]
-        if box[0][2] > out[2]: box[0][2] = out[2]
-        if box[1][2] < out[2]: box[1][2] = out[2]
+    (lo, hi) = M.transformBboxes(bbox[0][0:3], bbox[1][0:3])
+    box = [utilMath.Vec3(lo), utilMath.Vec3(hi)]
     return box
 
 
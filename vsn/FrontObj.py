@@ -39,13 +39,24 @@ class FrontObj(gfxGroup.GfxGroup):
         """
         return (self._matrix[12], self._matrix[13])
 
-    def render_(self, transpMode):
-        """ renderを実行.
-          transpMode - bool. モード
+    def getAspect(self):
+        """ 視界のアスペクト比を取得.
+          タイル描画ではカメラが設定した全体の画像のアスペクト比を,
+          それ以外ではビューポートのアスペクト比を返します.
+          戻り値 -> float. アスペクト比(横/縦).
         """
+        asp = gfxNode.GfxNode.GetFrontAspect()
+        if asp: return asp
         vp = glGetIntegerv(GL_VIEWPORT)
         asp = 1.0
         if vp[2] > 0 and vp[3] > 0: asp = float(vp[2])/float(vp[3])
+        return asp
+
+    def render_(self, transpMode):
+        """ renderを実行.
+          transpMode - bool. モード
+        """
+        asp = self.getAspect()
         glPushMatrix()
         glTranslatef(self._matrix[12]*(asp -1.0), 0.0, 0.0)
         gfxGroup.GfxGroup.render_(self, transpMode)
@@ -104,9 +115,7 @@ class FrontAxis(FrontObj):
           transpMode - bool. 透過モード.
                        True:axes labelを表示する, False:しない.
         """
-        vp = glGetIntegerv(GL_VIEWPORT)
-        asp = 1.0
-        if vp[2] > 0 and vp[3] > 0: asp = float(vp[2])/float(vp[3])
+        asp = self.getAspect()
         glPushMatrix()
         glTranslatef(self._matrix[12]*(asp -1.0), 0.0, 0.0)
 
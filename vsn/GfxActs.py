@@ -132,6 +132,7 @@ class GfxAct_RotScene(GfxAct_Base):
             self.gfxView.setXforming(False)
             self.gfxView.sceneGraphUpdated()
         else:
+            self.gfxView.xformed()
             da.rotateNode(self.gfxView._R, e.getMPoint(), e.getMMove())
             self.gfxView.sceneGraphUpdated()
         return
@@ -154,6 +155,7 @@ class GfxAct_ScaleScene(GfxAct_Base):
             self.gfxView.setXforming(False)
             self.gfxView.sceneGraphUpdated()
         else:
+            self.gfxView.xformed()
             da.scaleNode(self.gfxView._S, e.getMPoint(), e.getMMove())
             self.gfxView.sceneGraphUpdated()
         return
@@ -176,6 +178,7 @@ class GfxAct_TransScene(GfxAct_Base):
             self.gfxView.setXforming(False)
             self.gfxView.sceneGraphUpdated()
         else:
+            self.gfxView.xformed()
             da.translateNode(self.gfxView._T, e.getMPoint(), e.getMMove())
             self.gfxView.sceneGraphUpdated()
         return
@@ -205,6 +208,7 @@ class GfxAct_WheelScene(GfxAct_Base):
             mvy = -self._delta
         else:
             mvy = self._delta
+        self.gfxView.xformed()
         da.scaleNode(self.gfxView._S, e.getMPoint(), gfxNode.Point2(0, mvy))
         self.gfxView.sceneGraphUpdated()
         return
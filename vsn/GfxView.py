@@ -4,6 +4,7 @@
 """
 
 import sys, time, math
+import wx
 if not ".." in sys.path:
     sys.path = sys.path + [".."]
 
@@ -12,6 +13,7 @@ from vfr import drawAreaWx
 import Arena, xform
 from ViewCamera import *
 from FrontObj import *
+import PerfHUD
 import ViewPoint
 
 
@@ -20,6 +22,8 @@ class GfxView(object):
     """
     s_xformAnim = True
     s_xformAnimDuration = 0.5
+    s_refineDelay = 0.3
+    s_xformGovernor = True
     s_keyZoomInRatio = 1.1
     s_keyZoomInRatio2 = 2.0
     s_keyZoomOutRatio = 0.9
@@ -39,6 +43,13 @@ class GfxView(object):
         selected - 選択中のオブジェクト
         _xformSimpleRendering: 幾何変換時の簡易レンダリングモード
         _xforming: 幾何変換実行中フラグ
+        _lastXformTime: 最後の幾何変換操作の時刻
+        _refineTimer: 通常品質での再描画用タイマー(wx.CallLater)
+        _xformQualityLevel: 直前の幾何変換操作終了時の描画品質レベル
+        簡易レンダリングモードでは，幾何変換操作中はカメラを代理描画
+        モードとし，最後の操作からs_refineDelay秒経過後に通常品質で
+        再描画します. s_xformGovernorがTrueの場合は, 幾何変換操作中に
+        カメラの品質ガバナーを有効にします.
         """
         self.drawArea = drawAreaWx.DrawAreaWx(parent)
         self.parent = parent
@@ -68,6 +79,10 @@ class GfxView(object):
         self.faxis = FrontAxis(suicide=True)
         self.camera.addToFront(self.faxis)
 
+        self.perfHud = PerfHUD.PerfHUD(camera=self.camera, suicide=True)
+        self.perfHud.setRenderMode(gfxNode.RT_NONE)
+        self.camera.addToFront(self.perfHud)
+
         self.centPos = gfxNode.GfxNode(name='CenterPos', suicide=True)
         self.centPos.alcData(nV=1, nC=1)
         self.centPos.setColor(0, (1.0, 1.0, 0.0))
@@ -77,6 +92,9 @@ class GfxView(object):
 
         self._xformSimpleRendering = True
         self._xforming = False
+        self._lastXformTime = 0.0
+        self._refineTimer = None
+        self._xformQualityLevel = 0
 
         self.setupActions()
         return
@@ -84,6 +102,8 @@ class GfxView(object):
     def __del__(self):
         """ 終了処理.
         """
+        if self._refineTimer:
+            self._refineTimer.Stop()
         self.camera.destroy()
         del self.parent
         del self.drawArea
@@ -91,6 +111,7 @@ class GfxView(object):
         del self.scene
         del self._T, self._C, self._R, self._S, self._IC, self.root
         del self.centPos
+        del self.perfHud
         return
 
     def getArena(self):
@@ -114,6 +135,8 @@ class GfxView(object):
           mode - bool. simple rendering in transformationの設定値.
         """
         self._xformSimpleRendering = mode
+        if not mode:
+            self.refine()
 
     def getXforming(self):
         """ 幾何変換中フラグの取得.
@@ -127,9 +150,72 @@ class GfxView(object):
         """
         if self._xforming == mode: return
         self._xforming = mode
+        if mode:
+            self.xformed()
+        else:
+            self.scheduleRefine()
         self.scene.notice()
         return        
 
+    def xformed(self):
+        """ 幾何変換操作の通知.
+         簡易レンダリングモードの場合はカメラを代理描画モードとし,
+         通常品質での再描画を予約します.
+        """
+        self._lastXformTime = GfxView.GetTime()
+        if not self._xformSimpleRendering: return
+        if not self.camera.getProxyMode():
+            self.camera.setProxyMode(True)
+            if GfxView.s_xformGovernor:
+                self.camera.setGovernor(True)
+                self.camera.setQualityLevel(self._xformQualityLevel)
+        self.scheduleRefine()
+        return
+
+    def scheduleRefine(self):
+        """ 通常品質での再描画の予約.
+         最後の幾何変換操作からs_refineDelay秒後にrefineを呼び出します.
+        """
+        if not self.camera.getProxyMode(): return
+        delay = int(GfxView.s_refineDelay * 1000)
+        if delay <= 0:
+            self.refine()
+            return
+        try:
+            if self._refineTimer is None:
+                self._refineTimer = wx.CallLater(delay, self.onRefineTimer)
+            elif not self._refineTimer.IsRunning():
+                self._refineTimer.Start(delay)
+        except:
+            self.refine()
+        return
+
+    def onRefineTimer(self):
+        """ 再描画用タイマーのコールバック.
+         最後の幾何変換操作からs_refineDelay秒経過していなければ
+         タイマーを再設定します.
+        """
+        rest = self._lastXformTime + GfxView.s_refineDelay \
+               - GfxView.GetTime()
+        if rest > 0.001:
+            self._refineTimer.Start(int(rest * 1000) + 1)
+            return
+        self.refine()
+        return
+
+    def refine(self):
+        """ 通常品質での再描画.
+         カメラの代理描画モードと品質ガバナーを解除し, 最高品質で
+         再描画します.
+        """
+        if not self.camera.getProxyMode(): return
+        if self.camera.getGovernor():
+            self._xformQualityLevel = self.camera.getQualityLevel()
+            self.camera.setGovernor(False)
+        self.camera.setProxyMode(False)
+        self.drawArea.chkNotice()
+        return
+
     def addToRoot(self, node, is_volume=False):
         """ rootへのnodeの追加.
           node - Node.追加するnode
@@ -311,7 +397,7 @@ class GfxView(object):
         self._S.identity(); self._S.scale(xfm.vS)
         self._C.identity(); self._C.trans(xfm.vC)
         self._IC.identity(); self._IC.trans(xfm.vC * (-1.0))
-        self._R._matrix[0:16] = xfm.mR[0:16]
+        self._R.setMatrix(xfm.mR)
         self.centPos.identity(); self.centPos.trans(xfm.vC)
         self.sceneGraphUpdated()
         return
@@ -367,6 +453,7 @@ class GfxView(object):
         self.drawArea.chkNotice()
 
         self.setXforming(False)
+        self.refine()
         self.drawArea.chkNotice()
         return
 
@@ -403,6 +490,30 @@ class GfxView(object):
         else:
             return True
 
+    def setShowPerfHUD(self, mode):
+        """ 描画性能表示の設定.
+         表示中はカメラのプロファイルモードを有効にします.
+          mode - bool. True:表示する, False:しない.
+        """
+        if not self.perfHud: return
+        self.camera.setProfileMode(mode)
+        if mode:
+            self.perfHud.setRenderMode(gfxNode.RT_NOLIGHT)
+        else:
+            self.perfHud.setRenderMode(gfxNode.RT_NONE)
+        self.perfHud.chkNotice()
+        return
+
+    def getShowPerfHUD(self):
+        """ 描画性能表示モードの取得.
+          戻り値 - bool. True:表示, False:非表示.
+        """
+        if not self.perfHud: return False
+        if self.perfHud._renderMode == gfxNode.RT_NONE:
+            return False
+        else:
+            return True
+
     def setShowCenterPos(self, mode):
         """ 中心の表示の設定.
           mode - bool. True:表示する, False:しない.
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+"""PerfHUD implementation
+  PerfHUDクラス, Front表示の描画性能表示クラスを提供します.
+"""
+import sys, time
+if not ".." in sys.path:
+    sys.path = sys.path + [".."]
+
+from vfr import *
+import FrontObj
+
+
+#----------------------------------------------------------------------
+# PerfHUD class implementation
+
+class PerfHUD(FrontObj.FrontObj):
+    """ PerfHUDクラス
+     カメラのプロファイル結果から, FPS(フレームの表示間隔から算出)と
+     描画時間, フレーム毎の描画呼び出し数等, 描画時間(子供を含まない)の
+     大きい上位numNodes個のノードを表示します.
+     表示内容は直前のフレームのプロファイル結果です.
+     HUD自身の描画はプロファイル結果に含めず, 表示文字列の変更は
+     シーンに通知しません(カメラのIDバッファを無効化しないため).
+    """
+    PHD_LABEL_SIZE = 0.04
+    PHD_NUM_FRAMES = 10
+
+    def __init__(self, **args):
+        """ 初期設定.
+          args: camera =None, numNodes =5
+        """
+        FrontObj.FrontObj.__init__(self, **args)
+        self.setRenderMode(gfxNode.RT_NOLIGHT)
+
+        self.camera = None if not 'camera' in args else args['camera']
+        self.numNodes = 5 if not 'numNodes' in args else args['numNodes']
+
+        self.pText = letters.Letters(name='PerfHUD_Text',
+                                     localMaterial=False,
+                                     font=letters.FONT_LINE,
+                                     fontScale=PerfHUD.PHD_LABEL_SIZE)
+        self.pText.setColor(0, (1.0, 1.0, 0.0))
+        self.addChild(self.pText)
+
+        self._frameStamps = []
+        self.setPosition(-0.95, 0.9)
+        return
+
+    def getText(self):
+        """ 表示文字列の作成.
+          戻り値 -> str. 表示文字列.
+        """
+        if not self.camera: return ""
+        rep = self.camera.getRenderReport()
+        if rep is None: return "no profile"
+
+        ftl = [x[0] for x in self.camera.getFrameTimes()]
+        ftl = ftl[-PerfHUD.PHD_NUM_FRAMES:]
+        ft = sum(ftl) / len(ftl) if len(ftl) > 0 else 0.0
+        fs = self._frameStamps
+        dt = fs[-1] - fs[0] if len(fs) > 1 else 0.0
+        fps = (len(fs) - 1) / dt if dt > 1e-6 else 0.0
+        lines = ["FPS {:.1f} render {:.1f} ms Q{}".format(
+                     fps, ft * 1000.0, self.camera.getQualityLevel()),
+                 "calls {} verts {} dl {} state {}".format(
+                     rep['calls'], rep['verts'], rep['dlRebuilds'],
+                     rep['stateChanges'])]
+        for x in rep['nodes'][0:self.numNodes]:
+            lines.append("{:.2f} ms {} {}".format(
+                x['self'] * 1000.0, x['type'], x['name']))
+        return "\n".join(lines)
+
+    def render_(self, transpMode):
+        """ renderを実行.
+          transpMode - bool. 透過モード.
+        """
+        if self._renderMode == gfxNode.RT_NONE: return
+        if not transpMode:
+            self._frameStamps.append(time.perf_counter())
+            del self._frameStamps[0:-(PerfHUD.PHD_NUM_FRAMES + 1)]
+            text = self.getText()
+            if text != self.pText.textBuf:
+                self.pText.setLetters(text, False)
+        prof = gfxNode.GfxNode.GetProfiler()
+        gfxNode.GfxNode.SetProfiler(None)
+        try:
+            FrontObj.FrontObj.render_(self, transpMode)
+        finally:
+            gfxNode.GfxNode.SetProfiler(prof)
+        return
@@ -24,11 +24,12 @@ import ObjPropDlg
  ViewFrameMenu_View_Perspective,
  ViewFrameMenu_View_CenterShow,
  ViewFrameMenu_View_FrAxisShow,
+ ViewFrameMenu_View_PerfHUDShow,
  ViewFrameMenu_View_SetBgColor,
 
  ViewFrameMenu_Obj_Selection,
  
- ViewFrameMenu_Help_About) = range(1100, 1100 + 10)
+ ViewFrameMenu_Help_About) = range(1100, 1100 + 11)
 
 (ViewFrameTooBar_NormView,
  ViewFrameTooBar_ProjPers,
@@ -139,6 +140,10 @@ class ViewFrame(wx.Frame):
         viewMenu.Append(ViewFrameMenu_View_CenterShow,
                         "Show Center Cross\tCTRL+C",
                         "Show/Hide glyph of Rot|Scale Center", True)
+        viewMenu.Append(ViewFrameMenu_View_PerfHUDShow,
+                        "Show Render Performance",
+                        "Show/Hide FPS and costliest nodes in front layer",
+                        True)
         viewMenu.AppendSeparator()
         viewMenu.Append(ViewFrameMenu_View_SetBgColor,
                         "Background Color ...",
@@ -365,6 +370,8 @@ class ViewFrame(wx.Frame):
             self.OnMenuView_FrAxisShow(event)
         elif eid == ViewFrameMenu_View_CenterShow:
             self.OnMenuView_CenterShow(event)
+        elif eid == ViewFrameMenu_View_PerfHUDShow:
+            self.OnMenuView_PerfHUDShow(event)
         elif eid == ViewFrameMenu_View_SetBgColor:
             self.OnMenuView_SetBgColor(event)
         elif eid == ViewFrameMenu_Obj_Selection:
@@ -435,6 +442,8 @@ class ViewFrame(wx.Frame):
             self.OnUpdateMenuView_FrAxisShow(event)
         elif eid == ViewFrameMenu_View_CenterShow:
             self.OnUpdateMenuView_CenterShow(event)
+        elif eid == ViewFrameMenu_View_PerfHUDShow:
+            self.OnUpdateMenuView_PerfHUDShow(event)
         return
 
     def OnMenuView_Perspective(self, event):
@@ -507,6 +516,20 @@ class ViewFrame(wx.Frame):
         event.Check(self.gfxView.getShowCenterPos())
         return
 
+    def OnMenuView_PerfHUDShow(self, event):
+        """ Show Render Performanceメニューのイベント.
+          event - wx.MenuEvent.
+        """
+        self.gfxView.setShowPerfHUD(event.IsChecked())
+        return
+
+    def OnUpdateMenuView_PerfHUDShow(self, event):
+        """ Show Render PerformanceのUPDATE UIイベント.
+          event - wx.UpdateUIEvent.
+        """
+        event.Check(self.gfxView.getShowPerfHUD())
+        return
+
     def OnMenuView_SetBgColor(self, event):
         """ Set Background colorメニューのイベント.
           event - wx.MenuEvent.
@@ -108,6 +108,7 @@ class VisRegIsosurf(VisRegularMesh):
         self.notice()
         return
 
+    @trace.Traced('VisRegIsosurf.update', 'update')
     def update(self, **args):
         # check initialized
         if not self._surf:
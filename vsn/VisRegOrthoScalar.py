@@ -77,6 +77,7 @@ class VisRegOrthoScalar(VisRegularMesh):
         self.notice()
         return
 
+    @trace.Traced('VisRegOrthoScalar.update', 'update')
     def update(self, **args):
         # check initialized
         if not self._mesh: